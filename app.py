@@ -1,3 +1,4 @@
+import pymysql
 from flask import Flask, session
 from config import Config
 
@@ -11,6 +12,24 @@ def create_app():
     # Configurar sesión para que NO sea permanente (se cierre al cerrar navegador)
     app.config['PERMANENT_SESSION_LIFETIME'] = Config.PERMANENT_SESSION_LIFETIME
     
+    # Unidad de trabajo por request sobre el pool de conexiones compartido
+    from utils.database import Database
+    Database.init_app(app)
+    
+    # Instrumentación de consultas por request (log de lentas, N+1, cabeceras X-DB-* en debug)
+    from utils.query_stats import query_stats
+    query_stats.init_app(app)
+    
+    # Aplicar y verificar migraciones de esquema al arrancar
+    if Config.DB_AUTO_MIGRATE:
+        from utils.migrations import MigrationRunner
+        try:
+            applied = MigrationRunner().migrate()
+            if applied:
+                app.logger.info('Migraciones aplicadas: %s', applied)
+        except pymysql.err.OperationalError as e:
+            app.logger.warning('No se pudieron verificar las migraciones: %s', e)
+    
     # Importar y registrar controladores
     from controllers.auth_controller import auth_controller
     from controllers.dashboard_controller import dashboard_controller
@@ -19,6 +38,8 @@ def create_app():
     from controllers.budget_controller import budget_controller
     from controllers.savings_controller import savings_controller
     from controllers.admin_controller import admin_controller  # ← NUEVO: Importar admin controller
+    from controllers.export_controller import export_controller
+    from controllers.import_controller import import_controller
     
     app.register_blueprint(auth_controller.bp)
     app.register_blueprint(dashboard_controller.bp)
@@ -27,12 +48,38 @@ def create_app():
     app.register_blueprint(budget_controller.bp)
     app.register_blueprint(savings_controller.bp)
     app.register_blueprint(admin_controller.bp)  # ← NUEVO: Registrar admin blueprint
+    app.register_blueprint(export_controller.bp)
+    app.register_blueprint(import_controller.bp)
+    
+    # Modo async: las APIs JSON también se sirven en /async/... con aiomysql
+    if Config.ASYNC_VIEWS:
+        from utils.async_database import AsyncDatabase
+        if AsyncDatabase.available():
+            from controllers.async_api_controller import async_api_controller
+            app.register_blueprint(async_api_controller.bp)
+        else:
+            app.logger.warning('ASYNC_VIEWS requiere DB_BACKEND=mysql y aiomysql/asgiref (requirements-async.txt)')
+    
+    # Cargar el catálogo de categorías en memoria (si la BD no está lista, se carga en el primer uso)
+    from models.category import category_catalog
+    try:
+        category_catalog.load()
+    except pymysql.err.OperationalError as e:
+        app.logger.warning('No se pudo cargar el catálogo de categorías: %s', e)
+    
+    # Comandos de mantenimiento (flask reconcile-balances, ...)
+    from commands import register_commands
+    register_commands(app)
+    
+    # Bloques de plantilla cacheados: {% call cached_fragment('nombre') %}...{% endcall %}
+    from utils.fragment_cache import cached_fragment
+    app.jinja_env.globals['cached_fragment'] = cached_fragment
     
     # Context processor para fechas
     @app.context_processor
     def utility_processor():
         from datetime import datetime
-        return {'now': datetime.now()}
+        return {'now': datetime.now(), 'category_catalog': category_catalog}
     
     return app
 
@@ -0,0 +1,136 @@
+"""Benchmark de las APIs JSON: ruta sync (/budgets/api, ...) contra modo async (/async/...)
+
+Requiere la app corriendo con ASYNC_VIEWS=1 y un usuario existente, por ejemplo:
+
+    ASYNC_VIEWS=1 gunicorn -w 4 --threads 8 'app:create_app()'
+    python benchmarks/async_api.py --base-url http://127.0.0.1:8000 \\
+        --email demo@example.com --password secreto --concurrency 1,16,64,256
+
+Para cada nivel de concurrencia lanza N clientes que repiten la petición durante
+--duration segundos y reporta throughput y percentiles de latencia. Con --json
+escribe el resultado completo en ese archivo.
+
+Bajo gunicorn (WSGI) cada vista async ocupa un hilo del worker igual que la sync, así que
+no se espera más rps en modo async; la diferencia esperable está en la latencia de
+'resumen', que hace tres consultas en paralelo en lugar de tres peticiones seguidas.
+"""
+import argparse
+import http.cookiejar
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# (nombre, ruta sync, ruta async). Para 'resumen' la ruta sync son tres peticiones seguidas.
+PAIRS = [
+    ('budgets', ['/budgets/api'], ['/async/budgets']),
+    ('budget_progress', ['/budgets/api/progress'], ['/async/budgets/progress']),
+    ('savings', ['/savings/api'], ['/async/savings']),
+    ('expenses', ['/expenses/api'], ['/async/expenses']),
+    ('resumen', ['/budgets/api', '/savings/api', '/expenses/api'], ['/async/resumen']),
+]
+
+
+def login(base_url, email, password):
+    """Iniciar sesión y devolver la cookie de sesión"""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    data = urllib.parse.urlencode({'email': email, 'password': password}).encode('utf-8')
+    opener.open(f"{base_url}/login", data=data, timeout=30).read()
+    cookie = '; '.join(f"{c.name}={c.value}" for c in jar)
+    if 'session=' not in cookie:
+        raise SystemExit('No se pudo iniciar sesión (revisa --email/--password)')
+    return cookie
+
+
+def run_level(base_url, cookie, paths, concurrency, duration):
+    """Clientes concurrentes repitiendo `paths` durante `duration` segundos"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        local, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                for path in paths:
+                    req = urllib.request.Request(base_url + path, headers={'Cookie': cookie})
+                    with urllib.request.urlopen(req, timeout=30) as response:
+                        response.read()
+                local.append(time.perf_counter() - start)
+            except Exception:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2)
+
+    return {
+        'concurrencia': concurrency,
+        'peticiones': len(latencies),
+        'errores': errors[0],
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'media_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', default='1,16,64,256',
+                        help='niveles de concurrencia separados por coma')
+    parser.add_argument('--duration', type=float, default=10.0, help='segundos por nivel y ruta')
+    parser.add_argument('--only', help='nombres de PAIRS separados por coma')
+    parser.add_argument('--json', help='archivo donde guardar el resultado')
+    args = parser.parse_args(argv)
+
+    base_url = args.base_url.rstrip('/')
+    cookie = login(base_url, args.email, args.password)
+    levels = [int(level) for level in args.concurrency.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+
+    results = []
+    print(f"{'endpoint':<16} {'modo':<6} {'conc':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for name, sync_paths, async_paths in PAIRS:
+        if only and name not in only:
+            continue
+        for level in levels:
+            for mode, paths in (('sync', sync_paths), ('async', async_paths)):
+                result = run_level(base_url, cookie, paths, level, args.duration)
+                result.update({'endpoint': name, 'modo': mode})
+                results.append(result)
+                print(f"{name:<16} {mode:<6} {level:>5} {result['rps']:>9} "
+                      f"{result['p50_ms'] or '-':>8} {result['p95_ms'] or '-':>8} "
+                      f"{result['p99_ms'] or '-':>8} {result['errores']:>5}")
+                sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'base_url': base_url, 'duracion': args.duration, 'resultados': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Generador de datos sintéticos (usuarios, ingresos, gastos, presupuestos y ahorros)
+
+Reproducible con --seed: cada usuario usa su propio generador derivado de la semilla,
+así el resultado no depende de --chunk-size. Escribe con el backend configurado, por
+ejemplo en una base SQLite local:
+
+    DB_BACKEND=sqlite SQLITE_PATH=bench.sqlite3 python -m benchmarks.dataset --users 10000
+
+Los usuarios quedan como bench-0000001@example.test ... con la clave PASSWORD. Hay tres
+perfiles: ligero (pocos meses y movimientos), regular (un año) y pesado (--years de
+historial con muchos gastos por mes, fracción --heavy-fraction). Al final se reconstruyen
+saldos_usuario y resumen_mensual desde las tablas generadas.
+"""
+import argparse
+import calendar
+import logging
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from config import Config
+
+PASSWORD = 'benchmark'
+EMAIL_DOMAIN = 'example.test'
+
+# meses de historial, gastos por mes, presupuestos por mes, metas de ahorro
+PROFILES = {
+    'ligero': {'meses': (1, 3), 'gastos_mes': (2, 8), 'presupuestos': (0, 2), 'metas': (0, 1)},
+    'regular': {'meses': (12, 12), 'gastos_mes': (15, 30), 'presupuestos': (3, 5), 'metas': (1, 2)},
+    'pesado': {'meses': None, 'gastos_mes': (60, 120), 'presupuestos': (5, 8), 'metas': (2, 4)},
+}
+
+# Rango de montos y probabilidad de ser esencial por palabra clave de la categoría de gasto
+EXPENSE_PATTERNS = [
+    ('aliment', (5, 150), 0.9),
+    ('transp', (2, 60), 0.8),
+    ('vivienda', (300, 1500), 1.0),
+    ('servic', (20, 200), 1.0),
+    ('salud', (10, 300), 0.9),
+    ('educa', (20, 500), 0.7),
+]
+DEFAULT_EXPENSE = ((5, 200), 0.3)
+CONCEPTS = ['Compra', 'Pago', 'Cuota', 'Factura', 'Recarga', 'Suscripción', 'Ticket', 'Pedido']
+
+
+def email_for(index):
+    """Email del usuario sintético número `index` (ordenable: permite buscar por rango)"""
+    return f"bench-{index:07d}@{EMAIL_DOMAIN}"
+
+
+def profile_for(index, heavy_fraction, seed):
+    """Perfil de un usuario, estable para la misma semilla"""
+    rng = random.Random(f"{seed}-perfil-{index}")
+    roll = rng.random()
+    if roll < heavy_fraction:
+        return 'pesado'
+    if roll < heavy_fraction + 0.3:
+        return 'regular'
+    return 'ligero'
+
+
+def months_back(today, count):
+    """(año, mes) de los últimos `count` meses, el actual incluido, del más antiguo al más nuevo"""
+    months = []
+    year, month = today.year, today.month
+    for _ in range(count):
+        months.append((year, month))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return list(reversed(months))
+
+
+def add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+class DatasetGenerator:
+    """Genera e inserta el dataset por bloques de usuarios (una transacción por bloque)"""
+
+    def __init__(self, users, years=3, heavy_fraction=0.01, seed=42, chunk_size=500, today=None):
+        from utils.database import Database
+        from models.category import category_catalog
+
+        self.db = Database()
+        self.users = users
+        self.years = years
+        self.heavy_fraction = heavy_fraction
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.today = today or date.today()
+        self.income_categories = [row['id'] for row in category_catalog.all('ingreso')]
+        self.expense_categories = [
+            (row['id'], self._expense_pattern(row['nombre'])) for row in category_catalog.all('gasto')
+        ]
+        self.counts = {'usuarios': 0, 'ingresos': 0, 'gastos': 0, 'presupuestos': 0, 'ahorros': 0}
+
+    @staticmethod
+    def _expense_pattern(nombre):
+        nombre = nombre.lower()
+        for keyword, amounts, esencial in EXPENSE_PATTERNS:
+            if keyword in nombre:
+                return amounts, esencial
+        return DEFAULT_EXPENSE
+
+    def run(self, start=1, progress=None):
+        """Insertar los usuarios start..start+users-1; devuelve los conteos"""
+        from utils.passwords import hash_password
+
+        clave = hash_password(PASSWORD)
+        end = start + self.users
+        for chunk_start in range(start, end, self.chunk_size):
+            chunk = range(chunk_start, min(chunk_start + self.chunk_size, end))
+            with self.db.transaction():
+                self._insert_chunk(chunk, clave)
+            if progress:
+                progress(chunk.stop - start, self.users)
+
+        self.rebuild_derived()
+        return self.counts
+
+    def rebuild_derived(self):
+        """Ledger de saldos y resúmenes mensuales desde las tablas generadas (set-based)"""
+        from models.balance import BalanceModel
+        from models.rollup import RollupModel
+
+        with self.db.transaction():
+            BalanceModel().rebuild()
+        RollupModel().rebuild()
+
+    def _insert_chunk(self, chunk, clave):
+        self.db.execute_many(
+            "INSERT INTO usuarios (nombre, email, clave, rol_id, activo) VALUES (%s, %s, %s, %s, %s)",
+            [(f"Usuario {index}", email_for(index), clave, 2, 1) for index in chunk]
+        )
+        rows = self.db.execute_query(
+            "SELECT id, email FROM usuarios WHERE email BETWEEN %s AND %s",
+            (email_for(chunk.start), email_for(chunk.stop - 1)),
+            fetch=True
+        )
+        ids = {row['email']: row['id'] for row in rows}
+
+        data = {'ingresos': [], 'gastos': [], 'presupuestos': [], 'ahorros': []}
+        for index in chunk:
+            self._generate_user(index, ids[email_for(index)], data)
+
+        self.db.execute_many("""
+        INSERT INTO ingresos (usuario_id, concepto, monto, categoria_id, fecha, descripcion, fecha_registro)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, data['ingresos'])
+        self.db.execute_many("""
+        INSERT INTO gastos (usuario_id, concepto, monto, categoria_id, fecha, esencial, descripcion, fecha_registro)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, data['gastos'])
+        self.db.execute_many("""
+        INSERT INTO presupuestos (usuario_id, categoria_gasto_id, monto_maximo, mes_year)
+        VALUES (%s, %s, %s, %s)
+        """, data['presupuestos'])
+        self.db.execute_many("""
+        INSERT INTO ahorros (usuario_id, concepto, meta_total, ahorrado_actual, fecha_inicio,
+                             fecha_objetivo, descripcion, completado)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, data['ahorros'])
+        # Lo ahorrado queda como un aporte inicial, igual que en la migración del historial
+        self.db.execute_query("""
+        INSERT INTO aportes_ahorro (ahorro_id, usuario_id, monto, ahorrado_resultante, fecha_registro)
+        SELECT a.id, a.usuario_id, a.ahorrado_actual, a.ahorrado_actual, a.fecha_inicio
+        FROM ahorros a
+        JOIN usuarios u ON u.id = a.usuario_id
+        WHERE u.email BETWEEN %s AND %s AND a.ahorrado_actual > 0
+        """, (email_for(chunk.start), email_for(chunk.stop - 1)))
+
+        self.counts['usuarios'] += len(chunk)
+        for table, rows in data.items():
+            self.counts[table] += len(rows)
+
+    def _generate_user(self, index, usuario_id, data):
+        rng = random.Random(f"{self.seed}-usuario-{index}")
+        profile = profile_for(index, self.heavy_fraction, self.seed)
+        spec = PROFILES[profile]
+        history = self.years * 12 if spec['meses'] is None else rng.randint(*spec['meses'])
+        months = months_back(self.today, history)
+        salary = round(rng.uniform(1500, 6000), -1)
+        monthly_spend = {}
+
+        for year, month in months:
+            last_day = calendar.monthrange(year, month)[1]
+            if (year, month) == (self.today.year, self.today.month):
+                last_day = self.today.day
+
+            payday = date(year, month, min(rng.randint(1, 5), last_day))
+            data['ingresos'].append(self._income(rng, usuario_id, 'Salario', salary, payday))
+            if rng.random() < 0.3:
+                day = date(year, month, rng.randint(1, last_day))
+                data['ingresos'].append(self._income(rng, usuario_id, 'Trabajo extra', rng.uniform(100, 1500), day))
+
+            for _ in range(rng.randint(*spec['gastos_mes'])):
+                categoria_id, ((low, high), esencial) = rng.choice(self.expense_categories)
+                monto = round(rng.uniform(low, high), 2)
+                fecha = date(year, month, rng.randint(1, last_day))
+                data['gastos'].append((
+                    usuario_id, f"{rng.choice(CONCEPTS)} {rng.randint(1, 999)}", monto, categoria_id,
+                    fecha, rng.random() < esencial, None, self._registered_at(rng, fecha)
+                ))
+                monthly_spend[categoria_id] = monthly_spend.get(categoria_id, 0) + monto
+
+        # Presupuestos de los últimos meses, cerca del gasto típico de cada categoría
+        budget_count = min(rng.randint(*spec['presupuestos']), len(self.expense_categories))
+        categories = rng.sample(self.expense_categories, budget_count)
+        for year, month in months[-3:]:
+            for categoria_id, ((low, high), _) in categories:
+                typical = monthly_spend.get(categoria_id, 0) / len(months) or (low + high) / 2
+                data['presupuestos'].append((
+                    usuario_id, categoria_id, round(typical * rng.uniform(0.8, 1.4), -1) or 10,
+                    f"{year}-{month:02d}"
+                ))
+
+        for number in range(rng.randint(*spec['metas'])):
+            meta_total = round(rng.uniform(500, 20000), -1)
+            ahorrado = round(meta_total * min(1.0, rng.uniform(0, 1.2)), 2)
+            fecha_inicio = date(*months[rng.randrange(len(months))], 1)
+            data['ahorros'].append((
+                usuario_id, f"Meta {number + 1}", meta_total, ahorrado, fecha_inicio,
+                add_months(fecha_inicio, rng.randint(6, 36)), None, ahorrado >= meta_total
+            ))
+
+    def _income(self, rng, usuario_id, concepto, monto, fecha):
+        return (usuario_id, concepto, round(monto, 2), rng.choice(self.income_categories), fecha, None,
+                self._registered_at(rng, fecha))
+
+    def _registered_at(self, rng, fecha):
+        """Momento de registro: el mismo día o hasta tres días después, nunca en el futuro"""
+        moment = datetime(fecha.year, fecha.month, fecha.day) + timedelta(seconds=rng.randint(0, 3 * 86400))
+        return min(moment, datetime.now()).replace(microsecond=0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--start', type=int, default=1, help='número del primer usuario (para ampliar un dataset)')
+    parser.add_argument('--years', type=int, default=3, help='años de historial de los usuarios pesados')
+    parser.add_argument('--heavy-fraction', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=500, help='usuarios por transacción')
+    args = parser.parse_args(argv)
+
+    from utils.migrations import MigrationRunner
+    logging.getLogger('presupuesto.sql').setLevel(logging.ERROR)  # los INSERT masivos son lentos a propósito
+    MigrationRunner().migrate()
+
+    generator = DatasetGenerator(args.users, args.years, args.heavy_fraction, args.seed, args.chunk_size)
+    started = time.perf_counter()
+
+    def progress(done, total):
+        sys.stdout.write(f"\r{done}/{total} usuarios ({time.perf_counter() - started:.0f}s)")
+        sys.stdout.flush()
+
+    counts = generator.run(args.start, progress)
+    print(f"\nBackend {Config.DB_BACKEND}: " + ', '.join(f"{n} {table}" for table, n in counts.items())
+          + f" en {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+"""Prueba de carga con usuarios virtuales que recorren la app completa
+
+Cada usuario virtual repite el recorrido: login, dashboard, alta de gasto, presupuestos,
+metas de ahorro (API), aporte a una meta y logout. Por defecto la app corre en este mismo
+proceso (create_app() con un test client por usuario virtual), sin red ni servidor; con
+--base-url el mismo recorrido va por HTTP contra un servidor ya levantado (gunicorn con
+varios workers) para dimensionarlo. Con la base de benchmarks.dataset:
+
+    DB_BACKEND=sqlite SQLITE_PATH=bench.sqlite3 DB_POOL_MAX_SIZE=32 \\
+        python -m benchmarks.load --users 32 --duration 30 --json carga.json
+
+Reporta por paso del recorrido p50/p95/p99, throughput, errores (5xx o excepción),
+rechazos (4xx) y consultas a la base por request (cabecera X-DB-Queries; en modo HTTP el
+servidor necesita QUERY_DEBUG_HEADERS=1).
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, datetime
+
+from config import Config
+from benchmarks.dataset import PASSWORD, email_for
+
+
+class InProcessClient:
+    """Cliente sobre el test client de Flask (cookies de sesión propias)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.headers, response.get_data()
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Cliente HTTP con cookies; no sigue redirecciones, igual que el test client"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+
+class Recorder:
+    """Latencias, estados y consultas por paso, compartido por todos los usuarios virtuales"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = {}
+        self.journeys = 0
+
+    def record(self, step, seconds, status, queries, error=False):
+        with self._lock:
+            stats = self.steps.setdefault(step, {'latencias': [], 'errores': 0, 'rechazos': 0, 'consultas': []})
+            stats['latencias'].append(seconds * 1000)
+            if error or status >= 500:
+                stats['errores'] += 1
+            elif status >= 400:
+                stats['rechazos'] += 1
+            if queries is not None:
+                stats['consultas'].append(queries)
+
+    def journey_done(self):
+        with self._lock:
+            self.journeys += 1
+
+    def report(self, elapsed):
+        def percentile(values, p):
+            return round(values[min(len(values) - 1, int(len(values) * p))], 2) if values else None
+
+        rows = []
+        for step, stats in self.steps.items():
+            latencies = sorted(stats['latencias'])
+            rows.append({
+                'paso': step,
+                'requests': len(latencies),
+                'rps': round(len(latencies) / elapsed, 1),
+                'p50_ms': percentile(latencies, 0.50),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'errores': stats['errores'],
+                'rechazos': stats['rechazos'],
+                'consultas_por_request': round(statistics.mean(stats['consultas']), 1) if stats['consultas'] else None,
+            })
+        return rows
+
+
+class VirtualUser:
+    """Un usuario del dataset sintético recorriendo la app con su propio cliente"""
+
+    def __init__(self, client, email, recorder, rng, think_time=0.0):
+        self.client = client
+        self.email = email
+        self.recorder = recorder
+        self.rng = rng
+        self.think_time = think_time
+
+    def step(self, name, method, path, data=None, expect=None):
+        """Ejecutar un request y registrarlo; devuelve (status, body) o None si falló"""
+        start = time.perf_counter()
+        try:
+            status, headers, body = self.client.request(method, path, data)
+        except Exception:
+            self.recorder.record(name, time.perf_counter() - start, 0, None, error=True)
+            return None
+
+        queries = headers.get('X-DB-Queries')
+        unexpected = expect is not None and status != expect
+        self.recorder.record(name, time.perf_counter() - start, status,
+                             int(queries) if queries is not None else None, error=unexpected)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, 2 * self.think_time))
+        return None if unexpected else (status, body)
+
+    def run_journey(self, categories):
+        if not self.step('login', 'POST', '/login', {'email': self.email, 'password': PASSWORD}, expect=302):
+            return False
+
+        self.step('dashboard', 'GET', '/')
+        self.step('agregar_gasto', 'POST', '/expenses/add', {
+            'concepto': f"Carga {self.rng.randint(1, 9999)}",
+            'monto': str(self.rng.randint(1, 30)),
+            'categoria_id': str(self.rng.choice(categories)),
+            'fecha': date.today().isoformat(),
+            'esencial': 'on',
+        })
+        self.step('presupuestos', 'GET', '/budgets/')
+
+        result = self.step('ahorros_api', 'GET', '/savings/api')
+        goals = json.loads(result[1]) if result and result[0] == 200 else []
+        open_goals = [goal for goal in goals if not goal['completado']]
+        if open_goals:
+            goal = self.rng.choice(open_goals)
+            self.step('aportar_ahorro', 'POST', f"/savings/add-money/{goal['id']}", {'monto': '1'})
+
+        self.step('logout', 'GET', '/logout')
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=16, help='usuarios virtuales concurrentes')
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos de carga')
+    parser.add_argument('--ramp-up', type=float, default=5.0, help='segundos para arrancar todos los usuarios')
+    parser.add_argument('--think-time', type=float, default=0.0, help='pausa media entre pasos (segundos)')
+    parser.add_argument('--dataset-users', type=int, default=1000, help='usuarios generados con benchmarks.dataset')
+    parser.add_argument('--base-url', help='servidor HTTP a probar en lugar de la app en proceso')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='archivo donde guardar el resultado')
+    args = parser.parse_args(argv)
+
+    logging.getLogger('presupuesto.sql').setLevel(logging.ERROR)
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+        make_client = lambda: HttpClient(base_url)
+    else:
+        Config.QUERY_DEBUG_HEADERS = True
+        from app import create_app
+        app = create_app()
+        make_client = lambda: InProcessClient(app)
+        if Config.DB_POOL_MAX_SIZE < args.users:
+            print(f"Aviso: DB_POOL_MAX_SIZE={Config.DB_POOL_MAX_SIZE} < {args.users} usuarios virtuales; "
+                  f"habrá esperas por conexión")
+
+    from models.category import category_catalog
+    categories = [row['id'] for row in category_catalog.all('gasto')] if not args.base_url else list(range(1, 10))
+
+    rng = random.Random(args.seed)
+    emails = [email_for(index) for index in rng.sample(range(1, args.dataset_users + 1),
+                                                      min(args.users, args.dataset_users))]
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    def run(number, email):
+        time.sleep(args.ramp_up * number / max(1, len(emails)))
+        user = VirtualUser(make_client(), email, recorder, random.Random(f"{args.seed}-{number}"), args.think_time)
+        while time.perf_counter() < deadline:
+            if user.run_journey(categories):
+                recorder.journey_done()
+            else:
+                time.sleep(1)
+
+    threads = [threading.Thread(target=run, args=(number, email), daemon=True) for number, email in enumerate(emails)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    rows = recorder.report(elapsed)
+    print(f"{'paso':<16} {'req':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5} {'4xx':>5} {'cons':>6}")
+    for row in rows:
+        print(f"{row['paso']:<16} {row['requests']:>7} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['errores']:>5} {row['rechazos']:>5} "
+              f"{row['consultas_por_request'] if row['consultas_por_request'] is not None else '-':>6}")
+    total = sum(row['requests'] for row in rows)
+    print(f"\n{recorder.journeys} recorridos, {total} requests en {elapsed:.1f}s "
+          f"({total / elapsed:.1f} req/s, {recorder.journeys / elapsed:.2f} recorridos/s)")
+
+    pool = None
+    if not args.base_url:
+        from utils.database import get_pool
+        pool = get_pool().stats()
+        print(f"Pool: {pool}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'modo': 'http' if args.base_url else 'proceso',
+                'backend': Config.DB_BACKEND if not args.base_url else None,
+                'parametros': vars(args),
+                'duracion': round(elapsed, 2),
+                'recorridos': recorder.journeys,
+                'pool': pool,
+                'pasos': rows,
+            }, f, indent=2)
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
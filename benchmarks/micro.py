@@ -0,0 +1,226 @@
+"""Micro-benchmarks de los métodos de los modelos sobre un dataset de benchmarks.dataset
+
+Mide cada método para una muestra de usuarios de cada perfil y reporta percentiles de
+latencia, consultas por llamada, filas devueltas y (en MySQL) filas leídas por el motor,
+según los contadores Handler_read_* de la sesión. Con --json guarda el resultado y con
+--baseline compara contra un resultado anterior (por ejemplo, del commit previo):
+
+    DB_BACKEND=sqlite SQLITE_PATH=bench.sqlite3 python -m benchmarks.micro --json antes.json
+    DB_BACKEND=sqlite SQLITE_PATH=bench.sqlite3 python -m benchmarks.micro --baseline antes.json
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime
+
+from config import Config
+from benchmarks.dataset import EMAIL_DOMAIN, email_for, profile_for
+
+# Las métricas por llamada salen de la instrumentación de consultas
+Config.QUERY_STATS_ENABLED = True
+
+
+def build_cases(today):
+    """(nombre, función(usuario_id)) de cada método medido"""
+    from models.balance import BalanceModel
+    from models.budget import BudgetModel
+    from models.dashboard import DashboardModel
+    from models.expense import ExpenseModel
+    from models.income import IncomeModel
+    from models.rollup import RollupModel
+    from models.savings import SavingsModel
+
+    budget, savings = BudgetModel(), SavingsModel()
+    expense, income = ExpenseModel(), IncomeModel()
+    balance, rollup, dashboard = BalanceModel(), RollupModel(), DashboardModel()
+    month, year = today.month, today.year
+
+    return [
+        ('BudgetModel.get_by_user', lambda u: budget.get_by_user(u, month, year)),
+        ('BudgetModel.get_budget_summary', lambda u: budget.get_budget_summary(u, month, year)),
+        ('BudgetModel.get_categories_without_budget', lambda u: budget.get_categories_without_budget(u, month, year)),
+        ('SavingsModel.get_by_user', lambda u: savings.get_by_user(u)),
+        ('SavingsModel.get_savings_summary', lambda u: savings.get_savings_summary(u)),
+        ('ExpenseModel.get_by_user', lambda u: expense.get_by_user(u, month, year)),
+        ('ExpenseModel.get_page', lambda u: expense.get_page(u, Config.PAGE_SIZE)),
+        ('ExpenseModel.get_total', lambda u: expense.get_total(u, month, year)),
+        ('IncomeModel.get_by_user', lambda u: income.get_by_user(u, month, year)),
+        ('IncomeModel.get_total', lambda u: income.get_total(u, month, year)),
+        ('BalanceModel.get', lambda u: balance.get(u)),
+        ('RollupModel.get_by_category', lambda u: rollup.get_by_category(u, 'gasto', month, year)),
+        ('DashboardModel.get_snapshot', lambda u: dashboard.get_snapshot(u, parallel=False)),
+    ]
+
+
+class RowsExamined:
+    """Filas leídas por el motor en la conexión actual (solo MySQL: Handler_read_*)"""
+
+    def __init__(self, db):
+        self.db = db
+        self.enabled = Config.DB_BACKEND == 'mysql'
+
+    def read(self):
+        if not self.enabled:
+            return None
+        rows = self.db.execute_query("SHOW SESSION STATUS LIKE 'Handler_read%%'", fetch=True)
+        return sum(int(row['Value']) for row in rows)
+
+
+def sample_users(db, per_profile, heavy_fraction, seed):
+    """Hasta `per_profile` usuarios sintéticos de cada perfil, elegidos con la semilla"""
+    total = db.execute_query(
+        "SELECT COUNT(*) as n FROM usuarios WHERE email LIKE %s",
+        (f"bench-%@{EMAIL_DOMAIN}",),
+        fetch_one=True
+    )['n']
+
+    # El perfil se recalcula desde el número de usuario, sin leer toda la tabla
+    by_profile = {}
+    for index in range(1, total + 1):
+        by_profile.setdefault(profile_for(index, heavy_fraction, seed), []).append(index)
+
+    rng = random.Random(seed)
+    sampled = {}
+    for profile, indexes in sorted(by_profile.items()):
+        emails = [email_for(index) for index in rng.sample(indexes, min(per_profile, len(indexes)))]
+        placeholders = ', '.join(['%s'] * len(emails))
+        rows = db.execute_query(f"SELECT id FROM usuarios WHERE email IN ({placeholders})", emails, fetch=True)
+        sampled[profile] = [row['id'] for row in rows]
+    return sampled
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+
+def run_case(db, rows_examined, name, fn, users, iterations, warmup):
+    """Medir `fn` sobre los usuarios dados; cada llamada en su propia transacción"""
+    from utils.query_stats import query_stats
+
+    for usuario_id in users[:warmup]:
+        fn(usuario_id)
+
+    latencies, queries, rows, examined = [], [], [], []
+    for _ in range(iterations):
+        for usuario_id in users:
+            with db.transaction():
+                before = rows_examined.read()
+                with query_stats.capture() as log:
+                    start = time.perf_counter()
+                    fn(usuario_id)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                after = rows_examined.read()
+            queries.append(len(log))
+            rows.append(sum(entry['filas'] or 0 for entry in log))
+            if before is not None:
+                examined.append(after - before)
+
+    return {
+        'metodo': name,
+        'llamadas': len(latencies),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'media_ms': round(statistics.mean(latencies), 3) if latencies else None,
+        'consultas_por_llamada': round(statistics.mean(queries), 2) if queries else None,
+        'filas_por_llamada': round(statistics.mean(rows), 1) if rows else None,
+        'filas_leidas_por_llamada': round(statistics.mean(examined), 1) if examined else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Imprimir la variación de p50/p95 y consultas contra un resultado anterior"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(row['metodo'], row['perfil']): row for row in json.load(f)['resultados']}
+
+    print(f"\n{'método':<44} {'perfil':<8} {'p50':>16} {'p95':>16} {'consultas':>12}")
+    for row in results:
+        old = baseline.get((row['metodo'], row['perfil']))
+        if not old:
+            continue
+
+        def delta(key):
+            if not old[key] or row[key] is None:
+                return '-'
+            return f"{old[key]}→{row[key]} ({(row[key] - old[key]) / old[key] * 100:+.0f}%)"
+
+        print(f"{row['metodo']:<44} {row['perfil']:<8} {delta('p50_ms'):>16} {delta('p95_ms'):>16} "
+              f"{old['consultas_por_llamada']}→{row['consultas_por_llamada']:>5}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users-per-profile', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--heavy-fraction', type=float, default=0.01, help='la usada al generar el dataset')
+    parser.add_argument('--seed', type=int, default=42, help='la usada al generar el dataset')
+    parser.add_argument('--only', help='subcadenas de nombres de método separadas por coma')
+    parser.add_argument('--json', help='archivo donde guardar el resultado')
+    parser.add_argument('--baseline', help='resultado anterior (--json) para comparar')
+    args = parser.parse_args(argv)
+
+    from utils.database import Database
+    logging.getLogger('presupuesto.sql').setLevel(logging.ERROR)
+
+    db = Database()
+    today = date.today()
+    users = sample_users(db, args.users_per_profile, args.heavy_fraction, args.seed)
+    if not users:
+        raise SystemExit('No hay usuarios sintéticos: generar antes con python -m benchmarks.dataset')
+
+    rows_examined = RowsExamined(db)
+    only = args.only.split(',') if args.only else None
+    results = []
+    print(f"{'método':<44} {'perfil':<8} {'p50':>8} {'p95':>8} {'p99':>8} {'cons':>5} {'filas':>8} {'leídas':>8}")
+    for name, fn in build_cases(today):
+        if only and not any(part in name for part in only):
+            continue
+        for profile, ids in users.items():
+            result = run_case(db, rows_examined, name, fn, ids, args.iterations, args.warmup)
+            result['perfil'] = profile
+            results.append(result)
+            print(f"{name:<44} {profile:<8} {result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8} "
+                  f"{result['consultas_por_llamada']:>5} {result['filas_por_llamada']:>8} "
+                  f"{result['filas_leidas_por_llamada'] if result['filas_leidas_por_llamada'] is not None else '-':>8}")
+            sys.stdout.flush()
+
+    counts = {
+        table: db.execute_query(f"SELECT COUNT(*) as n FROM {table}", fetch_one=True)['n']
+        for table in ('usuarios', 'ingresos', 'gastos', 'presupuestos', 'ahorros')
+    }
+    report = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'backend': Config.DB_BACKEND,
+        'python': platform.python_version(),
+        'dataset': counts,
+        'parametros': vars(args),
+        'resultados': results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import click
+
+def register_commands(app):
+    """Registrar comandos de mantenimiento en `flask`"""
+
+    @app.cli.command('migrate')
+    @click.option('--check', is_flag=True, help='Solo verificar, sin aplicar')
+    def migrate(check):
+        """Aplicar las migraciones pendientes de migrations/"""
+        from utils.migrations import MigrationRunner
+
+        runner = MigrationRunner()
+        if check:
+            pending = runner.check()
+            for migration in pending:
+                click.echo(f"Pendiente: {migration['version']:04d}_{migration['nombre']}")
+            if pending:
+                raise click.ClickException(f"{len(pending)} migraciones pendientes")
+            click.echo("Esquema al día")
+            return
+
+        applied = runner.migrate()
+        click.echo(f"Migraciones aplicadas: {applied or 'ninguna'}")
+
+    @app.cli.command('reconcile-balances')
+    @click.option('--user-id', type=int, default=None, help='Reconciliar solo este usuario')
+    def reconcile_balances(user_id):
+        """Reconstruir saldos_usuario desde las tablas de ingresos y gastos"""
+        from models.balance import BalanceModel
+
+        balance_model = BalanceModel()
+
+        drift = balance_model.find_drift(user_id)
+        for row in drift:
+            click.echo(
+                f"Usuario {row['usuario_id']}: ledger "
+                f"{row['ledger_ingresos']}/{row['ledger_gastos']} -> real "
+                f"{row['real_ingresos']}/{row['real_gastos']}"
+            )
+
+        balance_model.rebuild(user_id)
+        click.echo(f"Saldos reconstruidos ({len(drift)} con diferencias)")
+
+    @app.cli.command('rebuild-rollups')
+    @click.option('--user-id', type=int, default=None, help='Reconstruir solo este usuario')
+    def rebuild_rollups(user_id):
+        """Reconstruir (backfill) resumen_mensual desde ingresos y gastos"""
+        from models.rollup import RollupModel
+
+        rows = RollupModel().rebuild(user_id)
+        click.echo(f"Resumen mensual reconstruido ({rows} celdas)")
+
+    @app.cli.command('check-rollups')
+    @click.option('--user-id', type=int, default=None, help='Verificar solo este usuario')
+    def check_rollups(user_id):
+        """Comparar resumen_mensual con las tablas de movimientos"""
+        from models.rollup import RollupModel
+
+        inconsistencies = RollupModel().find_inconsistencies(user_id)
+        for row in inconsistencies:
+            click.echo(
+                f"Usuario {row['usuario_id']} {row['mes_year']} {row['tipo']} "
+                f"cat {row['categoria_id']}: resumen {row['resumen_total']} "
+                f"({row['resumen_cantidad']}) -> real {row['real_total']} ({row['real_cantidad']})"
+            )
+
+        if inconsistencies:
+            raise click.ClickException(f"{len(inconsistencies)} celdas inconsistentes")
+        click.echo("Resumen mensual consistente")
+
+    @app.cli.command('create-user')
+    @click.option('--nombre', required=True)
+    @click.option('--email', required=True)
+    @click.password_option('--clave')
+    @click.option('--admin', is_flag=True, help='Crear con rol de administrador')
+    def create_user(nombre, email, clave, admin):
+        """Crear un usuario (útil para arrancar una base nueva, p. ej. con DB_BACKEND=sqlite)"""
+        from models.user import UserModel, EmailAlreadyRegisteredError
+
+        try:
+            user_id = UserModel().create(nombre, email, clave, rol_id=1 if admin else 2)
+        except EmailAlreadyRegisteredError:
+            raise click.ClickException(f"Ya existe un usuario con el email {email}")
+        click.echo(f"Usuario {user_id} creado{' (administrador)' if admin else ''}")
+
+    @app.cli.command('budget-alerts')
+    @click.option('--mes', default=None, help='Mes a evaluar (YYYY-MM); por defecto el actual')
+    @click.option('--chunk-size', type=int, default=None, help='Usuarios por transacción')
+    def budget_alerts(mes, chunk_size):
+        """Evaluar los presupuestos de todos los usuarios y registrar alertas (80%, 100%, excedido)"""
+        import re
+        import time
+        from models.budget_alert import BudgetAlertModel
+
+        if mes and not re.match(r'^\d{4}-(0[1-9]|1[0-2])$', mes):
+            raise click.BadParameter('Formato esperado YYYY-MM', param_hint='--mes')
+
+        started = time.perf_counter()
+        counts = BudgetAlertModel().evaluate(mes, chunk_size)
+        click.echo(
+            f"{counts['usuarios']} usuarios evaluados: {counts['nuevas']} alertas nuevas, "
+            f"{counts['resueltas']} resueltas ({time.perf_counter() - started:.1f}s)"
+        )
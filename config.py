@@ -11,6 +11,75 @@ class Config:
     MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', '')
     MYSQL_DB = os.getenv('MYSQL_DB', 'presupuesto_db')
     MYSQL_PORT = int(os.getenv('MYSQL_PORT', 3306))
+
+    # Motor de base de datos: 'mysql' (servidor) o 'sqlite' (embebido, para pruebas y benchmarks locales)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'presupuesto.sqlite3')           # ':memory:' = base temporal del proceso
+    SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', 10))       # segundos esperando el lock de escritura
+
+    # Pool de conexiones compartido (ver utils/database.py)
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))           # segundos esperando una conexión libre
+    DB_POOL_MAX_LIFETIME = int(os.getenv('DB_POOL_MAX_LIFETIME', 1800))  # segundos antes de reciclar una conexión
+    DB_POOL_PING_INTERVAL = int(os.getenv('DB_POOL_PING_INTERVAL', 30))  # ping al entregar si estuvo inactiva más de esto
+    DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+    
+    # Aplicar y verificar migraciones (migrations/*.sql) al arrancar la app
+    DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', '1') == '1'
+    
+    # Snapshot del dashboard: leer las listas en paralelo con los totales (usa una segunda
+    # conexión si hay una libre en el pool; si no, se leen en serie en la del request)
+    DASHBOARD_PARALLEL_QUERIES = os.getenv('DASHBOARD_PARALLEL_QUERIES', '0') == '1'
+    DASHBOARD_WORKERS = int(os.getenv('DASHBOARD_WORKERS', 4))
+    
+    # Catálogo de categorías en memoria: cada cuántos segundos comprobar si cambió
+    CATEGORY_CATALOG_TTL = int(os.getenv('CATEGORY_CATALOG_TTL', 60))
+    
+    # Estadísticas del panel de administración: segundos de vigencia del snapshot
+    ADMIN_STATS_TTL = int(os.getenv('ADMIN_STATS_TTL', 300))
+    
+    # Paginación keyset de listados de ingresos/gastos
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+    API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+    
+    # Series temporales (/trends/api): máximo de períodos por respuesta (días, semanas o meses)
+    TIMESERIES_MAX_BUCKETS = int(os.getenv('TIMESERIES_MAX_BUCKETS', 3700))
+    
+    # ETag de páginas y APIs por usuario: cambiar al desplegar para invalidar las copias del navegador
+    ETAG_SALT = os.getenv('ETAG_SALT', '')
+    
+    # Caché de fragmentos renderizados (tarjetas de resumen, listas) por usuario y versión de datos
+    FRAGMENT_CACHE_ENABLED = os.getenv('FRAGMENT_CACHE_ENABLED', '1') == '1'
+    FRAGMENT_CACHE_MAX_BYTES = int(os.getenv('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Job de alertas de presupuesto (flask budget-alerts): usuarios por transacción
+    BUDGET_ALERT_CHUNK_SIZE = int(os.getenv('BUDGET_ALERT_CHUNK_SIZE', 2000))
+    
+    # Importación masiva de extractos (CSV/OFX)
+    IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', 20000))
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+    
+    # Vistas async para las APIs JSON (requiere requirements-async.txt); bajo WSGI no suman
+    # throughput, solo bajan la latencia de /async/resumen (ver utils/async_database.py)
+    ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', '0') == '1'
+    ASYNC_DB_POOL_MAX_SIZE = int(os.getenv('ASYNC_DB_POOL_MAX_SIZE', 20))
+    
+    # Instrumentación de consultas: log de lentas, detección de N+1 y cabeceras X-DB-* (siempre en debug)
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', '1') == '1'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    QUERY_LOG_SIZE = int(os.getenv('QUERY_LOG_SIZE', 100))
+    # Máximo de fingerprints y de endpoints acumulados; al llenarse se descarta el menos usado
+    QUERY_STATS_MAX_ENTRIES = int(os.getenv('QUERY_STATS_MAX_ENTRIES', 500))
+    QUERY_DEBUG_HEADERS = os.getenv('QUERY_DEBUG_HEADERS', '0') == '1'
+    
+    # Hash de contraseñas: costo de bcrypt y pool de procesos dedicado
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    BCRYPT_POOL = os.getenv('BCRYPT_POOL', '1') == '1'
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', min(4, os.cpu_count() or 1)))
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', 64))
+    BCRYPT_TIMEOUT = float(os.getenv('BCRYPT_TIMEOUT', 10))
     
     # Configuración de sesión - NO permanente (se cierra al cerrar navegador)
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=5)
\ No newline at end of file
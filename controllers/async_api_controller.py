@@ -0,0 +1,137 @@
+from flask import Blueprint, request, session, jsonify
+from models.budget import BudgetModel
+from models.expense import ExpenseModel
+from models.savings import SavingsModel
+from utils.async_database import async_db
+from utils.helpers import decimal_to_float, month_range, parse_page_args
+from config import Config
+from datetime import datetime
+import asyncio
+
+class AsyncApiController:
+    """Versión async de las APIs JSON (modo ASYNC_VIEWS): mismas consultas, driver aiomysql
+
+    Bajo WSGI no mejora el throughput (ver utils/async_database.py): solo /async/resumen
+    gana latencia al ejecutar sus consultas en paralelo.
+    """
+
+    def __init__(self):
+        self.bp = Blueprint('async_api', __name__, url_prefix='/async')
+        self.budget_model = BudgetModel()
+        self.expense_model = ExpenseModel()
+        self.savings_model = SavingsModel()
+        self.register_routes()
+
+    def register_routes(self):
+        self.bp.route('/budgets')(self.api_budgets)
+        self.bp.route('/budgets/progress')(self.api_budget_progress)
+        self.bp.route('/savings')(self.api_savings)
+        self.bp.route('/expenses')(self.api_expenses)
+        self.bp.route('/resumen')(self.api_resumen)
+
+    async def api_budgets(self):
+        """Presupuestos del mes (equivale a /budgets/api)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        return jsonify(await self._budgets(session['user_id']))
+
+    async def api_budget_progress(self):
+        """Progreso de presupuestos para gráficos (equivale a /budgets/api/progress)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        budgets = await self._budgets(session['user_id'])
+        return jsonify([self._progress_item(budget) for budget in budgets])
+
+    async def api_savings(self):
+        """Metas de ahorro (equivale a /savings/api)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        return jsonify(await self._savings(session['user_id']))
+
+    async def api_expenses(self):
+        """Página de gastos con cursor (equivale a /expenses/api)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        try:
+            expenses, next_cursor = await self._expenses(session['user_id'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({'items': expenses, 'next_cursor': next_cursor})
+
+    async def api_resumen(self):
+        """Presupuestos, ahorros y gastos del mes en una respuesta: las tres consultas en paralelo"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        user_id = session['user_id']
+        try:
+            budgets, savings, (expenses, next_cursor) = await asyncio.gather(
+                self._budgets(user_id), self._savings(user_id), self._expenses(user_id)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        summary = self.budget_model.summarize(budgets)
+        return jsonify({
+            'presupuestos': budgets,
+            'resumen_presupuestos': {key: decimal_to_float(value) for key, value in summary.items()},
+            'ahorros': savings,
+            'gastos': {'items': expenses, 'next_cursor': next_cursor}
+        })
+
+    async def _budgets(self, user_id):
+        month = request.args.get('month', datetime.now().month, type=int)
+        year = request.args.get('year', datetime.now().year, type=int)
+
+        budgets = await async_db.fetch_all(*self.budget_model.progress_query(user_id, month, year))
+        for budget in budgets:
+            for field in ('monto_maximo', 'gasto_actual', 'saldo_restante', 'porcentaje_uso'):
+                budget[field] = decimal_to_float(budget[field])
+        return budgets
+
+    async def _savings(self, user_id):
+        savings = await async_db.fetch_all(*self.savings_model.by_user_query(user_id))
+        for saving in savings:
+            saving['meta_total'] = decimal_to_float(saving['meta_total'])
+            saving['ahorrado_actual'] = decimal_to_float(saving['ahorrado_actual'])
+            saving['porcentaje_completado'] = decimal_to_float(saving['porcentaje_completado'])
+            if saving['fecha_inicio']:
+                saving['fecha_inicio'] = saving['fecha_inicio'].strftime('%Y-%m-%d')
+            if saving['fecha_objetivo']:
+                saving['fecha_objetivo'] = saving['fecha_objetivo'].strftime('%Y-%m-%d')
+        return savings
+
+    async def _expenses(self, user_id):
+        cursor, limit, start, end = parse_page_args(request.args, Config.PAGE_SIZE, Config.API_MAX_PAGE_SIZE)
+
+        # Sin rango explícito se mantiene el filtro por mes (por defecto el actual)
+        if not start and not end:
+            month = request.args.get('month', datetime.now().month, type=int)
+            year = request.args.get('year', datetime.now().year, type=int)
+            start, end = month_range(year, month)
+
+        query, params = self.expense_model.page_query(user_id, limit, cursor, start, end)
+        expenses, next_cursor = self.expense_model.page_result(await async_db.fetch_all(query, params), limit)
+        for expense in expenses:
+            expense['monto'] = decimal_to_float(expense['monto'])
+            if expense['fecha']:
+                expense['fecha'] = expense['fecha'].strftime('%Y-%m-%d')
+        return expenses, next_cursor
+
+    @staticmethod
+    def _progress_item(budget):
+        return {
+            'categoria': budget['categoria_nombre'],
+            'presupuesto': budget['monto_maximo'],
+            'gastado': budget['gasto_actual'],
+            'porcentaje': budget['porcentaje_uso'],
+            'color': budget['color']
+        }
+
+# Crear instancia del controlador
+async_api_controller = AsyncApiController()
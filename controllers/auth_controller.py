@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from models.user import UserModel
+from models.user import UserModel, EmailAlreadyRegisteredError
+from utils.passwords import PasswordPoolBusyError
 
 class AuthController:
     def __init__(self):
@@ -22,7 +23,11 @@ class AuthController:
                 flash('Por favor completa todos los campos', 'error')
                 return render_template('auth/login.html')
             
-            user = self.user_model.login(email, password)
+            try:
+                user = self.user_model.login(email, password)
+            except PasswordPoolBusyError as e:
+                flash(str(e), 'error')
+                return render_template('auth/login.html'), 503
             
             if user:
                 # Configurar sesión NO permanente (se cierra al cerrar navegador)
@@ -59,14 +64,13 @@ class AuthController:
                 flash('La contraseña debe tener al menos 6 caracteres', 'error')
                 return render_template('auth/register.html')
             
-            if self.user_model.email_exists(email):
-                flash('El email ya está registrado', 'error')
-                return render_template('auth/register.html')
-            
             try:
                 user_id = self.user_model.create(nombre, email, password)
                 flash('¡Registro exitoso! Ahora puedes iniciar sesión', 'success')
                 return redirect(url_for('auth.login'))
+            except EmailAlreadyRegisteredError:
+                flash('El email ya está registrado', 'error')
+                return render_template('auth/register.html')
             except Exception as e:
                 flash('Error en el registro: ' + str(e), 'error')
         
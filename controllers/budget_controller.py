@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, session, redirect, url_fo
 from models.budget import BudgetModel
 from models.expense import ExpenseModel
 from utils.helpers import decimal_to_float
+from utils.http_cache import data_version_etag
 from datetime import datetime
 
 class BudgetController:
@@ -18,7 +19,10 @@ class BudgetController:
         self.bp.route('/delete/<int:budget_id>', methods=['POST'])(self.delete)
         self.bp.route('/api')(self.api_budgets)
         self.bp.route('/api/progress')(self.api_budget_progress)
+        self.bp.route('/api/alerts')(self.api_alerts)
+        self.bp.route('/alerts/read', methods=['POST'])(self.mark_alerts_read)
 
+    @data_version_etag
     def index(self):
         """Página de listado de presupuestos"""
         if 'user_id' not in session:
@@ -28,16 +32,20 @@ class BudgetController:
         month = request.args.get('month', datetime.now().month, type=int)
         year = request.args.get('year', datetime.now().year, type=int)
         
-        budgets = self.budget_model.get_by_user(user_id, month, year)
+        # Filas por categoría y resumen general salen de la misma consulta
+        progress = self.budget_model.get_progress(user_id, month, year)
+        budgets = progress['budgets']
+        summary = progress['summary']
         
         # Obtener TODAS las categorías de gastos
         all_categories = self.expense_model.get_categories()
         
-        # Obtener el resumen general
-        summary = self.budget_model.get_budget_summary(user_id, month, year)
+        # Alertas pendientes del mes (las genera el job flask budget-alerts)
+        alerts = self.budget_model.alert_model.get_active(user_id, f"{year}-{month:02d}")
         
         return render_template('budgets/index.html',
                              budgets=budgets,
+                             alerts=alerts,
                              categories=all_categories,  # ← CAMBIO: Ahora pasamos TODAS las categorías
                              expense_categories=all_categories,
                              summary=summary,
@@ -106,6 +114,7 @@ class BudgetController:
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @data_version_etag
     def api_budgets(self):
         """API para obtener presupuestos (AJAX)"""
         if 'user_id' not in session:
@@ -115,7 +124,7 @@ class BudgetController:
         month = request.args.get('month', datetime.now().month, type=int)
         year = request.args.get('year', datetime.now().year, type=int)
         
-        budgets = self.budget_model.get_by_user(user_id, month, year)
+        budgets = self.budget_model.get_progress(user_id, month, year)['budgets']
         
         # Convertir decimales a float
         for budget in budgets:
@@ -126,6 +135,7 @@ class BudgetController:
         
         return jsonify(budgets)
 
+    @data_version_etag
     def api_budget_progress(self):
         """API para obtener progreso de presupuestos (AJAX)"""
         if 'user_id' not in session:
@@ -135,11 +145,11 @@ class BudgetController:
         month = request.args.get('month', datetime.now().month, type=int)
         year = request.args.get('year', datetime.now().year, type=int)
         
-        budgets = self.budget_model.get_by_user(user_id, month, year)
+        progress = self.budget_model.get_progress(user_id, month, year)
         
         # Preparar datos para gráfico
         progress_data = []
-        for budget in budgets:
+        for budget in progress['budgets']:
             progress_data.append({
                 'categoria': budget['categoria_nombre'],
                 'presupuesto': decimal_to_float(budget['monto_maximo']),
@@ -150,5 +160,35 @@ class BudgetController:
         
         return jsonify(progress_data)
 
+    @data_version_etag
+    def api_alerts(self):
+        """API de alertas de presupuesto no leídas del mes (AJAX)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        month = request.args.get('month', datetime.now().month, type=int)
+        year = request.args.get('year', datetime.now().year, type=int)
+        alerts = self.budget_model.alert_model.get_active(session['user_id'], f"{year}-{month:02d}")
+        
+        for alert in alerts:
+            for key in ('porcentaje_uso', 'gasto_actual', 'monto_maximo'):
+                alert[key] = decimal_to_float(alert[key])
+            alert['fecha_alerta'] = alert['fecha_alerta'].strftime('%Y-%m-%d %H:%M:%S')
+        
+        return jsonify(alerts)
+
+    def mark_alerts_read(self):
+        """Marcar como leídas las alertas del mes"""
+        if 'user_id' not in session:
+            return jsonify({'success': False, 'error': 'No autorizado'}), 401
+        
+        month = request.form.get('month', datetime.now().month, type=int)
+        year = request.form.get('year', datetime.now().year, type=int)
+        try:
+            self.budget_model.alert_model.mark_read(session['user_id'], f"{year}-{month:02d}")
+            return jsonify({'success': True})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
 # Crear instancia del controlador
 budget_controller = BudgetController()
\ No newline at end of file
@@ -1,31 +1,24 @@
-from flask import Blueprint, render_template, session, redirect, url_for
-import mysql.connector
-from datetime import datetime
+from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
+from models.dashboard import DashboardModel
+from models.timeseries import TimeSeriesModel
+from utils.helpers import decimal_to_float, decode_activity_cursor
+from utils.http_cache import data_version_etag, mark_uncacheable
 from config import Config
+from datetime import datetime, date, timedelta
 
 class DashboardController:
     def __init__(self):
         self.bp = Blueprint('dashboard', __name__)
+        self.dashboard_model = DashboardModel()
+        self.timeseries_model = TimeSeriesModel()
         self.register_routes()
     
-    def get_db_connection(self):
-        """Crear conexión a la base de datos"""
-        try:
-            conn = mysql.connector.connect(
-                host=Config.MYSQL_HOST,
-                user=Config.MYSQL_USER,
-                password=Config.MYSQL_PASSWORD,
-                database=Config.MYSQL_DB,
-                port=Config.MYSQL_PORT
-            )
-            return conn
-        except Exception as e:
-            print(f"Error conectando a la BD: {e}")
-            return None
-    
     def register_routes(self):
         self.bp.route('/')(self.index)
+        self.bp.route('/activity/api')(self.api_activity)
+        self.bp.route('/trends/api')(self.api_trends)
     
+    @data_version_etag
     def index(self):
         if 'user_id' not in session:
             return redirect(url_for('auth.login'))
@@ -34,133 +27,16 @@ class DashboardController:
         now = datetime.now()
         
         try:
-            conn = self.get_db_connection()
-            if not conn:
-                return render_template('dashboard/index.html',
-                                    total_ingresos=0, total_gastos=0, saldo=0,
-                                    ingresos_mes=0, gastos_mes=0,
-                                    ultimos_ingresos=[], ultimos_gastos=[],
-                                    total_ahorros=0, meta_ahorros=0, metas_activas=[],
-                                    now=now)
-            
-            cursor = conn.cursor(dictionary=True)
-            
-            # 1. INGRESOS TOTALES (TODOS los ingresos, sin filtro de año)
-            cursor.execute("""
-                SELECT SUM(monto) as total 
-                FROM ingresos 
-                WHERE usuario_id = %s
-            """, (user_id,))
-            total_ingresos_result = cursor.fetchone()
-            total_ingresos = total_ingresos_result['total'] if total_ingresos_result['total'] else 0
-            
-            # 2. GASTOS TOTALES (TODOS los gastos, sin filtro de año)
-            cursor.execute("""
-                SELECT SUM(monto) as total 
-                FROM gastos 
-                WHERE usuario_id = %s
-            """, (user_id,))
-            total_gastos_result = cursor.fetchone()
-            total_gastos = total_gastos_result['total'] if total_gastos_result['total'] else 0
-            
-            # 3. SALDO ACTUAL (ingresos totales - gastos totales)
-            saldo = total_ingresos - total_gastos
-            
-            # 4. INGRESOS DEL MES ACTUAL (para referencia)
-            current_month = now.strftime('%Y-%m')
-            cursor.execute("""
-                SELECT SUM(monto) as total 
-                FROM ingresos 
-                WHERE usuario_id = %s AND DATE_FORMAT(fecha, '%%Y-%%m') = %s
-            """, (user_id, current_month))
-            ingresos_mes_result = cursor.fetchone()
-            ingresos_mes = ingresos_mes_result['total'] if ingresos_mes_result['total'] else 0
-            
-            # 5. GASTOS DEL MES ACTUAL (para referencia)
-            cursor.execute("""
-                SELECT SUM(monto) as total 
-                FROM gastos 
-                WHERE usuario_id = %s AND DATE_FORMAT(fecha, '%%Y-%%m') = %s
-            """, (user_id, current_month))
-            gastos_mes_result = cursor.fetchone()
-            gastos_mes = gastos_mes_result['total'] if gastos_mes_result['total'] else 0
-            
-            # 6. DATOS DE AHORROS
-            cursor.execute("""
-                SELECT 
-                    COALESCE(SUM(ahorrado_actual), 0) as total_ahorrado,
-                    COALESCE(SUM(meta_total), 0) as meta_total,
-                    COUNT(*) as total_metas
-                FROM ahorros 
-                WHERE usuario_id = %s AND completado = 0
-            """, (user_id,))
-            ahorros_result = cursor.fetchone()
-            total_ahorros = float(ahorros_result['total_ahorrado']) if ahorros_result and ahorros_result['total_ahorrado'] else 0
-            meta_ahorros = float(ahorros_result['meta_total']) if ahorros_result and ahorros_result['meta_total'] else 0
-            
-            # 7. METAS ACTIVAS
-            cursor.execute("""
-                SELECT 
-                    id,
-                    concepto, 
-                    meta_total, 
-                    ahorrado_actual, 
-                    ROUND((ahorrado_actual / meta_total) * 100, 0) as porcentaje_completado,
-                    fecha_objetivo,
-                    descripcion
-                FROM ahorros 
-                WHERE usuario_id = %s AND completado = 0
-                ORDER BY fecha_objetivo ASC
-                LIMIT 3
-            """, (user_id,))
-            metas_activas = cursor.fetchall()
-            
-            # Convertir decimales a float
-            for meta in metas_activas:
-                meta['meta_total'] = float(meta['meta_total'])
-                meta['ahorrado_actual'] = float(meta['ahorrado_actual'])
-                meta['porcentaje_completado'] = float(meta['porcentaje_completado'])
-            
-            # 8. ÚLTIMOS 5 INGRESOS (más recientes, sin filtro de año)
-            cursor.execute("""
-                SELECT i.*, ci.nombre as categoria_nombre, ci.color, ci.icono
-                FROM ingresos i 
-                LEFT JOIN categorias_ingresos ci ON i.categoria_id = ci.id 
-                WHERE i.usuario_id = %s
-                ORDER BY i.fecha DESC, i.id DESC LIMIT 5
-            """, (user_id,))
-            ultimos_ingresos = cursor.fetchall()
-            
-            # 9. ÚLTIMOS 5 GASTOS (más recientes, sin filtro de año)
-            cursor.execute("""
-                SELECT g.*, cg.nombre as categoria_nombre, cg.color, cg.icono
-                FROM gastos g 
-                LEFT JOIN categorias_gastos cg ON g.categoria_id = cg.id 
-                WHERE g.usuario_id = %s
-                ORDER BY g.fecha DESC, g.id DESC LIMIT 5
-            """, (user_id,))
-            ultimos_gastos = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
+            # Totales, mes actual, ahorros, metas activas y últimos movimientos en un solo snapshot
+            snapshot = self.dashboard_model.get_snapshot(user_id, now)
             
-            return render_template('dashboard/index.html',
-                                total_ingresos=total_ingresos,
-                                total_gastos=total_gastos,
-                                saldo=saldo,
-                                ingresos_mes=ingresos_mes,
-                                gastos_mes=gastos_mes,
-                                ultimos_ingresos=ultimos_ingresos,
-                                ultimos_gastos=ultimos_gastos,
-                                total_ahorros=total_ahorros,
-                                meta_ahorros=meta_ahorros,
-                                metas_activas=metas_activas,
-                                now=now)
+            return render_template('dashboard/index.html', now=now, **snapshot)
                                 
         except Exception as e:
             print(f"Error en dashboard: {e}")
             import traceback
             traceback.print_exc()
+            mark_uncacheable()
             return render_template('dashboard/index.html',
                                 total_ingresos=0, total_gastos=0, saldo=0,
                                 ingresos_mes=0, gastos_mes=0,
@@ -168,4 +44,76 @@ class DashboardController:
                                 total_ahorros=0, meta_ahorros=0, metas_activas=[],
                                 now=datetime.now())
 
-dashboard_controller = DashboardController()
\ No newline at end of file
+    @data_version_etag
+    def api_activity(self):
+        """API del feed de actividad: ingresos y gastos por momento de registro (AJAX)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        cursor = request.args.get('cursor')
+        if cursor and decode_activity_cursor(cursor) is None:
+            return jsonify({'error': 'Cursor inválido'}), 400
+        limit = request.args.get('limit', Config.PAGE_SIZE, type=int)
+        if limit is None or limit < 1:
+            return jsonify({'error': 'limit inválido'}), 400
+        
+        items, next_cursor = self.dashboard_model.get_activity(
+            session['user_id'], min(limit, Config.API_MAX_PAGE_SIZE), cursor
+        )
+        
+        for item in items:
+            item['monto'] = decimal_to_float(item['monto'])
+            if item['fecha']:
+                item['fecha'] = item['fecha'].strftime('%Y-%m-%d')
+            if item['fecha_registro']:
+                item['fecha_registro'] = item['fecha_registro'].strftime('%Y-%m-%d %H:%M:%S')
+            if item['esencial'] is not None:
+                item['esencial'] = bool(item['esencial'])
+        
+        return jsonify({'items': items, 'next_cursor': next_cursor})
+
+    @data_version_etag
+    def api_trends(self):
+        """API de series temporales de ingresos, gastos y neto (AJAX)
+
+        Parámetros: desde/hasta (YYYY-MM-DD, inclusivos; por defecto los últimos 12 meses),
+        granularidad (dia, semana o mes) y por_categoria=1.
+        """
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        granularity = request.args.get('granularidad', 'mes')
+        if granularity not in TimeSeriesModel.GRANULARITIES:
+            return jsonify({'error': 'granularidad inválida (dia, semana o mes)'}), 400
+        
+        try:
+            today = date.today()
+            desde = request.args.get('desde')
+            hasta = request.args.get('hasta')
+            end = (datetime.strptime(hasta, '%Y-%m-%d').date() if hasta else today) + timedelta(days=1)
+            if desde:
+                start = datetime.strptime(desde, '%Y-%m-%d').date()
+            else:
+                # Mes actual y los 11 anteriores
+                months = today.year * 12 + today.month - 1 - 11
+                start = date(months // 12, months % 12 + 1, 1)
+        except ValueError:
+            return jsonify({'error': 'Fecha inválida (YYYY-MM-DD)'}), 400
+        
+        if start >= end:
+            return jsonify({'error': 'El rango de fechas está vacío'}), 400
+        if TimeSeriesModel.bucket_count(start, end, granularity) > Config.TIMESERIES_MAX_BUCKETS:
+            return jsonify({'error': f'El rango supera {Config.TIMESERIES_MAX_BUCKETS} períodos; '
+                                     f'usa una granularidad mayor'}), 400
+        
+        series = self.timeseries_model.get_series(
+            session['user_id'], start, end, granularity, request.args.get('por_categoria') == '1'
+        )
+        series.update({
+            'granularidad': granularity,
+            'desde': start.isoformat(),
+            'hasta': (end - timedelta(days=1)).isoformat()
+        })
+        return jsonify(series)
+
+dashboard_controller = DashboardController()
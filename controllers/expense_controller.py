@@ -1,14 +1,16 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash, jsonify
-from models.expense import ExpenseModel
-from models.budget import BudgetModel  # ← NUEVO: Importar BudgetModel
-from utils.helpers import decimal_to_float
+from models.expense import ExpenseModel, ExpenseRejectedError
+from models.balance import BalanceModel
+from utils.helpers import decimal_to_float, month_range, parse_page_args
+from utils.http_cache import data_version_etag, mark_uncacheable
+from config import Config
 from datetime import datetime
 
 class ExpenseController:
     def __init__(self):
         self.bp = Blueprint('expenses', '__name__', url_prefix='/expenses')
         self.expense_model = ExpenseModel()
-        self.budget_model = BudgetModel()  # ← NUEVO: Instanciar BudgetModel
+        self.balance_model = BalanceModel()
         self.register_routes()
 
     def register_routes(self):
@@ -17,6 +19,7 @@ class ExpenseController:
         self.bp.route('/delete/<int:expense_id>', methods=['POST'])(self.delete)
         self.bp.route('/api')(self.api_expenses)
 
+    @data_version_etag
     def index(self):
         """Página de listado de gastos"""
         if 'user_id' not in session:
@@ -31,46 +34,35 @@ class ExpenseController:
             año, mes = mes_seleccionado.split('-')
             año = int(año)
             mes = int(mes)
+            inicio, fin = month_range(año, mes)
         except (ValueError, AttributeError):
-            # Si hay error en el formato, usar mes actual
+            # Si hay error en el formato o el mes no existe, usar mes actual
             ahora = datetime.now()
             mes_seleccionado = ahora.strftime('%Y-%m')
             año = ahora.year
             mes = ahora.month
+            inicio, fin = month_range(año, mes)
         
-        # Obtener datos del mes seleccionado
-        expenses = self.expense_model.get_by_user(user_id, mes, año)
+        # Obtener una página del mes seleccionado (keyset sobre fecha, id)
+        expenses, next_cursor = self.expense_model.get_page(
+            user_id, Config.PAGE_SIZE, request.args.get('cursor'), inicio, fin
+        )
         categories = self.expense_model.get_categories()
-        total_mes = self.expense_model.get_total(user_id, mes, año)
         
-        # Obtener total general de todos los gastos (sin filtro de mes)
-        total_general = self.expense_model.get_total(user_id)
-        total_registros = len(expenses)
+        # Total y cantidad del mes desde el resumen mensual (no dependen de la página)
+        resumen_mes = self.expense_model.rollup_model.get_month_summary(user_id, 'gasto', mes, año)
+        total_mes = resumen_mes['total']
+        total_registros = resumen_mes['cantidad']
         
-        # ✅ CALCULAR SALDO ACTUAL (INGRESOS TOTALES - GASTOS TOTALES) - NUEVO
+        # ✅ TOTAL GENERAL Y SALDO ACTUAL desde el ledger incremental (O(1))
         try:
-            # Obtener total de ingresos
-            ingresos_query = "SELECT COALESCE(SUM(monto), 0) as total_ingresos FROM ingresos WHERE usuario_id = %s"
-            ingresos_result = self.expense_model.db.execute_query(ingresos_query, (user_id,), fetch_one=True)
-            total_ingresos = float(ingresos_result['total_ingresos']) if ingresos_result and ingresos_result['total_ingresos'] else 0
-            
-            # Obtener total de gastos (usando el mismo método que en dashboard)
-            gastos_query = "SELECT COALESCE(SUM(monto), 0) as total_gastos FROM gastos WHERE usuario_id = %s"
-            gastos_result = self.expense_model.db.execute_query(gastos_query, (user_id,), fetch_one=True)
-            total_gastos = float(gastos_result['total_gastos']) if gastos_result and gastos_result['total_gastos'] else 0
-            
-            # Calcular saldo actual
-            saldo_actual = total_ingresos - total_gastos
-            
-            # Debug: imprimir valores para verificar
-            print(f"DEBUG - User ID: {user_id}")
-            print(f"DEBUG - Total Ingresos: {total_ingresos}")
-            print(f"DEBUG - Total Gastos: {total_gastos}")
-            print(f"DEBUG - Saldo Actual: {saldo_actual}")
-            print(f"DEBUG - Total General (método anterior): {total_general}")
-            
+            balance = self.balance_model.get(user_id)
+            total_general = balance['total_gastos'] if balance else 0
+            saldo_actual = float(balance['saldo']) if balance else 0
         except Exception as e:
             print(f"Error calculando saldo actual: {e}")
+            mark_uncacheable()
+            total_general = 0
             saldo_actual = 0
     
         return render_template('transactions/expenses.html',
@@ -81,6 +73,8 @@ class ExpenseController:
                              total_registros=total_registros,
                              saldo_actual=saldo_actual,  # ← NUEVO
                              mes_seleccionado=mes_seleccionado,
+                             next_cursor=next_cursor,
+                             is_first_page=not request.args.get('cursor'),
                              now=datetime.now())
 
     def add(self):
@@ -111,46 +105,17 @@ class ExpenseController:
                     flash('El monto debe ser mayor a 0', 'error')
                     return redirect(url_for('expenses.index'))
                 
-                # ✅ VALIDACIÓN 2: Verificar que el gasto no supere el saldo disponible
-                # Obtener saldo actual (ingresos totales - gastos totales)
-                ingresos_query = "SELECT COALESCE(SUM(monto), 0) as total_ingresos FROM ingresos WHERE usuario_id = %s"
-                ingresos_result = self.expense_model.db.execute_query(ingresos_query, (user_id,), fetch_one=True)
-                total_ingresos = float(ingresos_result['total_ingresos']) if ingresos_result and ingresos_result['total_ingresos'] else 0
-                
-                gastos_query = "SELECT COALESCE(SUM(monto), 0) as total_gastos FROM gastos WHERE usuario_id = %s"
-                gastos_result = self.expense_model.db.execute_query(gastos_query, (user_id,), fetch_one=True)
-                total_gastos = float(gastos_result['total_gastos']) if gastos_result and gastos_result['total_gastos'] else 0
-                
-                saldo_actual = total_ingresos - total_gastos
-                
-                # Verificar si el nuevo gasto supera el saldo disponible
-                if monto_float > saldo_actual:
-                    flash(f'No puedes gastar más de tu saldo disponible. Saldo actual: ${saldo_actual:,.0f}', 'error')
-                    return redirect(url_for('expenses.index'))
-                
-                # ✅ VALIDACIÓN 3: NUEVA - Verificar que el gasto no supere el presupuesto de la categoría
-                # Obtener el presupuesto de la categoría seleccionada
-                budget = self.budget_model.get_budget_by_category(user_id, int(categoria_id))
-                
-                if budget:
-                    presupuesto_maximo = float(budget['monto_maximo'])
-                    gasto_actual = float(budget['gasto_actual'])
-                    saldo_presupuesto = presupuesto_maximo - gasto_actual
-                    
-                    # Verificar si el nuevo gasto supera el presupuesto disponible
-                    if monto_float > saldo_presupuesto:
-                        categoria_nombre = self._get_category_name(int(categoria_id))
-                        flash(f'No puedes gastar más del presupuesto asignado para {categoria_nombre}. '
-                              f'Presupuesto disponible: ${saldo_presupuesto:,.0f}', 'error')
-                        return redirect(url_for('expenses.index'))
-                
-                # Si pasa todas las validaciones, crear el gasto
-                expense_id = self.expense_model.create(
+                # ✅ VALIDACIONES 2 y 3: saldo disponible y presupuesto de la categoría,
+                # comprobados e insertados en una sola transacción con la fila de saldo bloqueada
+                expense_id = self.expense_model.create_checked(
                     user_id, concepto, monto_float, 
                     int(categoria_id), fecha, esencial, descripcion
                 )
                 flash('¡Gasto agregado exitosamente!', 'success')
                 
+            except ExpenseRejectedError as e:
+                flash(str(e), 'error')
+                return redirect(url_for('expenses.index'))
             except ValueError:
                 flash('El monto ingresado no es válido', 'error')
                 return redirect(url_for('expenses.index'))
@@ -159,48 +124,41 @@ class ExpenseController:
         
         return redirect(url_for('expenses.index'))
 
-    def _get_category_name(self, categoria_id):
-        """Método auxiliar para obtener el nombre de una categoría"""
-        try:
-            query = "SELECT nombre FROM categorias_gastos WHERE id = %s"
-            result = self.expense_model.db.execute_query(query, (categoria_id,), fetch_one=True)
-            return result['nombre'] if result else 'Categoría'
-        except:
-            return 'Categoría'
-
     def delete(self, expense_id):
         """Eliminar gasto"""
         if 'user_id' not in session:
             return jsonify({'success': False, 'error': 'No autorizado'}), 401
         
         try:
-            # Verificar que el gasto pertenezca al usuario
-            expense = self.expense_model.db.execute_query(
-                "SELECT * FROM gastos WHERE id = %s AND usuario_id = %s",
-                (expense_id, session['user_id']),
-                fetch_one=True
-            )
-            
-            if not expense:
+            # Verificar que el gasto pertenezca al usuario y eliminarlo (actualiza el saldo)
+            if not self.expense_model.delete(expense_id, session['user_id']):
                 return jsonify({'success': False, 'error': 'Gasto no encontrado'}), 404
             
-            delete_query = "DELETE FROM gastos WHERE id = %s"
-            self.expense_model.db.execute_query(delete_query, (expense_id,))
             flash('Gasto eliminado exitosamente', 'success')
             return jsonify({'success': True})
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @data_version_etag
     def api_expenses(self):
         """API para obtener gastos (AJAX)"""
         if 'user_id' not in session:
             return jsonify({'error': 'No autorizado'}), 401
         
         user_id = session['user_id']
-        month = request.args.get('month', datetime.now().month, type=int)
-        year = request.args.get('year', datetime.now().year, type=int)
         
-        expenses = self.expense_model.get_by_user(user_id, month, year)
+        try:
+            cursor, limit, start, end = parse_page_args(request.args, Config.PAGE_SIZE, Config.API_MAX_PAGE_SIZE)
+            
+            # Sin rango explícito se mantiene el filtro por mes (por defecto el actual)
+            if not start and not end:
+                month = request.args.get('month', datetime.now().month, type=int)
+                year = request.args.get('year', datetime.now().year, type=int)
+                start, end = month_range(year, month)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        expenses, next_cursor = self.expense_model.get_page(user_id, limit, cursor, start, end)
         
         # Convertir decimales a float
         for expense in expenses:
@@ -208,7 +166,7 @@ class ExpenseController:
             if expense['fecha']:
                 expense['fecha'] = expense['fecha'].strftime('%Y-%m-%d')
         
-        return jsonify(expenses)
+        return jsonify({'items': expenses, 'next_cursor': next_cursor})
 
 # Crear instancia del controlador
 expense_controller = ExpenseController()
\ No newline at end of file
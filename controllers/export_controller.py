@@ -0,0 +1,122 @@
+from flask import Blueprint, Response, request, session, jsonify
+from utils.database import Database
+from utils.helpers import decimal_to_float, parse_page_args
+from models.category import category_catalog
+from datetime import datetime
+import csv
+import io
+import json
+
+class ExportController:
+    """Exportación en streaming (CSV / NDJSON) del historial completo de ingresos y gastos"""
+
+    FEEDS = {
+        'ingresos': ['ingreso'],
+        'gastos': ['gasto'],
+        'todo': ['ingreso', 'gasto']
+    }
+    TABLES = {'ingreso': 'ingresos', 'gasto': 'gastos'}
+    COLUMNS = ['tipo', 'id', 'fecha', 'concepto', 'categoria', 'monto', 'esencial', 'descripcion']
+
+    def __init__(self):
+        self.bp = Blueprint('export', __name__, url_prefix='/export')
+        self.db = Database()
+        self.register_routes()
+
+    def register_routes(self):
+        self.bp.route('/<feed>.<fmt>')(self.export)
+
+    def export(self, feed, fmt):
+        """Descargar ingresos, gastos o ambos como CSV o NDJSON (opcional: desde/hasta)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        if feed not in self.FEEDS or fmt not in ('csv', 'ndjson'):
+            return jsonify({'error': 'Exportación no soportada'}), 404
+        
+        try:
+            _, _, start, end = parse_page_args(request.args, 1, 1)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        user_id = session['user_id']
+        tipos = self.FEEDS[feed]
+        # Nombres de categoría resueltos antes de abrir el stream: refrescar el catálogo a mitad
+        # de la descarga tomaría una segunda conexión del pool mientras el cursor tiene la primera
+        names = {tipo: {row['id']: row['nombre'] for row in category_catalog.all(tipo)} for tipo in tipos}
+        rows = self._rows(user_id, tipos, start, end, names)
+        body = self._csv(rows) if fmt == 'csv' else self._ndjson(rows)
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        filename = f"{feed}_{datetime.now().strftime('%Y%m%d')}.{fmt}"
+        
+        return Response(body, mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-Accel-Buffering': 'no'  # que el proxy no acumule la respuesta
+        })
+
+    def _query(self, user_id, tipos, start, end):
+        """Consulta única (UNION ALL de los feeds pedidos) ordenada por (fecha, id)"""
+        parts = []
+        params = []
+        for tipo in tipos:
+            esencial = "esencial" if tipo == 'gasto' else "NULL as esencial"
+            part = f"""
+            SELECT '{tipo}' as tipo, id, fecha, concepto, categoria_id, monto, {esencial}, descripcion
+            FROM {self.TABLES[tipo]}
+            WHERE usuario_id = %s
+            """
+            params.append(user_id)
+            if start:
+                part += " AND fecha >= %s"
+                params.append(start)
+            if end:
+                part += " AND fecha < %s"
+                params.append(end)
+            parts.append(part)
+        query = ' UNION ALL '.join(parts) + " ORDER BY fecha ASC, id ASC, tipo ASC"
+        return query, tuple(params)
+
+    def _rows(self, user_id, tipos, start, end, names):
+        """Filas de los feeds pedidos desde un solo cursor sin buffer (una conexión del pool)
+
+        names es {tipo: {categoria_id: nombre}}; durante el stream no se consulta el catálogo.
+        """
+        query, params = self._query(user_id, tipos, start, end)
+        for row in self.db.stream_query(query, params):
+            yield {
+                'tipo': row['tipo'],
+                'id': row['id'],
+                'fecha': row['fecha'].strftime('%Y-%m-%d') if row['fecha'] else None,
+                'concepto': row['concepto'],
+                'categoria': names[row['tipo']].get(row['categoria_id']),
+                'monto': decimal_to_float(row['monto']),
+                'esencial': None if row['esencial'] is None else bool(row['esencial']),
+                'descripcion': row['descripcion']
+            }
+
+    def _csv(self, rows):
+        """Serializar a CSV fila por fila"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _ndjson(self, rows):
+        """Serializar a NDJSON (un objeto JSON por línea)"""
+        chunk = []
+        for row in rows:
+            chunk.append(json.dumps(row, ensure_ascii=False))
+            if len(chunk) >= 500:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+# Crear instancia del controlador
+export_controller = ExportController()
@@ -0,0 +1,94 @@
+from flask import Blueprint, request, session, redirect, url_for, flash, jsonify
+from models.bulk_import import BulkImportModel
+from utils.statement_parser import parse_statement, StatementError
+from config import Config
+import io
+import os
+from urllib.parse import urlparse
+
+class ImportController:
+    """Importación masiva de extractos bancarios (CSV u OFX) como ingresos y gastos"""
+
+    def __init__(self):
+        self.bp = Blueprint('imports', __name__, url_prefix='/import')
+        self.import_model = BulkImportModel()
+        self.register_routes()
+
+    def register_routes(self):
+        self.bp.route('/', methods=['POST'])(self.upload)
+        self.bp.route('/api', methods=['POST'])(self.api_import)
+
+    def upload(self):
+        """Importar desde el formulario y volver a la página de origen"""
+        if 'user_id' not in session:
+            return redirect(url_for('auth.login'))
+
+        destino = self._safe_next(request.form.get('next'))
+        result, status = self._import(session['user_id'])
+
+        if status != 200:
+            for error in result['errores'][:10]:
+                flash(error, 'error')
+            if len(result['errores']) > 10:
+                flash(f"... y {len(result['errores']) - 10} errores más", 'error')
+        else:
+            flash(f"¡Importación exitosa! {result['ingresos']} ingresos y {result['gastos']} gastos", 'success')
+
+        return redirect(destino)
+
+    @staticmethod
+    def _safe_next(destino):
+        """Ruta local a la que volver; cualquier otra cosa (//host, /\\host, URL absoluta) va a gastos"""
+        fallback = url_for('expenses.index')
+        if not destino or any(ord(char) < 32 for char in destino):
+            return fallback
+        # Los navegadores tratan la barra invertida como '/': /\evil.com equivale a //evil.com
+        normalized = destino.replace('\\', '/')
+        parsed = urlparse(normalized)
+        if normalized.startswith('//') or parsed.scheme or parsed.netloc or not parsed.path.startswith('/'):
+            return fallback
+        return destino
+
+    def api_import(self):
+        """API de importación: responde con los contadores o la lista de errores"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+
+        result, status = self._import(session['user_id'])
+        return jsonify(result), status
+
+    def _import(self, user_id):
+        """Leer el archivo como stream, validar el lote completo e insertarlo"""
+        archivo = request.files.get('archivo')
+        if not archivo or not archivo.filename:
+            return {'ingresos': 0, 'gastos': 0, 'errores': ['Selecciona un archivo para importar']}, 400
+
+        formato = (request.form.get('formato') or os.path.splitext(archivo.filename)[1].lstrip('.')).lower()
+        defaults = {
+            'gasto': request.form.get('categoria_gasto_id', type=int),
+            'ingreso': request.form.get('categoria_ingreso_id', type=int)
+        }
+
+        movements = []
+        try:
+            lines = io.TextIOWrapper(archivo.stream, encoding='utf-8-sig', errors='replace', newline='')
+            for movement in parse_statement(lines, formato):
+                movements.append(movement)
+                if len(movements) > Config.IMPORT_MAX_ROWS:
+                    raise ValueError(f"El archivo supera el máximo de {Config.IMPORT_MAX_ROWS} movimientos")
+        except (StatementError, ValueError) as e:
+            return {'ingresos': 0, 'gastos': 0, 'errores': [str(e)]}, 400
+
+        if not movements:
+            return {'ingresos': 0, 'gastos': 0, 'errores': ['El archivo no contiene movimientos']}, 400
+
+        try:
+            result = self.import_model.import_movements(user_id, movements, defaults)
+        except Exception as e:
+            print(f"Error al importar movimientos: {e}")
+            return {'ingresos': 0, 'gastos': 0, 'errores': ['Error al importar: ' + str(e)]}, 500
+
+        return result, 400 if result['errores'] else 200
+
+# Crear instancia del controlador
+import_controller = ImportController()
@@ -1,33 +1,25 @@
 from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for
-import mysql.connector
-from datetime import datetime
+from models.income import IncomeModel
+from models.balance import BalanceModel
+from utils.helpers import decimal_to_float, month_range, parse_page_args
+from utils.http_cache import data_version_etag, mark_uncacheable
 from config import Config
+from datetime import datetime
 
 class IncomeController:
     def __init__(self):
         self.bp = Blueprint('income', __name__, url_prefix='/income')
+        self.income_model = IncomeModel()
+        self.balance_model = BalanceModel()
         self.register_routes()
     
-    def get_db_connection(self):
-        """Crear conexión a la base de datos"""
-        try:
-            conn = mysql.connector.connect(
-                host=Config.MYSQL_HOST,
-                user=Config.MYSQL_USER,
-                password=Config.MYSQL_PASSWORD,
-                database=Config.MYSQL_DB,
-                port=Config.MYSQL_PORT
-            )
-            return conn
-        except Exception as e:
-            print(f"Error conectando a la BD: {e}")
-            return None
-    
     def register_routes(self):
         self.bp.route('/')(self.index)
         self.bp.route('/add', methods=['POST'])(self.add_income)
         self.bp.route('/delete/<int:income_id>', methods=['POST'])(self.delete_income)
+        self.bp.route('/api')(self.api_incomes)
     
+    @data_version_etag
     def index(self):
         """Página principal de ingresos"""
         if 'user_id' not in session:
@@ -36,69 +28,35 @@ class IncomeController:
         
         try:
             user_id = session['user_id']
-            conn = self.get_db_connection()
-            if not conn:
-                flash('Error de conexión a la base de datos', 'error')
-                return render_template('incomes/index.html', 
-                                     incomes=[], 
-                                     categories=[],
-                                     total_ingresos=0,
-                                     ingresos_mes=0,
-                                     total_registros=0,
-                                     saldo_actual=0,
-                                     active_page='income',
-                                     mes_actual=datetime.now().strftime('%Y-%m'),
-                                     mes_seleccionado=datetime.now().strftime('%Y-%m'))
-            
-            cursor = conn.cursor(dictionary=True)
             
             # Obtener el mes seleccionado (por defecto mes actual)
             mes_seleccionado = request.args.get('mes', datetime.now().strftime('%Y-%m'))
-            año, mes = mes_seleccionado.split('-')
-            
-            # Obtener ingresos del mes seleccionado - ORDENADO POR FECHA DESCENDENTE (más reciente primero)
-            cursor.execute("""
-                SELECT i.*, ci.nombre as categoria_nombre, ci.color, ci.icono
-                FROM ingresos i 
-                LEFT JOIN categorias_ingresos ci ON i.categoria_id = ci.id 
-                WHERE i.usuario_id = %s AND YEAR(i.fecha) = %s AND MONTH(i.fecha) = %s
-                ORDER BY i.fecha DESC, i.id DESC
-            """, (user_id, año, mes))
-            incomes = cursor.fetchall()
+            try:
+                año, mes = mes_seleccionado.split('-')
+                inicio, fin = month_range(año, mes)
+            except ValueError:
+                # Formato inválido o mes inexistente: usar el mes actual
+                mes_seleccionado = datetime.now().strftime('%Y-%m')
+                año, mes = mes_seleccionado.split('-')
+                inicio, fin = month_range(año, mes)
+            
+            # Obtener una página del mes seleccionado - ORDENADO POR FECHA DESCENDENTE (keyset sobre fecha, id)
+            incomes, next_cursor = self.income_model.get_page(
+                user_id, Config.PAGE_SIZE, request.args.get('cursor'), inicio, fin
+            )
             
             # Obtener categorías
-            cursor.execute("SELECT * FROM categorias_ingresos ORDER BY nombre")
-            categories = cursor.fetchall()
-            
-            # CALCULAR LOS TOTALES DEL MES SELECCIONADO
-            total_ingresos_mes = 0
-            total_registros = len(incomes)
-            
-            for income in incomes:
-                total_ingresos_mes += float(income['monto'])
-            
-            # OBTENER TOTAL GENERAL DE TODOS LOS INGRESOS (para contexto)
-            cursor.execute("""
-                SELECT COALESCE(SUM(monto), 0) as total_general 
-                FROM ingresos 
-                WHERE usuario_id = %s
-            """, (user_id,))
-            total_general_result = cursor.fetchone()
-            total_ingresos_general = float(total_general_result['total_general']) if total_general_result else 0
-            
-            # CALCULAR SALDO ACTUAL (INGRESOS TOTALES - GASTOS TOTALES)
-            cursor.execute("""
-                SELECT COALESCE(SUM(monto), 0) as total_gastos 
-                FROM gastos 
-                WHERE usuario_id = %s
-            """, (user_id,))
-            total_gastos_result = cursor.fetchone()
-            total_gastos = float(total_gastos_result['total_gastos']) if total_gastos_result else 0
-            
-            saldo_actual = total_ingresos_general - total_gastos
-            
-            cursor.close()
-            conn.close()
+            categories = self.income_model.get_categories()
+            
+            # TOTALES DEL MES SELECCIONADO desde el resumen mensual (no dependen de la página)
+            resumen_mes = self.income_model.rollup_model.get_month_summary(user_id, 'ingreso', int(mes), int(año))
+            total_ingresos_mes = float(resumen_mes['total'])
+            total_registros = resumen_mes['cantidad']
+            
+            # TOTAL GENERAL DE INGRESOS Y SALDO ACTUAL (ledger incremental, O(1))
+            balance = self.balance_model.get(user_id)
+            total_ingresos_general = float(balance['total_ingresos']) if balance else 0
+            saldo_actual = float(balance['saldo']) if balance else 0
             
             # PASAR TODOS LOS DATOS AL TEMPLATE
             return render_template('incomes/index.html', 
@@ -110,10 +68,13 @@ class IncomeController:
                                  saldo_actual=saldo_actual,              # Saldo actual
                                  active_page='income',
                                  mes_actual=datetime.now().strftime('%Y-%m'),
-                                 mes_seleccionado=mes_seleccionado)
+                                 mes_seleccionado=mes_seleccionado,
+                                 next_cursor=next_cursor,
+                                 is_first_page=not request.args.get('cursor'))
             
         except Exception as e:
             print(f"Error en incomes: {e}")
+            mark_uncacheable()
             flash('Error al cargar los ingresos', 'error')
             return render_template('incomes/index.html', 
                                  incomes=[], 
@@ -154,20 +115,7 @@ class IncomeController:
             if not fecha:
                 fecha = datetime.now().strftime('%Y-%m-%d')
             
-            conn = self.get_db_connection()
-            if not conn:
-                return jsonify({'success': False, 'error': 'Error de conexión'})
-            
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO ingresos (usuario_id, concepto, monto, categoria_id, fecha, descripcion)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (user_id, concepto, monto, categoria_id, fecha, descripcion))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
+            self.income_model.create(user_id, concepto, monto, categoria_id, fecha, descripcion)
             
             return jsonify({'success': True, 'message': 'Ingreso agregado correctamente'})
             
@@ -182,33 +130,45 @@ class IncomeController:
         
         try:
             user_id = session['user_id']
-            conn = self.get_db_connection()
-            if not conn:
-                return jsonify({'success': False, 'error': 'Error de conexión'})
-            
-            cursor = conn.cursor()
             
-            # Verificar que el ingreso pertenece al usuario
-            cursor.execute("SELECT id FROM ingresos WHERE id = %s AND usuario_id = %s", 
-                         (income_id, user_id))
-            
-            if not cursor.fetchone():
-                cursor.close()
-                conn.close()
+            # Verificar que el ingreso pertenece al usuario y eliminarlo (actualiza el saldo)
+            if not self.income_model.delete(income_id, user_id):
                 return jsonify({'success': False, 'error': 'Ingreso no encontrado'})
             
-            cursor.execute("DELETE FROM ingresos WHERE id = %s AND usuario_id = %s", 
-                         (income_id, user_id))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
             return jsonify({'success': True, 'message': 'Ingreso eliminado correctamente'})
             
         except Exception as e:
             print(f"Error al eliminar ingreso: {e}")
             return jsonify({'success': False, 'error': 'Error al eliminar el ingreso'})
 
+    @data_version_etag
+    def api_incomes(self):
+        """API para obtener ingresos (AJAX)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        user_id = session['user_id']
+        
+        try:
+            cursor, limit, start, end = parse_page_args(request.args, Config.PAGE_SIZE, Config.API_MAX_PAGE_SIZE)
+            
+            # Sin rango explícito se filtra por mes (por defecto el actual)
+            if not start and not end:
+                month = request.args.get('month', datetime.now().month, type=int)
+                year = request.args.get('year', datetime.now().year, type=int)
+                start, end = month_range(year, month)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        incomes, next_cursor = self.income_model.get_page(user_id, limit, cursor, start, end)
+        
+        # Convertir decimales a float
+        for income in incomes:
+            income['monto'] = decimal_to_float(income['monto'])
+            if income['fecha']:
+                income['fecha'] = income['fecha'].strftime('%Y-%m-%d')
+        
+        return jsonify({'items': incomes, 'next_cursor': next_cursor})
+
 # Crear instancia
 income_controller = IncomeController()
\ No newline at end of file
@@ -1,6 +1,7 @@
 from flask import Blueprint, render_template, request, session, redirect, url_for, flash, jsonify
-from models.savings import SavingsModel
+from models.savings import SavingsModel, SavingsLimitError
 from utils.helpers import decimal_to_float
+from utils.http_cache import data_version_etag
 from datetime import datetime
 
 class SavingsController:
@@ -16,7 +17,9 @@ class SavingsController:
         self.bp.route('/update/<int:savings_id>', methods=['POST'])(self.update)
         self.bp.route('/delete/<int:savings_id>', methods=['POST'])(self.delete)
         self.bp.route('/api')(self.api_savings)  # ← CORREGIDO: cambiado de '/api/savings' a '/api'
+        self.bp.route('/api/<int:savings_id>/aportes')(self.api_contributions)
 
+    @data_version_etag
     def index(self):
         """Página de listado de ahorros"""
         if 'user_id' not in session:
@@ -89,25 +92,15 @@ class SavingsController:
                 if monto_float <= 0:
                     return jsonify({'success': False, 'error': 'El monto debe ser mayor a 0'}), 400
                 
-                # ✅ NUEVA VALIDACIÓN: Verificar que no se supere la meta total
-                # Obtener información de la meta de ahorro
-                saving = self.savings_model.get_by_id(savings_id, user_id)
+                # ✅ Tope de la meta, acumulado y completado se resuelven en un solo UPDATE atómico
+                try:
+                    saving = self.savings_model.add_savings(savings_id, user_id, monto_float)
+                except SavingsLimitError as e:
+                    return jsonify({'success': False, 'error': str(e)}), 400
+                
                 if not saving:
                     return jsonify({'success': False, 'error': 'Meta de ahorro no encontrada'}), 404
                 
-                meta_total = float(saving['meta_total'])
-                ahorrado_actual = float(saving['ahorrado_actual'])
-                saldo_restante = meta_total - ahorrado_actual
-                
-                # Verificar si el monto a agregar supera la meta
-                if monto_float > saldo_restante:
-                    return jsonify({
-                        'success': False, 
-                        'error': f'No puedes ahorrar más de tu meta. Te faltan ${saldo_restante:,.0f} para completar los ${meta_total:,.0f}'
-                    }), 400
-                
-                # Si pasa la validación, agregar el dinero
-                self.savings_model.add_savings(savings_id, user_id, monto_float)
                 flash('¡Dinero agregado exitosamente!', 'success')
                 return jsonify({'success': True})
                 
@@ -171,6 +164,7 @@ class SavingsController:
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @data_version_etag
     def api_savings(self):
         """API para obtener ahorros (AJAX)"""
         if 'user_id' not in session:
@@ -191,5 +185,19 @@ class SavingsController:
         
         return jsonify(savings)
 
+    @data_version_etag
+    def api_contributions(self, savings_id):
+        """API con el historial de aportes de una meta (para graficar el progreso)"""
+        if 'user_id' not in session:
+            return jsonify({'error': 'No autorizado'}), 401
+        
+        contributions = self.savings_model.get_contributions(savings_id, session['user_id'])
+        for contribution in contributions:
+            contribution['monto'] = decimal_to_float(contribution['monto'])
+            contribution['ahorrado_resultante'] = decimal_to_float(contribution['ahorrado_resultante'])
+            contribution['fecha_registro'] = contribution['fecha_registro'].strftime('%Y-%m-%d %H:%M:%S')
+        
+        return jsonify(contributions)
+
 # Crear instancia del controlador
 savings_controller = SavingsController()
\ No newline at end of file
@@ -0,0 +1,10 @@
+-- Ledger de saldo por usuario (ver models/balance.py).
+-- Después de aplicarla: flask reconcile-balances
+CREATE TABLE IF NOT EXISTS saldos_usuario (
+    usuario_id INT NOT NULL PRIMARY KEY,
+    total_ingresos DECIMAL(15,2) NOT NULL DEFAULT 0,
+    total_gastos DECIMAL(15,2) NOT NULL DEFAULT 0,
+    saldo DECIMAL(15,2) NOT NULL DEFAULT 0,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    fecha_actualizacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,11 @@
+-- Totales mensuales por categoría (ver models/rollup.py).
+-- Después de aplicarla: flask rebuild-rollups
+CREATE TABLE IF NOT EXISTS resumen_mensual (
+    usuario_id INT NOT NULL,
+    mes_year CHAR(7) NOT NULL,
+    tipo ENUM('ingreso', 'gasto') NOT NULL,
+    categoria_id INT NOT NULL DEFAULT 0,
+    total DECIMAL(15,2) NOT NULL DEFAULT 0,
+    cantidad INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (usuario_id, mes_year, tipo, categoria_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
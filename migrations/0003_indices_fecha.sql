@@ -0,0 +1,36 @@
+-- Índices compuestos para los filtros por usuario + rango de fechas
+-- (listados por mes ordenados por fecha DESC, id DESC) y por mes de presupuesto.
+-- El DDL de MySQL hace commit implícito: cada índice se crea solo si no existe, así una
+-- corrida que falló a mitad se puede repetir sin chocar con los índices ya creados.
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'gastos' AND index_name = 'idx_gastos_usuario_fecha'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_gastos_usuario_fecha ON gastos (usuario_id, fecha, id)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'ingresos' AND index_name = 'idx_ingresos_usuario_fecha'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_ingresos_usuario_fecha ON ingresos (usuario_id, fecha, id)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'presupuestos' AND index_name = 'idx_presupuestos_usuario_mes'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_presupuestos_usuario_mes ON presupuestos (usuario_id, mes_year)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'ahorros' AND index_name = 'idx_ahorros_usuario_estado'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_ahorros_usuario_estado ON ahorros (usuario_id, completado, fecha_objetivo)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
@@ -0,0 +1,17 @@
+-- Historial de aportes a metas de ahorro (ver models/savings.py).
+-- Cada aporte guarda el acumulado resultante para graficar el progreso sin recalcular.
+CREATE TABLE IF NOT EXISTS aportes_ahorro (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    ahorro_id INT NOT NULL,
+    usuario_id INT NOT NULL,
+    monto DECIMAL(15,2) NOT NULL,
+    ahorrado_resultante DECIMAL(15,2) NOT NULL,
+    fecha_registro TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY idx_aportes_ahorro_fecha (ahorro_id, fecha_registro)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Lo ahorrado antes de existir el historial queda como un aporte inicial
+INSERT INTO aportes_ahorro (ahorro_id, usuario_id, monto, ahorrado_resultante, fecha_registro)
+SELECT id, usuario_id, ahorrado_actual, ahorrado_actual, fecha_inicio
+FROM ahorros
+WHERE ahorrado_actual > 0;
@@ -0,0 +1,13 @@
+-- Email único en usuarios: el registro hace un solo INSERT y detecta duplicados por la restricción.
+-- Solo se agrega si la tabla no tiene ya un índice único sobre email.
+SET @email_unico = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'usuarios'
+        AND column_name = 'email' AND non_unique = 0
+);
+SET @ddl = IF(@email_unico = 0,
+    'ALTER TABLE usuarios ADD UNIQUE KEY uq_usuarios_email (email)',
+    'DO 0');
+PREPARE agregar_indice FROM @ddl;
+EXECUTE agregar_indice;
+DEALLOCATE PREPARE agregar_indice;
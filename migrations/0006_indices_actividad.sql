@@ -0,0 +1,19 @@
+-- Índices para el feed de actividad: últimos movimientos por momento de registro
+-- (ORDER BY fecha_registro DESC, id DESC LIMIT n por usuario sin ordenar el historial).
+-- Cada índice se crea solo si no existe (como en 0003): el DDL hace commit implícito.
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'ingresos' AND index_name = 'idx_ingresos_usuario_registro'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_ingresos_usuario_registro ON ingresos (usuario_id, fecha_registro, id)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'gastos' AND index_name = 'idx_gastos_usuario_registro'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_gastos_usuario_registro ON gastos (usuario_id, fecha_registro, id)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
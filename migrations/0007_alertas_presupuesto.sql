@@ -0,0 +1,28 @@
+-- Alertas de presupuesto generadas por el job `flask budget-alerts` (ver models/budget_alert.py).
+-- Una fila por presupuesto y nivel alcanzado (aviso >= 80%, limite >= 100%, excedido > 100%).
+CREATE TABLE IF NOT EXISTS alertas_presupuesto (
+    id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    usuario_id INT NOT NULL,
+    presupuesto_id INT NOT NULL,
+    categoria_gasto_id INT NOT NULL,
+    mes_year CHAR(7) NOT NULL,
+    nivel VARCHAR(10) NOT NULL,
+    porcentaje_uso DECIMAL(9,2) NOT NULL,
+    gasto_actual DECIMAL(15,2) NOT NULL,
+    monto_maximo DECIMAL(15,2) NOT NULL,
+    leida TINYINT(1) NOT NULL DEFAULT 0,
+    fecha_alerta TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_alertas_presupuesto_nivel (presupuesto_id, nivel),
+    KEY idx_alertas_usuario_mes (usuario_id, mes_year, leida)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- El job recorre los presupuestos de un mes por rangos de usuario
+-- (solo si no existe, como en 0003: el CREATE TABLE de arriba ya hizo commit implícito)
+SET @existe = (
+    SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'presupuestos' AND index_name = 'idx_presupuestos_mes_usuario'
+);
+SET @ddl = IF(@existe = 0, 'CREATE INDEX idx_presupuestos_mes_usuario ON presupuestos (mes_year, usuario_id)', 'DO 0');
+PREPARE crear_indice FROM @ddl;
+EXECUTE crear_indice;
+DEALLOCATE PREPARE crear_indice;
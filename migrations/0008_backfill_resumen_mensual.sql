@@ -0,0 +1,14 @@
+-- Backfill de resumen_mensual desde ingresos y gastos (0002 creó la tabla vacía).
+-- Reconstruye todas las celdas, así queda bien también donde ya se corrió flask rebuild-rollups.
+-- Los '%%' son porque el runner ejecuta cada sentencia con parámetros (PyMySQL formatea con %).
+DELETE FROM resumen_mensual;
+
+INSERT INTO resumen_mensual (usuario_id, mes_year, tipo, categoria_id, total, cantidad)
+SELECT usuario_id, DATE_FORMAT(fecha, '%%Y-%%m'), 'ingreso', COALESCE(categoria_id, 0), SUM(monto), COUNT(*)
+FROM ingresos
+GROUP BY usuario_id, DATE_FORMAT(fecha, '%%Y-%%m'), COALESCE(categoria_id, 0);
+
+INSERT INTO resumen_mensual (usuario_id, mes_year, tipo, categoria_id, total, cantidad)
+SELECT usuario_id, DATE_FORMAT(fecha, '%%Y-%%m'), 'gasto', COALESCE(categoria_id, 0), SUM(monto), COUNT(*)
+FROM gastos
+GROUP BY usuario_id, DATE_FORMAT(fecha, '%%Y-%%m'), COALESCE(categoria_id, 0);
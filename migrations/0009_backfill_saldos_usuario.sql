@@ -0,0 +1,16 @@
+-- Backfill de saldos_usuario para los usuarios que todavía no tienen fila (0001 creó la tabla
+-- vacía y el ledger solo se inicializaba en el primer acceso de cada usuario).
+-- La versión arranca en milisegundos desde epoch, como BalanceModel.rebuild, para que ningún
+-- ETag emitido antes vuelva a coincidir.
+INSERT INTO saldos_usuario (usuario_id, total_ingresos, total_gastos, saldo, version)
+SELECT u.id,
+       COALESCE(i.total, 0),
+       COALESCE(g.total, 0),
+       COALESCE(i.total, 0) - COALESCE(g.total, 0),
+       FLOOR(UNIX_TIMESTAMP(NOW(3)) * 1000)
+FROM usuarios u
+LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM ingresos GROUP BY usuario_id) i
+    ON i.usuario_id = u.id
+LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM gastos GROUP BY usuario_id) g
+    ON g.usuario_id = u.id
+WHERE NOT EXISTS (SELECT 1 FROM saldos_usuario s WHERE s.usuario_id = u.id);
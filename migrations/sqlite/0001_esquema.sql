@@ -0,0 +1,125 @@
+-- Esquema completo para el backend SQLite (DB_BACKEND=sqlite, ver utils/sqlite_backend.py).
+-- Equivale a las tablas base más las migraciones 0001-0005 de MySQL.
+-- Los montos son REAL para que la división sea real como en MySQL; el backend los devuelve como Decimal.
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(100) NOT NULL,
+    email VARCHAR(150) NOT NULL,
+    clave VARCHAR(255) NOT NULL,
+    rol_id INTEGER NOT NULL DEFAULT 2,
+    activo INTEGER NOT NULL DEFAULT 1,
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_usuarios_email ON usuarios (email);
+
+CREATE TABLE IF NOT EXISTS categorias_ingresos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(100) NOT NULL,
+    color VARCHAR(20),
+    icono VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS categorias_gastos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre VARCHAR(100) NOT NULL,
+    color VARCHAR(20),
+    icono VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS ingresos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    concepto VARCHAR(200) NOT NULL,
+    monto REAL NOT NULL,
+    categoria_id INTEGER,
+    fecha DATE NOT NULL,
+    descripcion TEXT,
+    fecha_registro TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_ingresos_usuario_fecha ON ingresos (usuario_id, fecha, id);
+
+CREATE TABLE IF NOT EXISTS gastos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    concepto VARCHAR(200) NOT NULL,
+    monto REAL NOT NULL,
+    categoria_id INTEGER,
+    fecha DATE NOT NULL,
+    esencial INTEGER NOT NULL DEFAULT 1,
+    descripcion TEXT,
+    fecha_registro TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_gastos_usuario_fecha ON gastos (usuario_id, fecha, id);
+
+CREATE TABLE IF NOT EXISTS presupuestos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    categoria_gasto_id INTEGER NOT NULL,
+    monto_maximo REAL NOT NULL,
+    mes_year CHAR(7) NOT NULL,
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (usuario_id, categoria_gasto_id, mes_year)
+);
+CREATE INDEX IF NOT EXISTS idx_presupuestos_usuario_mes ON presupuestos (usuario_id, mes_year);
+
+CREATE TABLE IF NOT EXISTS ahorros (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    concepto VARCHAR(200) NOT NULL,
+    meta_total REAL NOT NULL,
+    ahorrado_actual REAL NOT NULL DEFAULT 0,
+    fecha_inicio DATE,
+    fecha_objetivo DATE,
+    descripcion TEXT,
+    completado INTEGER NOT NULL DEFAULT 0,
+    fecha_creacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_ahorros_usuario_estado ON ahorros (usuario_id, completado, fecha_objetivo);
+
+CREATE TABLE IF NOT EXISTS saldos_usuario (
+    usuario_id INTEGER NOT NULL PRIMARY KEY,
+    total_ingresos REAL NOT NULL DEFAULT 0,
+    total_gastos REAL NOT NULL DEFAULT 0,
+    saldo REAL NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    fecha_actualizacion TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS resumen_mensual (
+    usuario_id INTEGER NOT NULL,
+    mes_year CHAR(7) NOT NULL,
+    tipo VARCHAR(7) NOT NULL CHECK (tipo IN ('ingreso', 'gasto')),
+    categoria_id INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    cantidad INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (usuario_id, mes_year, tipo, categoria_id)
+);
+
+CREATE TABLE IF NOT EXISTS aportes_ahorro (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ahorro_id INTEGER NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    monto REAL NOT NULL,
+    ahorrado_resultante REAL NOT NULL,
+    fecha_registro TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_aportes_ahorro_fecha ON aportes_ahorro (ahorro_id, fecha_registro);
+
+-- Categorías iniciales
+INSERT INTO categorias_ingresos (nombre, color, icono) VALUES
+    ('Salario', '#28a745', '💼'),
+    ('Freelance', '#17a2b8', '💻'),
+    ('Inversiones', '#6f42c1', '📈'),
+    ('Ventas', '#fd7e14', '🛒'),
+    ('Otros ingresos', '#6c757d', '💰');
+
+INSERT INTO categorias_gastos (nombre, color, icono) VALUES
+    ('Alimentación', '#dc3545', '🍔'),
+    ('Transporte', '#007bff', '🚗'),
+    ('Vivienda', '#6f42c1', '🏠'),
+    ('Servicios', '#ffc107', '💡'),
+    ('Salud', '#20c997', '🏥'),
+    ('Educación', '#17a2b8', '📚'),
+    ('Entretenimiento', '#e83e8c', '🎬'),
+    ('Ropa', '#fd7e14', '👕'),
+    ('Otros gastos', '#6c757d', '📦');
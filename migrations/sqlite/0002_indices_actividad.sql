@@ -0,0 +1,3 @@
+-- Índices para el feed de actividad (equivale a migrations/0006_indices_actividad.sql)
+CREATE INDEX IF NOT EXISTS idx_ingresos_usuario_registro ON ingresos (usuario_id, fecha_registro, id);
+CREATE INDEX IF NOT EXISTS idx_gastos_usuario_registro ON gastos (usuario_id, fecha_registro, id);
@@ -0,0 +1,17 @@
+-- Alertas de presupuesto (equivale a migrations/0007_alertas_presupuesto.sql)
+CREATE TABLE IF NOT EXISTS alertas_presupuesto (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    presupuesto_id INTEGER NOT NULL,
+    categoria_gasto_id INTEGER NOT NULL,
+    mes_year CHAR(7) NOT NULL,
+    nivel VARCHAR(10) NOT NULL,
+    porcentaje_uso REAL NOT NULL,
+    gasto_actual REAL NOT NULL,
+    monto_maximo REAL NOT NULL,
+    leida INTEGER NOT NULL DEFAULT 0,
+    fecha_alerta TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (presupuesto_id, nivel)
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_usuario_mes ON alertas_presupuesto (usuario_id, mes_year, leida);
+CREATE INDEX IF NOT EXISTS idx_presupuestos_mes_usuario ON presupuestos (mes_year, usuario_id);
@@ -0,0 +1,13 @@
+-- Backfill de saldos_usuario (equivale a migrations/0009_backfill_saldos_usuario.sql)
+INSERT INTO saldos_usuario (usuario_id, total_ingresos, total_gastos, saldo, version)
+SELECT u.id,
+       COALESCE(i.total, 0),
+       COALESCE(g.total, 0),
+       COALESCE(i.total, 0) - COALESCE(g.total, 0),
+       CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)
+FROM usuarios u
+LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM ingresos GROUP BY usuario_id) i
+    ON i.usuario_id = u.id
+LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM gastos GROUP BY usuario_id) g
+    ON g.usuario_id = u.id
+WHERE NOT EXISTS (SELECT 1 FROM saldos_usuario s WHERE s.usuario_id = u.id);
@@ -0,0 +1,157 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from utils.database import Database
+from config import Config
+
+class AdminStatsModel:
+    """Estadísticas globales del panel de administración, precalculadas y cacheadas con TTL"""
+
+    WINDOW_DAYS = 30
+
+    def __init__(self, ttl=None):
+        self.db = Database()
+        self.ttl = Config.ADMIN_STATS_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._computed_at = 0.0
+        self._refreshing = False
+
+    def get_snapshot(self):
+        """Snapshot vigente; si venció se devuelve el anterior y se recalcula en segundo plano"""
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._store(self.compute())
+            return self._snapshot
+
+        if time.monotonic() - self._computed_at >= self.ttl:
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name='admin-stats', daemon=True).start()
+
+        return self._snapshot
+
+    def invalidate(self):
+        """Forzar el recálculo en la próxima lectura"""
+        self._computed_at = 0.0
+
+    def _refresh(self):
+        try:
+            self._store(self.compute())
+        except Exception as e:
+            print(f"Error al recalcular estadísticas: {e}")
+        finally:
+            self._refreshing = False
+
+    def _store(self, snapshot):
+        self._snapshot = snapshot
+        self._computed_at = time.monotonic()
+
+    def compute(self, now=None):
+        """Calcular todas las estadísticas en una sola pasada por tabla"""
+        now = now or datetime.now()
+        today = now.date()
+        window_start = today - timedelta(days=2 * self.WINDOW_DAYS)
+        current_start = today - timedelta(days=self.WINDOW_DAYS)
+
+        # Totales globales desde resumen_mensual (mismo resultado que sumar ingresos/gastos,
+        # pero sobre una fila por usuario/mes/categoría); saldos_usuario solo tiene a quien
+        # ya registró movimientos y no se limpia al borrar usuarios
+        totals = self.db.execute_query("""
+        SELECT
+            (SELECT COUNT(*) FROM usuarios WHERE activo = 1) as total_usuarios,
+            (SELECT COALESCE(SUM(total), 0) FROM resumen_mensual WHERE tipo = 'ingreso') as ingresos_totales,
+            (SELECT COALESCE(SUM(total), 0) FROM resumen_mensual WHERE tipo = 'gasto') as gastos_totales
+        """, fetch_one=True) or {}
+
+        # Buckets diarios de los últimos 60 días para ambas tablas
+        buckets = self.db.execute_query("""
+        SELECT 'ingreso' as tipo, fecha as dia, SUM(monto) as total
+        FROM ingresos WHERE fecha >= %s GROUP BY fecha
+        UNION ALL
+        SELECT 'gasto' as tipo, fecha as dia, SUM(monto) as total
+        FROM gastos WHERE fecha >= %s GROUP BY fecha
+        """, (window_start, window_start), fetch=True)
+
+        daily = {'ingreso': {}, 'gasto': {}}
+        for row in buckets:
+            dia = row['dia'].date() if isinstance(row['dia'], datetime) else row['dia']
+            daily[row['tipo']][dia] = float(row['total'] or 0)
+
+        def window_sum(tipo, start, end):
+            return sum(total for dia, total in daily[tipo].items() if start < dia <= end)
+
+        activos = self.db.execute_query("""
+        SELECT COUNT(DISTINCT usuario_id) as total
+        FROM (
+            SELECT usuario_id FROM ingresos WHERE fecha > %s
+            UNION
+            SELECT usuario_id FROM gastos WHERE fecha > %s
+        ) as actividad
+        """, (current_start, current_start), fetch_one=True)
+
+        # Top categorías desde el resumen mensual (una fila por usuario/mes/categoría)
+        # Cada parte como tabla derivada: portable a SQLite, que no admite (SELECT ... LIMIT) UNION
+        top = self.db.execute_query("""
+        SELECT * FROM (
+            SELECT 'ingreso' as tipo, c.nombre, SUM(r.cantidad) as cantidad, SUM(r.total) as total
+            FROM resumen_mensual r
+            JOIN categorias_ingresos c ON r.categoria_id = c.id
+            WHERE r.tipo = 'ingreso'
+            GROUP BY c.id, c.nombre
+            ORDER BY total DESC LIMIT 5
+        ) as top_ingresos
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'gasto' as tipo, c.nombre, SUM(r.cantidad) as cantidad, SUM(r.total) as total
+            FROM resumen_mensual r
+            JOIN categorias_gastos c ON r.categoria_id = c.id
+            WHERE r.tipo = 'gasto'
+            GROUP BY c.id, c.nombre
+            ORDER BY total DESC LIMIT 5
+        ) as top_gastos
+        """, fetch=True)
+
+        top_categorias = {'ingreso': [], 'gasto': []}
+        for row in top:
+            top_categorias[row.pop('tipo')].append(row)
+        for rows in top_categorias.values():
+            rows.sort(key=lambda row: row['total'], reverse=True)
+
+        total_usuarios = totals.get('total_usuarios') or 0
+        ingresos_totales = float(totals.get('ingresos_totales') or 0)
+        gastos_totales = float(totals.get('gastos_totales') or 0)
+        ingresos_ultimo_mes = window_sum('ingreso', current_start, today)
+        gastos_ultimo_mes = window_sum('gasto', current_start, today)
+        ingresos_mes_anterior = window_sum('ingreso', window_start, current_start)
+        gastos_mes_anterior = window_sum('gasto', window_start, current_start)
+
+        return {
+            'total_usuarios': total_usuarios,
+            'usuarios_activos': activos['total'] if activos else 0,
+            'ingresos_totales': ingresos_totales,
+            'gastos_totales': gastos_totales,
+            'balance_total': ingresos_totales - gastos_totales,
+            'promedio_ingresos': ingresos_totales / total_usuarios if total_usuarios else 0,
+            'promedio_gastos': gastos_totales / total_usuarios if total_usuarios else 0,
+            'ingresos_ultimo_mes': ingresos_ultimo_mes,
+            'gastos_ultimo_mes': gastos_ultimo_mes,
+            'variacion_ingresos': self._variacion(ingresos_ultimo_mes, ingresos_mes_anterior),
+            'variacion_gastos': self._variacion(gastos_ultimo_mes, gastos_mes_anterior),
+            'top_categorias_ingresos': top_categorias['ingreso'],
+            'top_categorias_gastos': top_categorias['gasto'],
+            'generado_en': now
+        }
+
+    @staticmethod
+    def _variacion(actual, anterior):
+        """Variación porcentual respecto del período anterior"""
+        if anterior == 0:
+            return 0
+        return round((actual - anterior) / anterior * 100, 1)
+
+# Instancia compartida: el snapshot se reutiliza entre requests
+admin_stats = AdminStatsModel()
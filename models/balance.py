@@ -0,0 +1,137 @@
+import time
+from utils.database import Database
+
+class BalanceModel:
+    """Saldo por usuario mantenido de forma incremental (evita SUM sobre todo el historial)"""
+
+    def __init__(self):
+        self.db = Database()
+        self.table = "saldos_usuario"
+
+    def get(self, usuario_id):
+        """Obtener el saldo del usuario (O(1)); se inicializa desde las tablas la primera vez"""
+        query = f"""
+        SELECT usuario_id, total_ingresos, total_gastos, saldo, version
+        FROM {self.table}
+        WHERE usuario_id = %s
+        """
+        result = self.db.execute_query(query, (usuario_id,), fetch_one=True)
+        if result:
+            return result
+
+        self.rebuild(usuario_id)
+        return self.db.execute_query(query, (usuario_id,), fetch_one=True)
+
+    def lock(self, usuario_id):
+        """Leer el saldo con SELECT ... FOR UPDATE (llamar dentro de una transacción)
+
+        Serializa las escrituras del usuario: todo alta o baja de movimientos actualiza esta fila.
+        """
+        query = f"""
+        SELECT usuario_id, total_ingresos, total_gastos, saldo, version
+        FROM {self.table}
+        WHERE usuario_id = %s
+        FOR UPDATE
+        """
+        result = self.db.execute_query(query, (usuario_id,), fetch_one=True)
+        if result:
+            return result
+
+        self.rebuild(usuario_id)
+        return self.db.execute_query(query, (usuario_id,), fetch_one=True)
+
+    def get_saldo(self, usuario_id):
+        """Obtener solo el saldo actual como float"""
+        balance = self.get(usuario_id)
+        return float(balance['saldo']) if balance else 0.0
+
+    def get_version(self, usuario_id):
+        """Versión de datos del usuario (sube con cada escritura); 0 si aún no tiene ledger"""
+        result = self.db.execute_query(
+            f"SELECT version FROM {self.table} WHERE usuario_id = %s",
+            (usuario_id,),
+            fetch_one=True
+        )
+        return result['version'] if result else 0
+
+    def touch(self, usuario_id):
+        """Subir la versión de datos sin mover el saldo (escrituras de presupuestos y ahorros)"""
+        self.apply(usuario_id)
+
+    def apply(self, usuario_id, ingresos=0, gastos=0):
+        """Aplicar un movimiento al saldo (llamar en la misma transacción que el INSERT/DELETE)"""
+        query = f"""
+        UPDATE {self.table}
+        SET total_ingresos = total_ingresos + %s,
+            total_gastos = total_gastos + %s,
+            saldo = saldo + %s - %s,
+            version = version + 1
+        WHERE usuario_id = %s
+        """
+        affected = self.db.execute_update(query, (ingresos, gastos, ingresos, gastos, usuario_id))
+        if not affected:
+            # Primer movimiento registrado en el ledger: reconstruir desde las tablas,
+            # que ya incluyen el cambio porque estamos dentro de la misma transacción
+            self.rebuild(usuario_id)
+
+    def rebuild(self, usuario_id=None):
+        """Reconstruir saldos desde ingresos y gastos (un usuario o todos)
+
+        Una fila nueva arranca con la versión en milisegundos desde epoch y no en 1: si la fila
+        se perdió, los ETag emitidos con la versión anterior no pueden volver a coincidir.
+        """
+        seed = int(time.time() * 1000)
+        query = f"""
+        INSERT INTO {self.table} (usuario_id, total_ingresos, total_gastos, saldo, version)
+        SELECT u.id,
+               COALESCE(i.total, 0),
+               COALESCE(g.total, 0),
+               COALESCE(i.total, 0) - COALESCE(g.total, 0),
+               %s
+        FROM usuarios u
+        LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM ingresos {{where}} GROUP BY usuario_id) i
+            ON i.usuario_id = u.id
+        LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM gastos {{where}} GROUP BY usuario_id) g
+            ON g.usuario_id = u.id
+        {{where_u}}
+        ON DUPLICATE KEY UPDATE
+            total_ingresos = VALUES(total_ingresos),
+            total_gastos = VALUES(total_gastos),
+            saldo = VALUES(saldo),
+            version = version + 1
+        """
+        if usuario_id is None:
+            # Con WHERE explícito el INSERT ... SELECT ... ON CONFLICT de SQLite no es ambiguo
+            query = query.format(where='', where_u='WHERE 1 = 1')
+            params = (seed,)
+        else:
+            query = query.format(where='WHERE usuario_id = %s', where_u='WHERE u.id = %s')
+            params = (seed, usuario_id, usuario_id, usuario_id)
+
+        return self.db.execute_update(query, params)
+
+    def find_drift(self, usuario_id=None):
+        """Usuarios cuyo saldo almacenado no coincide con las tablas de movimientos"""
+        query = f"""
+        SELECT u.id as usuario_id,
+               s.total_ingresos as ledger_ingresos,
+               s.total_gastos as ledger_gastos,
+               COALESCE(i.total, 0) as real_ingresos,
+               COALESCE(g.total, 0) as real_gastos
+        FROM usuarios u
+        LEFT JOIN {self.table} s ON s.usuario_id = u.id
+        LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM ingresos GROUP BY usuario_id) i
+            ON i.usuario_id = u.id
+        LEFT JOIN (SELECT usuario_id, SUM(monto) as total FROM gastos GROUP BY usuario_id) g
+            ON g.usuario_id = u.id
+        WHERE (s.usuario_id IS NULL
+               OR s.total_ingresos <> COALESCE(i.total, 0)
+               OR s.total_gastos <> COALESCE(g.total, 0)
+               OR s.saldo <> s.total_ingresos - s.total_gastos)
+        """
+        params = ()
+        if usuario_id is not None:
+            query += " AND u.id = %s"
+            params = (usuario_id,)
+
+        return self.db.execute_query(query, params, fetch=True)
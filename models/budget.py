@@ -1,9 +1,13 @@
 from utils.database import Database
+from models.balance import BalanceModel
+from models.budget_alert import BudgetAlertModel
 from datetime import datetime
 
 class BudgetModel:
     def __init__(self):
         self.db = Database()
+        self.balance_model = BalanceModel()
+        self.alert_model = BudgetAlertModel()
         self.table = "presupuestos"
 
     def create(self, usuario_id, categoria_gasto_id, monto_maximo, mes_year):
@@ -13,92 +17,82 @@ class BudgetModel:
         VALUES (%s, %s, %s, %s)
         ON DUPLICATE KEY UPDATE monto_maximo = VALUES(monto_maximo)
         """
-        return self.db.execute_query(
-            query, 
-            (usuario_id, categoria_gasto_id, monto_maximo, mes_year)
-        )
+        with self.db.transaction():
+            budget_id = self.db.execute_query(
+                query, 
+                (usuario_id, categoria_gasto_id, monto_maximo, mes_year)
+            )
+            self.balance_model.touch(usuario_id)
+        return budget_id
 
-    def get_by_user(self, usuario_id, month=None, year=None):
-        """Obtener presupuestos del usuario"""
+    def get_progress(self, usuario_id, month=None, year=None, categoria_gasto_id=None):
+        """Motor de progreso de presupuestos: filas por categoría y resumen en una sola consulta
+
+        El gasto del mes ya está agregado por categoría en resumen_mensual; se une a
+        presupuestos una vez y el resumen se suma sobre esas mismas filas.
+        Devuelve {'budgets': [...], 'summary': {...}}.
+        """
+        query, params = self.progress_query(usuario_id, month, year, categoria_gasto_id)
+        return self.summarize(self.db.execute_query(query, params, fetch=True))
+
+    def progress_query(self, usuario_id, month=None, year=None, categoria_gasto_id=None):
+        """SQL y parámetros del motor de progreso (compartidos con las vistas async)"""
         if not month or not year:
             current_date = datetime.now()
             month = current_date.month
             year = current_date.year
 
         # Formatear el mes_year para comparar con el campo VARCHAR
-        mes_year_str = f"{year}-{month:02d}"
+        mes_year_str = f"{year}-{int(month):02d}"
 
         query = f"""
         SELECT p.*, cg.nombre as categoria_nombre, cg.color, cg.icono,
-               COALESCE(SUM(g.monto), 0) as gasto_actual,
-               (p.monto_maximo - COALESCE(SUM(g.monto), 0)) as saldo_restante,
+               COALESCE(r.total, 0) as gasto_actual,
+               (p.monto_maximo - COALESCE(r.total, 0)) as saldo_restante,
            CASE 
                WHEN p.monto_maximo > 0 THEN 
-                   ROUND((COALESCE(SUM(g.monto), 0) / p.monto_maximo) * 100, 2)
+                   ROUND((COALESCE(r.total, 0) / p.monto_maximo) * 100, 2)
                ELSE 0 
            END as porcentaje_uso
         FROM {self.table} p
         LEFT JOIN categorias_gastos cg ON p.categoria_gasto_id = cg.id
-        LEFT JOIN gastos g ON p.categoria_gasto_id = g.categoria_id 
-            AND g.usuario_id = p.usuario_id 
-            AND MONTH(g.fecha) = %s  -- Usar los parámetros month/year directamente
-            AND YEAR(g.fecha) = %s
+        LEFT JOIN resumen_mensual r ON r.usuario_id = p.usuario_id
+            AND r.mes_year = p.mes_year
+            AND r.tipo = 'gasto'
+            AND r.categoria_id = p.categoria_gasto_id
         WHERE p.usuario_id = %s 
             AND p.mes_year = %s  -- Comparar directamente con el campo VARCHAR
-        GROUP BY p.id, p.monto_maximo, cg.nombre, cg.color, cg.icono
-        ORDER BY cg.nombre
         """
-        
-        return self.db.execute_query(query, (month, year, usuario_id, mes_year_str), fetch=True)
+        params = [usuario_id, mes_year_str]
+        if categoria_gasto_id is not None:
+            query += " AND p.categoria_gasto_id = %s"
+            params.append(categoria_gasto_id)
+        query += " ORDER BY cg.nombre"
+        return query, tuple(params)
 
-    def get_budget_summary(self, usuario_id, month=None, year=None):
-        """Obtener resumen general de presupuestos"""
-        if not month or not year:
-            current_date = datetime.now()
-            month = current_date.month
-            year = current_date.year
-
-        # Formatear el mes_year para comparar con el campo VARCHAR
-        mes_year_str = f"{year}-{month:02d}"
-
-        query = """
-        SELECT 
-            COALESCE(SUM(p.monto_maximo), 0) as total_presupuestado,
-            COALESCE(SUM(
-                (SELECT COALESCE(SUM(g.monto), 0) 
-                 FROM gastos g 
-                 WHERE g.categoria_id = p.categoria_gasto_id 
-                 AND g.usuario_id = p.usuario_id 
-                 AND MONTH(g.fecha) = %s 
-                 AND YEAR(g.fecha) = %s)
-            ), 0) as total_gastado,
-            COUNT(p.id) as total_categorias
-        FROM presupuestos p
-        WHERE p.usuario_id = %s 
-            AND p.mes_year = %s  -- Comparar directamente con el campo VARCHAR
-        """
-        
-        result = self.db.execute_query(query, (month, year, usuario_id, mes_year_str), fetch_one=True)
-        
-        if result:
-            total_presupuestado = result['total_presupuestado'] or 0
-            total_gastado = result['total_gastado'] or 0
-            saldo_restante = total_presupuestado - total_gastado
-            
-            return {
+    @staticmethod
+    def summarize(budgets):
+        """Resumen general calculado sobre las filas del motor de progreso"""
+        total_presupuestado = sum(budget['monto_maximo'] for budget in budgets)
+        total_gastado = sum(budget['gasto_actual'] for budget in budgets)
+        return {
+            'budgets': budgets,
+            'summary': {
                 'total_presupuestado': total_presupuestado,
                 'total_gastado': total_gastado,
-                'saldo_restante': saldo_restante,
-                'total_categorias': result['total_categorias'] or 0
+                'saldo_restante': total_presupuestado - total_gastado,
+                'total_categorias': len(budgets)
             }
-        
-        return {
-            'total_presupuestado': 0,
-            'total_gastado': 0,
-            'saldo_restante': 0,
-            'total_categorias': 0
         }
 
+    def get_by_user(self, usuario_id, month=None, year=None):
+        """Obtener presupuestos del usuario"""
+        return self.get_progress(usuario_id, month, year)['budgets']
+
+    def get_budget_summary(self, usuario_id, month=None, year=None):
+        """Obtener resumen general de presupuestos"""
+        return self.get_progress(usuario_id, month, year)['summary']
+
     def get_by_id(self, presupuesto_id, usuario_id):
         """Obtener presupuesto por ID"""
         query = f"SELECT * FROM {self.table} WHERE id = %s AND usuario_id = %s"
@@ -107,12 +101,18 @@ class BudgetModel:
     def update(self, presupuesto_id, usuario_id, monto_maximo):
         """Actualizar presupuesto"""
         query = f"UPDATE {self.table} SET monto_maximo = %s WHERE id = %s AND usuario_id = %s"
-        return self.db.execute_query(query, (monto_maximo, presupuesto_id, usuario_id))
+        with self.db.transaction():
+            self.db.execute_query(query, (monto_maximo, presupuesto_id, usuario_id))
+            self.alert_model.delete_for_budget(presupuesto_id, usuario_id)
+            self.balance_model.touch(usuario_id)
 
     def delete(self, presupuesto_id, usuario_id):
         """Eliminar presupuesto"""
         query = f"DELETE FROM {self.table} WHERE id = %s AND usuario_id = %s"
-        return self.db.execute_query(query, (presupuesto_id, usuario_id))
+        with self.db.transaction():
+            self.db.execute_query(query, (presupuesto_id, usuario_id))
+            self.alert_model.delete_for_budget(presupuesto_id, usuario_id)
+            self.balance_model.touch(usuario_id)
 
     def get_categories_without_budget(self, usuario_id, month, year):
         """Obtener categorías sin presupuesto asignado"""
@@ -133,37 +133,34 @@ class BudgetModel:
         return self.db.execute_query(query, (usuario_id, mes_year_str), fetch=True)
 
     def get_budget_by_category(self, usuario_id, categoria_gasto_id, month=None, year=None):
-        """Obtener presupuesto específico de una categoría"""
-        if not month or not year:
-            current_date = datetime.now()
-            month = current_date.month
-            year = current_date.year
+        """Obtener presupuesto específico de una categoría (o None)"""
+        budgets = self.get_progress(usuario_id, month, year, categoria_gasto_id)['budgets']
+        return budgets[0] if budgets else None
 
-        # Formatear el mes_year para comparar con el campo VARCHAR
-        mes_year_str = f"{year}-{month:02d}"
+    def get_budgets_for_cells(self, usuario_id, cells):
+        """Presupuestos y gasto acumulado de varios (mes_year, categoria) en una sola consulta
 
+        Devuelve {(mes_year, categoria_id): fila}; las celdas sin presupuesto no aparecen.
+        """
+        cells = list(cells)
+        if not cells:
+            return {}
+
+        placeholders = ", ".join(["(%s, %s)"] * len(cells))
         query = f"""
-        SELECT p.*, 
-               COALESCE((
-                   SELECT SUM(g.monto) 
-                   FROM gastos g 
-                   WHERE g.categoria_id = p.categoria_gasto_id 
-                     AND g.usuario_id = p.usuario_id 
-                     AND MONTH(g.fecha) = %s 
-                     AND YEAR(g.fecha) = %s
-               ), 0) as gasto_actual,
-               (p.monto_maximo - COALESCE((
-                   SELECT SUM(g.monto) 
-                   FROM gastos g 
-                   WHERE g.categoria_id = p.categoria_gasto_id 
-                     AND g.usuario_id = p.usuario_id 
-                     AND MONTH(g.fecha) = %s 
-                     AND YEAR(g.fecha) = %s
-               ), 0)) as saldo_restante
+        SELECT p.mes_year, p.categoria_gasto_id, p.monto_maximo,
+               COALESCE(r.total, 0) as gasto_actual
         FROM {self.table} p
-        WHERE p.usuario_id = %s 
-            AND p.categoria_gasto_id = %s
-            AND p.mes_year = %s
+        LEFT JOIN resumen_mensual r ON r.usuario_id = p.usuario_id
+            AND r.mes_year = p.mes_year
+            AND r.tipo = 'gasto'
+            AND r.categoria_id = p.categoria_gasto_id
+        WHERE p.usuario_id = %s
+            AND (p.mes_year, p.categoria_gasto_id) IN ({placeholders})
         """
-        
-        return self.db.execute_query(query, (month, year, month, year, usuario_id, categoria_gasto_id, mes_year_str), fetch_one=True)
\ No newline at end of file
+        params = [usuario_id]
+        for mes_year, categoria_id in cells:
+            params.extend([mes_year, categoria_id])
+
+        rows = self.db.execute_query(query, tuple(params), fetch=True)
+        return {(row['mes_year'], row['categoria_gasto_id']): row for row in rows}
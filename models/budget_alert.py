@@ -0,0 +1,155 @@
+from utils.database import Database
+from models.balance import BalanceModel
+from models.category import category_catalog
+from config import Config
+from datetime import datetime
+
+# Niveles de alerta de menor a mayor: (nivel, umbral en % del presupuesto, estricto)
+LEVELS = (('aviso', 80, False), ('limite', 100, False), ('excedido', 100, True))
+
+
+class BudgetAlertModel:
+    """Alertas de presupuesto (80%, 100% y excedido) evaluadas en lote para todos los usuarios
+
+    El job recorre los presupuestos de un mes por bloques de usuarios (keyset sobre
+    usuario_id) y cada bloque se resuelve con unas pocas sentencias set-based sobre presupuestos
+    y resumen_mensual, sin leer filas en Python. La UI solo lee las alertas no leídas del
+    usuario por el índice (usuario_id, mes_year, leida).
+    """
+
+    def __init__(self):
+        self.db = Database()
+        self.balance_model = BalanceModel()
+        self.table = "alertas_presupuesto"
+
+    @staticmethod
+    def _reached(level_column, spent, budget):
+        """Condición SQL: el gasto alcanza el nivel (columna o literal con el nombre del nivel)"""
+        cases = ' '.join(
+            f"WHEN '{nivel}' THEN {spent} * 100 {'>' if strict else '>='} {budget} * {threshold}"
+            for nivel, threshold, strict in LEVELS
+        )
+        return f"(CASE {level_column} {cases} ELSE 0 END)"
+
+    def evaluate(self, mes_year=None, chunk_size=None, progress=None):
+        """Evaluar todos los presupuestos del mes (por defecto el actual)
+
+        Devuelve {'usuarios', 'nuevas', 'resueltas'}. Es idempotente: volver a correrlo solo
+        agrega los niveles recién alcanzados y borra los que dejaron de cumplirse.
+        """
+        mes_year = mes_year or datetime.now().strftime('%Y-%m')
+        chunk_size = chunk_size or Config.BUDGET_ALERT_CHUNK_SIZE
+        counts = {'usuarios': 0, 'nuevas': 0, 'resueltas': 0}
+
+        last_user = 0
+        while True:
+            chunk = self.db.execute_query("""
+            SELECT MAX(usuario_id) as hasta, COUNT(*) as usuarios FROM (
+                SELECT DISTINCT usuario_id FROM presupuestos
+                WHERE mes_year = %s AND usuario_id > %s
+                ORDER BY usuario_id LIMIT %s
+            ) as bloque
+            """, (mes_year, last_user, chunk_size), fetch_one=True)
+            if not chunk or chunk['hasta'] is None:
+                break
+
+            with self.db.transaction():
+                resolved, new = self._evaluate_chunk(mes_year, last_user, chunk['hasta'])
+            counts['usuarios'] += chunk['usuarios']
+            counts['resueltas'] += resolved
+            counts['nuevas'] += new
+            last_user = chunk['hasta']
+            if progress:
+                progress(counts)
+        return counts
+
+    def _evaluate_chunk(self, mes_year, after_user, last_user):
+        """Resolver, insertar y notificar las alertas de los usuarios (after_user, last_user]"""
+        users = (mes_year, after_user, last_user)
+        # Alertas cuyo nivel ya no se cumple (presupuesto ampliado o borrado, gasto eliminado)
+        stale = f"""
+        mes_year = %s AND usuario_id > %s AND usuario_id <= %s
+        AND NOT EXISTS (
+            SELECT 1 FROM presupuestos p
+            JOIN resumen_mensual r ON r.usuario_id = p.usuario_id AND r.mes_year = p.mes_year
+                AND r.tipo = 'gasto' AND r.categoria_id = p.categoria_gasto_id
+            WHERE p.id = {self.table}.presupuesto_id AND p.monto_maximo > 0
+                AND {self._reached(f'{self.table}.nivel', 'r.total', 'p.monto_maximo')}
+        )
+        """
+        # La versión de datos sube para que las páginas con ETag muestren el cambio
+        self.db.execute_update(f"""
+        UPDATE saldos_usuario SET version = version + 1
+        WHERE usuario_id IN (SELECT usuario_id FROM {self.table} WHERE {stale})
+        """, users)
+        resolved = self.db.execute_update(f"DELETE FROM {self.table} WHERE {stale}", users)
+
+        # Las alertas insertadas en este bloque son las de id mayor al último existente
+        last_id = self.db.execute_query(f"SELECT COALESCE(MAX(id), 0) as id FROM {self.table}", fetch_one=True)['id']
+        levels = ' UNION ALL '.join(f"SELECT '{nivel}' as nivel" for nivel, _, _ in LEVELS)
+        self.db.execute_update(f"""
+        INSERT INTO {self.table} (usuario_id, presupuesto_id, categoria_gasto_id, mes_year, nivel,
+                                  porcentaje_uso, gasto_actual, monto_maximo)
+        SELECT p.usuario_id, p.id, p.categoria_gasto_id, p.mes_year, n.nivel,
+               ROUND(r.total / p.monto_maximo * 100, 2), r.total, p.monto_maximo
+        FROM presupuestos p
+        JOIN resumen_mensual r ON r.usuario_id = p.usuario_id AND r.mes_year = p.mes_year
+            AND r.tipo = 'gasto' AND r.categoria_id = p.categoria_gasto_id
+        JOIN ({levels}) as n
+        WHERE p.mes_year = %s AND p.usuario_id > %s AND p.usuario_id <= %s AND p.monto_maximo > 0
+            AND {self._reached('n.nivel', 'r.total', 'p.monto_maximo')}
+        ON DUPLICATE KEY UPDATE
+            porcentaje_uso = VALUES(porcentaje_uso),
+            gasto_actual = VALUES(gasto_actual),
+            monto_maximo = VALUES(monto_maximo)
+        """, users)
+
+        new = self.db.execute_query(f"""
+        SELECT COUNT(*) as nuevas FROM {self.table}
+        WHERE id > %s AND usuario_id > %s AND usuario_id <= %s
+        """, (last_id, after_user, last_user), fetch_one=True)['nuevas']
+        if new:
+            self.db.execute_update(f"""
+            UPDATE saldos_usuario SET version = version + 1
+            WHERE usuario_id IN (
+                SELECT usuario_id FROM {self.table}
+                WHERE id > %s AND usuario_id > %s AND usuario_id <= %s
+            )
+            """, (last_id, after_user, last_user))
+        return resolved, int(new)
+
+    def get_active(self, usuario_id, mes_year):
+        """Alertas no leídas del mes, solo el nivel más alto de cada presupuesto"""
+        query = f"""
+        SELECT presupuesto_id, categoria_gasto_id, nivel, porcentaje_uso, gasto_actual,
+               monto_maximo, fecha_alerta
+        FROM {self.table}
+        WHERE usuario_id = %s AND mes_year = %s AND leida = 0
+        """
+        rank = {nivel: number for number, (nivel, _, _) in enumerate(LEVELS)}
+        highest = {}
+        for row in self.db.execute_query(query, (usuario_id, mes_year), fetch=True):
+            current = highest.get(row['presupuesto_id'])
+            if current is None or rank[row['nivel']] > rank[current['nivel']]:
+                highest[row['presupuesto_id']] = row
+
+        alerts = sorted(highest.values(), key=lambda row: row['porcentaje_uso'], reverse=True)
+        for alert in alerts:
+            category = category_catalog.get('gasto', alert['categoria_gasto_id']) or {}
+            alert['categoria_nombre'] = category.get('nombre', 'Categoría')
+            alert['icono'] = category.get('icono')
+        return alerts
+
+    def mark_read(self, usuario_id, mes_year):
+        """Marcar como leídas las alertas del mes; devuelve cuántas cambiaron"""
+        query = f"UPDATE {self.table} SET leida = 1 WHERE usuario_id = %s AND mes_year = %s AND leida = 0"
+        with self.db.transaction():
+            changed = self.db.execute_update(query, (usuario_id, mes_year))
+            if changed:
+                self.balance_model.touch(usuario_id)
+        return changed
+
+    def delete_for_budget(self, presupuesto_id, usuario_id):
+        """Borrar las alertas de un presupuesto modificado o eliminado (el job las recalcula)"""
+        query = f"DELETE FROM {self.table} WHERE presupuesto_id = %s AND usuario_id = %s"
+        return self.db.execute_update(query, (presupuesto_id, usuario_id))
@@ -0,0 +1,131 @@
+from decimal import Decimal
+from utils.database import Database
+from models.balance import BalanceModel
+from models.rollup import RollupModel
+from models.budget import BudgetModel
+from models.category import category_catalog
+from config import Config
+
+class BulkImportModel:
+    """Importación masiva de ingresos y gastos: validación por conjuntos e inserción por lotes"""
+
+    INSERTS = {
+        'ingreso': """
+        INSERT INTO ingresos (usuario_id, concepto, monto, categoria_id, fecha, descripcion)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        'gasto': """
+        INSERT INTO gastos (usuario_id, concepto, monto, categoria_id, fecha, esencial, descripcion)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+    }
+
+    def __init__(self, batch_size=None):
+        self.db = Database()
+        self.balance_model = BalanceModel()
+        self.rollup_model = RollupModel()
+        self.budget_model = BudgetModel()
+        self.batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+
+    def resolve_categories(self, movements, default_categories=None):
+        """Asignar categoria_id a cada movimiento desde el catálogo en memoria
+
+        Devuelve la lista de errores (vacía si todas las categorías se resolvieron).
+        """
+        default_categories = default_categories or {}
+        errores = []
+        for movement in movements:
+            nombre = movement['categoria']
+            category = None
+            if nombre:
+                category = category_catalog.find_by_name(movement['tipo'], nombre)
+                if category is None and nombre.isdigit():
+                    category = category_catalog.get(movement['tipo'], nombre)
+            elif default_categories.get(movement['tipo']):
+                category = category_catalog.get(movement['tipo'], default_categories[movement['tipo']])
+
+            if category is None:
+                errores.append(
+                    f"Línea {movement['linea']}: categoría de {movement['tipo']} "
+                    f"'{nombre or 'sin categoría'}' no existe"
+                )
+            else:
+                movement['categoria_id'] = category['id']
+        return errores
+
+    def validate(self, usuario_id, movements):
+        """Validar el lote completo contra saldo y presupuestos con una consulta por regla"""
+        errores = []
+        total_ingresos = sum((m['monto'] for m in movements if m['tipo'] == 'ingreso'), Decimal(0))
+        total_gastos = sum((m['monto'] for m in movements if m['tipo'] == 'gasto'), Decimal(0))
+
+        # Regla 1: el lote no puede dejar el saldo en negativo (fila bloqueada hasta el commit)
+        balance = self.balance_model.lock(usuario_id)
+        saldo = Decimal(balance['saldo']) if balance else Decimal(0)
+        saldo_final = saldo + total_ingresos - total_gastos
+        if saldo_final < 0:
+            errores.append(
+                f"Los gastos importados superan el saldo disponible. "
+                f"Saldo actual: ${saldo:,.0f}, saldo tras importar: ${saldo_final:,.0f}"
+            )
+
+        # Regla 2: ningún presupuesto (mes, categoría) puede quedar excedido
+        gastos_por_celda = {}
+        for m in movements:
+            if m['tipo'] == 'gasto':
+                key = (self.rollup_model.mes_year(m['fecha']), m['categoria_id'])
+                gastos_por_celda[key] = gastos_por_celda.get(key, Decimal(0)) + m['monto']
+
+        budgets = self.budget_model.get_budgets_for_cells(usuario_id, gastos_por_celda.keys())
+        for key, budget in sorted(budgets.items()):
+            disponible = Decimal(budget['monto_maximo']) - Decimal(budget['gasto_actual'])
+            if gastos_por_celda[key] > disponible:
+                errores.append(
+                    f"Presupuesto de {category_catalog.name('gasto', key[1])} ({key[0]}) excedido: "
+                    f"se importan ${gastos_por_celda[key]:,.0f} y hay ${disponible:,.0f} disponibles"
+                )
+        return errores
+
+    def import_movements(self, usuario_id, movements, default_categories=None):
+        """Validar e insertar todo el lote en una única transacción (todo o nada)
+
+        Devuelve {'ingresos': n, 'gastos': n, 'errores': [...]}; con errores no se inserta nada.
+        """
+        result = {'ingresos': 0, 'gastos': 0, 'errores': []}
+        result['errores'] = self.resolve_categories(movements, default_categories)
+        if result['errores'] or not movements:
+            return result
+
+        with self.db.transaction():
+            result['errores'] = self.validate(usuario_id, movements)
+            if result['errores']:
+                return result
+
+            rows = {'ingreso': [], 'gasto': []}
+            cells = {}
+            for m in movements:
+                if m['tipo'] == 'gasto':
+                    rows['gasto'].append((usuario_id, m['concepto'], m['monto'], m['categoria_id'],
+                                          m['fecha'], 1 if m['esencial'] else 0, m['descripcion']))
+                else:
+                    rows['ingreso'].append((usuario_id, m['concepto'], m['monto'], m['categoria_id'],
+                                            m['fecha'], m['descripcion']))
+                key = (m['tipo'], self.rollup_model.mes_year(m['fecha']), m['categoria_id'])
+                monto, cantidad = cells.get(key, (Decimal(0), 0))
+                cells[key] = (monto + m['monto'], cantidad + 1)
+
+            for tipo, tipo_rows in rows.items():
+                for i in range(0, len(tipo_rows), self.batch_size):
+                    self.db.execute_many(self.INSERTS[tipo], tipo_rows[i:i + self.batch_size])
+
+            # Un solo ajuste de saldo y una fila de resumen por celda, no uno por movimiento
+            self.balance_model.apply(
+                usuario_id,
+                ingresos=sum(row[2] for row in rows['ingreso']),
+                gastos=sum(row[2] for row in rows['gasto'])
+            )
+            self.rollup_model.apply_many(usuario_id, cells)
+
+        result['ingresos'] = len(rows['ingreso'])
+        result['gastos'] = len(rows['gasto'])
+        return result
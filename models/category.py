@@ -0,0 +1,86 @@
+import threading
+import time
+from utils.database import Database
+from config import Config
+
+class CategoryCatalog:
+    """Catálogo en memoria de categorías de ingresos y gastos, indexado por id"""
+
+    TABLES = {'gasto': 'categorias_gastos', 'ingreso': 'categorias_ingresos'}
+
+    def __init__(self, ttl=None):
+        self.db = Database()
+        self.ttl = Config.CATEGORY_CATALOG_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._by_tipo = None       # {'gasto': [filas ordenadas por nombre], ...}
+        self._by_id = None         # {'gasto': {id: fila}, ...}
+        self._by_name = None       # {'gasto': {nombre en minúsculas: fila}, ...}
+        self._signature = None
+        self._checked_at = 0.0
+
+    def load(self):
+        """Cargar (o recargar) todas las categorías desde la base de datos"""
+        signature = self._probe()
+        by_tipo, by_id, by_name = {}, {}, {}
+        for tipo, table in self.TABLES.items():
+            rows = self.db.execute_query(f"SELECT * FROM {table} ORDER BY nombre", fetch=True)
+            by_tipo[tipo] = rows
+            by_id[tipo] = {row['id']: row for row in rows}
+            by_name[tipo] = {row['nombre'].strip().lower(): row for row in rows}
+
+        # Reemplazo atómico: los lectores ven el catálogo anterior o el nuevo, nunca uno a medias
+        with self._lock:
+            self._by_tipo, self._by_id, self._by_name = by_tipo, by_id, by_name
+            self._signature = signature
+            self._checked_at = time.monotonic()
+
+    def refresh_if_stale(self):
+        """Recargar si pasó el TTL y la firma de las tablas cambió"""
+        if self._by_tipo is None:
+            self.load()
+            return
+        if time.monotonic() - self._checked_at < self.ttl:
+            return
+
+        with self._lock:
+            # Solo un hilo sondea por vencimiento; el resto sigue usando el catálogo actual
+            if time.monotonic() - self._checked_at < self.ttl:
+                return
+            self._checked_at = time.monotonic()
+
+        if self._probe() != self._signature:
+            self.load()
+
+    def all(self, tipo):
+        """Categorías de un tipo ('gasto' o 'ingreso') ordenadas por nombre (solo lectura)"""
+        self.refresh_if_stale()
+        return self._by_tipo[tipo]
+
+    def get(self, tipo, categoria_id):
+        """Categoría por id, o None"""
+        self.refresh_if_stale()
+        try:
+            return self._by_id[tipo].get(int(categoria_id))
+        except (TypeError, ValueError):
+            return None
+
+    def name(self, tipo, categoria_id, default='Categoría'):
+        """Nombre de una categoría por id"""
+        category = self.get(tipo, categoria_id)
+        return category['nombre'] if category else default
+
+    def find_by_name(self, tipo, nombre):
+        """Categoría por nombre (sin distinguir mayúsculas), o None"""
+        self.refresh_if_stale()
+        return self._by_name[tipo].get((nombre or '').strip().lower())
+
+    def _probe(self):
+        """Firma barata de las tablas de categorías para detectar cambios"""
+        rows = self.db.execute_query(
+            f"CHECKSUM TABLE {', '.join(self.TABLES.values())}",
+            fetch=True
+        )
+        return tuple((row['Table'], row['Checksum']) for row in rows)
+
+# Instancia compartida por todo el proceso
+category_catalog = CategoryCatalog()
@@ -1,9 +1,154 @@
-from utils.database import Database
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from utils.database import Database, get_pool
+from utils.query_stats import query_stats
+from utils.helpers import month_range, encode_activity_cursor, decode_activity_cursor
+from models.balance import BalanceModel
+from models.category import category_catalog
+from config import Config
 from datetime import datetime, timedelta
 
+# Hilos compartidos para lanzar en paralelo las partes independientes del snapshot
+_executor = ThreadPoolExecutor(max_workers=Config.DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+
 class DashboardModel:
     def __init__(self):
         self.db = Database()
+        self.balance_model = BalanceModel()
+
+    def get_snapshot(self, usuario_id, now=None, parallel=None):
+        """Obtener todos los datos del dashboard en dos consultas combinadas"""
+        now = now or datetime.now()
+        if parallel is None:
+            parallel = Config.DASHBOARD_PARALLEL_QUERIES
+
+        # La conexión del hilo auxiliar se toma sin esperar y antes de lanzarlo: el request
+        # nunca espera otra conexión del pool mientras retiene la suya
+        conn = get_pool().try_acquire() if parallel else None
+        if conn is not None:
+            # Las listas se leen en otro hilo con esa segunda conexión
+            lists_future = _executor.submit(self._get_snapshot_lists_on, conn, usuario_id)
+            totals = self._get_snapshot_totals(usuario_id, now)
+            lists, log = lists_future.result()
+            # El hilo no tiene contexto de request: sus consultas se suman al de este
+            query_stats.attach(log)
+        else:
+            totals = self._get_snapshot_totals(usuario_id, now)
+            lists = self._get_snapshot_lists(usuario_id)
+
+        totals.update(lists)
+        return totals
+
+    def _get_snapshot_lists_on(self, conn, usuario_id):
+        """_get_snapshot_lists con una conexión ya tomada del pool (se devuelve al terminar)
+
+        Devuelve (listas, consultas registradas en el hilo).
+        """
+        with query_stats.capture() as log, self.db.bind(conn):
+            return self._get_snapshot_lists(usuario_id), log
+
+    def _get_snapshot_totals(self, usuario_id, now):
+        """Totales, totales del mes y progreso de ahorros en un solo round trip"""
+        mes_year = now.strftime('%Y-%m')
+        query = """
+        SELECT 
+            s.usuario_id as ledger_usuario_id,
+            s.total_ingresos, s.total_gastos, s.saldo,
+            (SELECT COALESCE(SUM(total), 0) FROM resumen_mensual
+             WHERE usuario_id = u.id AND mes_year = %s AND tipo = 'ingreso') as ingresos_mes,
+            (SELECT COALESCE(SUM(total), 0) FROM resumen_mensual
+             WHERE usuario_id = u.id AND mes_year = %s AND tipo = 'gasto') as gastos_mes,
+            (SELECT COALESCE(SUM(ahorrado_actual), 0) FROM ahorros
+             WHERE usuario_id = u.id AND completado = 0) as total_ahorros,
+            (SELECT COALESCE(SUM(meta_total), 0) FROM ahorros
+             WHERE usuario_id = u.id AND completado = 0) as meta_ahorros
+        FROM (SELECT %s as id) u
+        LEFT JOIN saldos_usuario s ON s.usuario_id = u.id
+        """
+        row = self.db.execute_query(query, (mes_year, mes_year, usuario_id), fetch_one=True) or {}
+
+        if row.get('ledger_usuario_id') is None:
+            # Usuario aún sin fila en el ledger: se inicializa una sola vez
+            balance = self.balance_model.get(usuario_id) or {}
+            row.update({key: balance.get(key) for key in ('total_ingresos', 'total_gastos', 'saldo')})
+
+        return {
+            'total_ingresos': row.get('total_ingresos') or 0,
+            'total_gastos': row.get('total_gastos') or 0,
+            'saldo': row.get('saldo') or 0,
+            'ingresos_mes': row.get('ingresos_mes') or 0,
+            'gastos_mes': row.get('gastos_mes') or 0,
+            'total_ahorros': float(row.get('total_ahorros') or 0),
+            'meta_ahorros': float(row.get('meta_ahorros') or 0)
+        }
+
+    def _get_snapshot_lists(self, usuario_id):
+        """Últimos ingresos, últimos gastos y metas activas en un solo round trip"""
+        # Cada parte como tabla derivada para que el LIMIT sea portable (SQLite no admite
+        # (SELECT ... LIMIT) UNION ALL (...))
+        query = """
+        SELECT * FROM (
+            SELECT 'ingreso' as tipo, i.id, i.concepto, i.monto, i.fecha, i.descripcion,
+                   ci.nombre as categoria_nombre, ci.color, ci.icono,
+                   NULL as meta_total, NULL as ahorrado_actual, NULL as porcentaje_completado
+            FROM ingresos i
+            LEFT JOIN categorias_ingresos ci ON i.categoria_id = ci.id
+            WHERE i.usuario_id = %s
+            ORDER BY i.fecha DESC, i.id DESC LIMIT 5
+        ) as ultimos_ingresos
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'gasto' as tipo, g.id, g.concepto, g.monto, g.fecha, g.descripcion,
+                   cg.nombre, cg.color, cg.icono,
+                   NULL, NULL, NULL
+            FROM gastos g
+            LEFT JOIN categorias_gastos cg ON g.categoria_id = cg.id
+            WHERE g.usuario_id = %s
+            ORDER BY g.fecha DESC, g.id DESC LIMIT 5
+        ) as ultimos_gastos
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'meta' as tipo, a.id, a.concepto, NULL, a.fecha_objetivo, a.descripcion,
+                   NULL, NULL, NULL,
+                   a.meta_total, a.ahorrado_actual,
+                   ROUND((a.ahorrado_actual / a.meta_total) * 100, 0)
+            FROM ahorros a
+            WHERE a.usuario_id = %s AND a.completado = 0
+            ORDER BY a.fecha_objetivo ASC LIMIT 3
+        ) as metas_activas
+        """
+        rows = self.db.execute_query(query, (usuario_id, usuario_id, usuario_id), fetch=True)
+
+        ultimos_ingresos = []
+        ultimos_gastos = []
+        metas_activas = []
+        for row in rows:
+            tipo = row.pop('tipo')
+            if tipo == 'meta':
+                metas_activas.append({
+                    'id': row['id'],
+                    'concepto': row['concepto'],
+                    'meta_total': float(row['meta_total']),
+                    'ahorrado_actual': float(row['ahorrado_actual']),
+                    'porcentaje_completado': float(row['porcentaje_completado'] or 0),
+                    'fecha_objetivo': row['fecha'],
+                    'descripcion': row['descripcion']
+                })
+            elif tipo == 'ingreso':
+                ultimos_ingresos.append(row)
+            else:
+                ultimos_gastos.append(row)
+
+        # UNION ALL no garantiza el orden entre partes: reordenar cada lista
+        ultimos_ingresos.sort(key=itemgetter('fecha', 'id'), reverse=True)
+        ultimos_gastos.sort(key=itemgetter('fecha', 'id'), reverse=True)
+        metas_activas.sort(key=lambda meta: (meta['fecha_objetivo'] is not None, meta['fecha_objetivo'] or 0))
+
+        return {
+            'ultimos_ingresos': ultimos_ingresos,
+            'ultimos_gastos': ultimos_gastos,
+            'metas_activas': metas_activas
+        }
 
     def get_monthly_summary(self, usuario_id, month=None, year=None):
         """Obtener resumen mensual mejorado"""
@@ -16,16 +161,16 @@ class DashboardModel:
         income_query = """
         SELECT COALESCE(SUM(monto), 0) as total 
         FROM ingresos 
-        WHERE usuario_id = %s AND MONTH(fecha) = %s AND YEAR(fecha) = %s
+        WHERE usuario_id = %s AND fecha >= %s AND fecha < %s
         """
-        income_result = self.db.execute_query(income_query, (usuario_id, month, year), fetch_one=True)
+        income_result = self.db.execute_query(income_query, (usuario_id, *month_range(year, month)), fetch_one=True)
         
         expense_query = """
         SELECT COALESCE(SUM(monto), 0) as total 
         FROM gastos 
-        WHERE usuario_id = %s AND MONTH(fecha) = %s AND YEAR(fecha) = %s
+        WHERE usuario_id = %s AND fecha >= %s AND fecha < %s
         """
-        expense_result = self.db.execute_query(expense_query, (usuario_id, month, year), fetch_one=True)
+        expense_result = self.db.execute_query(expense_query, (usuario_id, *month_range(year, month)), fetch_one=True)
 
         total_income = income_result['total'] if income_result else 0
         total_expense = expense_result['total'] if expense_result else 0
@@ -38,9 +183,9 @@ class DashboardModel:
             COALESCE(SUM(CASE WHEN esencial = 1 THEN monto ELSE 0 END), 0) as esenciales,
             COALESCE(SUM(CASE WHEN esencial = 0 THEN monto ELSE 0 END), 0) as no_esenciales
         FROM gastos 
-        WHERE usuario_id = %s AND MONTH(fecha) = %s AND YEAR(fecha) = %s
+        WHERE usuario_id = %s AND fecha >= %s AND fecha < %s
         """
-        essential_result = self.db.execute_query(essential_query, (usuario_id, month, year), fetch_one=True)
+        essential_result = self.db.execute_query(essential_query, (usuario_id, *month_range(year, month)), fetch_one=True)
 
         return {
             'total_income': total_income,
@@ -63,46 +208,72 @@ class DashboardModel:
         FROM categorias_gastos cg
         LEFT JOIN gastos g ON cg.id = g.categoria_id 
             AND g.usuario_id = %s 
-            AND MONTH(g.fecha) = %s 
-            AND YEAR(g.fecha) = %s
+            AND g.fecha >= %s 
+            AND g.fecha < %s
         GROUP BY cg.id, cg.nombre, cg.color, cg.icono
         HAVING total > 0
         ORDER BY total DESC
         """
         
-        return self.db.execute_query(query, (usuario_id, month, year), fetch=True)
+        return self.db.execute_query(query, (usuario_id, *month_range(year, month)), fetch=True)
 
-    def get_recent_transactions(self, usuario_id, limit=10):
-        """Obtener transacciones recientes combinadas"""
-        query = """
-        (SELECT 'income' as tipo, id, concepto, monto, fecha, fecha_registro, NULL as categoria_nombre
-         FROM ingresos WHERE usuario_id = %s)
-        UNION ALL
-        (SELECT 'expense' as tipo, id, concepto, monto, fecha, fecha_registro, 
-                (SELECT nombre FROM categorias_gastos WHERE id = gastos.categoria_id) as categoria_nombre
-         FROM gastos WHERE usuario_id = %s)
-        ORDER BY fecha_registro DESC
-        LIMIT %s
-        """
-        
-        return self.db.execute_query(query, (usuario_id, usuario_id, limit), fetch=True)
+    # Fuentes del feed de actividad: (tipo, tabla, orden de desempate en un mismo instante)
+    ACTIVITY_SOURCES = (('ingreso', 'ingresos', 1), ('gasto', 'gastos', 0))
 
-    def get_monthly_comparison(self, usuario_id, months=6):
-        """Obtener comparación de últimos meses"""
-        query = """
-        SELECT 
-            DATE_FORMAT(fecha, '%Y-%m') as mes,
-            SUM(CASE WHEN tipo = 'income' THEN monto ELSE 0 END) as ingresos,
-            SUM(CASE WHEN tipo = 'expense' THEN monto ELSE 0 END) as gastos
-        FROM (
-            SELECT fecha, monto, 'income' as tipo FROM ingresos WHERE usuario_id = %s
-            UNION ALL
-            SELECT fecha, monto, 'expense' as tipo FROM gastos WHERE usuario_id = %s
-        ) as transacciones
-        WHERE fecha >= DATE_SUB(NOW(), INTERVAL %s MONTH)
-        GROUP BY DATE_FORMAT(fecha, '%Y-%m')
-        ORDER BY mes DESC
-        LIMIT %s
+    def get_activity(self, usuario_id, limit, cursor=None):
+        """Feed de ingresos y gastos por momento de registro (más recientes primero)
+
+        Orden total (fecha_registro, tipo, id) DESC con paginación keyset. Cada tabla aporta
+        como mucho limit + 1 filas leídas por el índice (usuario_id, fecha_registro, id), así
+        que una página cuesta O(limit) sin importar el historial. Devuelve (filas, next_cursor).
         """
-        
-        return self.db.execute_query(query, (usuario_id, usuario_id, months, months), fetch=True)
\ No newline at end of file
+        position = decode_activity_cursor(cursor)
+        parts = []
+        params = []
+        for tipo, table, order in self.ACTIVITY_SOURCES:
+            params.append(usuario_id)
+            after = ''
+            if position:
+                # Continuar después de la última fila entregada según el orden del feed
+                fecha_registro, cursor_tipo, row_id = position
+                cursor_order = next(o for t, _, o in self.ACTIVITY_SOURCES if t == cursor_tipo)
+                if order < cursor_order:
+                    after = " AND fecha_registro <= %s"
+                    params.append(fecha_registro)
+                elif order > cursor_order:
+                    after = " AND fecha_registro < %s"
+                    params.append(fecha_registro)
+                else:
+                    after = " AND (fecha_registro < %s OR (fecha_registro = %s AND id < %s))"
+                    params.extend([fecha_registro, fecha_registro, row_id])
+            params.append(limit + 1)
+
+            esencial = 'esencial' if table == 'gastos' else 'NULL'
+            parts.append(f"""
+            SELECT * FROM (
+                SELECT '{tipo}' as tipo, {order} as orden, id, concepto, monto, fecha, fecha_registro,
+                       categoria_id, {esencial} as esencial
+                FROM {table}
+                WHERE usuario_id = %s{after}
+                ORDER BY fecha_registro DESC, id DESC LIMIT %s
+            ) as {table}_recientes
+            """)
+
+        query = ' UNION ALL '.join(parts) + " ORDER BY fecha_registro DESC, orden DESC, id DESC LIMIT %s"
+        params.append(limit + 1)
+        rows = self.db.execute_query(query, tuple(params), fetch=True)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_activity_cursor(last['fecha_registro'], last['tipo'], last['id'])
+
+        # Categorías desde el catálogo en memoria en lugar de un JOIN por fila
+        for row in rows:
+            row.pop('orden')
+            category = category_catalog.get(row['tipo'], row['categoria_id']) or {}
+            row['categoria_nombre'] = category.get('nombre')
+            row['color'] = category.get('color')
+            row['icono'] = category.get('icono')
+        return rows, next_cursor
@@ -1,20 +1,96 @@
 from utils.database import Database
+from utils.helpers import month_range, keyset_page_query, keyset_page_result
+from models.balance import BalanceModel
+from models.rollup import RollupModel
+from models.budget import BudgetModel
+from models.category import category_catalog
+from decimal import Decimal
+
+
+class ExpenseRejectedError(Exception):
+    """El gasto supera el saldo disponible o el presupuesto de su categoría"""
+
 
 class ExpenseModel:
     def __init__(self):
         self.db = Database()
+        self.balance_model = BalanceModel()
+        self.rollup_model = RollupModel()
+        self.budget_model = BudgetModel()
         self.table = "gastos"
 
     def create(self, usuario_id, concepto, monto, categoria_id, fecha, esencial=True, descripcion=None):
-        """Crear nuevo gasto"""
+        """Crear nuevo gasto (y actualizar saldo y resumen mensual en la misma transacción)"""
         query = f"""
         INSERT INTO {self.table} (usuario_id, concepto, monto, categoria_id, fecha, esencial, descripcion)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        return self.db.execute_query(
-            query, 
-            (usuario_id, concepto, monto, categoria_id, fecha, 1 if esencial else 0, descripcion)
-        )
+        with self.db.transaction():
+            expense_id = self.db.execute_query(
+                query, 
+                (usuario_id, concepto, monto, categoria_id, fecha, 1 if esencial else 0, descripcion)
+            )
+            self.balance_model.apply(usuario_id, gastos=monto)
+            self.rollup_model.apply(usuario_id, 'gasto', fecha, categoria_id, monto)
+        return expense_id
+
+    def create_checked(self, usuario_id, concepto, monto, categoria_id, fecha, esencial=True, descripcion=None):
+        """Crear un gasto solo si cabe en el saldo y en el presupuesto de su categoría
+
+        La fila de saldos_usuario se bloquea (FOR UPDATE) antes de leer el presupuesto:
+        toda alta o baja de movimientos la actualiza, así dos altas concurrentes no pueden
+        pasar ambas la validación. El presupuesto sale del mismo motor que usa la página
+        de presupuestos. Lanza ExpenseRejectedError.
+        """
+        monto = Decimal(str(monto))
+        fecha_mes = self.rollup_model.mes_year(fecha)
+
+        with self.db.transaction():
+            balance = self.balance_model.lock(usuario_id)
+            saldo = Decimal(balance['saldo']) if balance else Decimal(0)
+            if monto > saldo:
+                raise ExpenseRejectedError(
+                    f'No puedes gastar más de tu saldo disponible. Saldo actual: ${saldo:,.0f}'
+                )
+
+            budget = self.budget_model.get_budget_by_category(
+                usuario_id, categoria_id, int(fecha_mes[5:7]), int(fecha_mes[:4])
+            )
+            if budget:
+                saldo_presupuesto = Decimal(budget['saldo_restante'])
+                if monto > saldo_presupuesto:
+                    raise ExpenseRejectedError(
+                        f"No puedes gastar más del presupuesto asignado para "
+                        f"{category_catalog.name('gasto', categoria_id)}. "
+                        f"Presupuesto disponible: ${saldo_presupuesto:,.0f}"
+                    )
+
+            return self.create(usuario_id, concepto, monto, categoria_id, fecha, esencial, descripcion)
+
+    def get_by_id(self, gasto_id, usuario_id):
+        """Obtener gasto por ID"""
+        query = f"SELECT * FROM {self.table} WHERE id = %s AND usuario_id = %s"
+        return self.db.execute_query(query, (gasto_id, usuario_id), fetch_one=True)
+
+    def delete(self, gasto_id, usuario_id):
+        """Eliminar gasto (y descontarlo de saldo y resumen mensual en la misma transacción)"""
+        with self.db.transaction():
+            expense = self.db.execute_query(
+                f"SELECT monto, fecha, categoria_id FROM {self.table} WHERE id = %s AND usuario_id = %s FOR UPDATE",
+                (gasto_id, usuario_id),
+                fetch_one=True
+            )
+            if not expense:
+                return 0
+            affected = self.db.execute_update(
+                f"DELETE FROM {self.table} WHERE id = %s AND usuario_id = %s",
+                (gasto_id, usuario_id)
+            )
+            self.balance_model.apply(usuario_id, gastos=-expense['monto'])
+            self.rollup_model.apply(
+                usuario_id, 'gasto', expense['fecha'], expense['categoria_id'], -expense['monto'], cantidad=-1
+            )
+        return affected
 
     def get_by_user(self, usuario_id, month=None, year=None):
         """Obtener gastos del usuario - ORDENADO POR FECHA DESCENDENTE (más reciente primero)"""
@@ -27,26 +103,40 @@ class ExpenseModel:
         params = [usuario_id]
 
         if month and year:
-            query += " AND MONTH(g.fecha) = %s AND YEAR(g.fecha) = %s"
-            params.extend([month, year])
+            query += " AND g.fecha >= %s AND g.fecha < %s"
+            params.extend(month_range(year, month))
 
         # ORDENAR POR FECHA DESCENDENTE Y ID DESCENDENTE (para consistencia)
         query += " ORDER BY g.fecha DESC, g.id DESC"
         return self.db.execute_query(query, tuple(params), fetch=True)
 
-    def get_total(self, usuario_id, month=None, year=None):
-        """Obtener total de gastos"""
-        query = f"SELECT SUM(monto) as total FROM {self.table} WHERE usuario_id = %s"
-        params = [usuario_id]
+    def get_page(self, usuario_id, limit, cursor=None, start=None, end=None):
+        """Página de gastos (más recientes primero) con paginación keyset sobre (fecha, id)
+
+        Devuelve (filas, next_cursor); next_cursor es None en la última página.
+        """
+        query, params = self.page_query(usuario_id, limit, cursor, start, end)
+        return self.page_result(self.db.execute_query(query, params, fetch=True), limit)
 
+    def page_query(self, usuario_id, limit, cursor=None, start=None, end=None):
+        """SQL y parámetros de una página keyset (compartidos con las vistas async)"""
+        select = f"""
+        SELECT g.*, cg.nombre as categoria_nombre, cg.color, cg.icono
+        FROM {self.table} g
+        LEFT JOIN categorias_gastos cg ON g.categoria_id = cg.id
+        """
+        return keyset_page_query(select, 'g', usuario_id, limit, cursor, start, end)
+
+    page_result = staticmethod(keyset_page_result)
+
+    def get_total(self, usuario_id, month=None, year=None):
+        """Obtener total de gastos (resumen mensual o ledger de saldo, sin recorrer el historial)"""
         if month and year:
-            query += " AND MONTH(fecha) = %s AND YEAR(fecha) = %s"
-            params.extend([month, year])
+            return self.rollup_model.get_month_total(usuario_id, 'gasto', month, year)
 
-        result = self.db.execute_query(query, tuple(params), fetch_one=True)
-        return result['total'] if result and result['total'] else 0
+        balance = self.balance_model.get(usuario_id)
+        return balance['total_gastos'] if balance and balance['total_gastos'] else 0
 
     def get_categories(self):
-        """Obtener todas las categorías de gastos"""
-        query = "SELECT * FROM categorias_gastos ORDER BY nombre"
-        return self.db.execute_query(query, fetch=True)
\ No newline at end of file
+        """Obtener todas las categorías de gastos (catálogo en memoria)"""
+        return category_catalog.all('gasto')
\ No newline at end of file
@@ -0,0 +1,94 @@
+from utils.database import Database
+from utils.helpers import month_range, keyset_page_query, keyset_page_result
+from models.balance import BalanceModel
+from models.rollup import RollupModel
+from models.category import category_catalog
+
+class IncomeModel:
+    def __init__(self):
+        self.db = Database()
+        self.balance_model = BalanceModel()
+        self.rollup_model = RollupModel()
+        self.table = "ingresos"
+
+    def create(self, usuario_id, concepto, monto, categoria_id, fecha, descripcion=None):
+        """Crear nuevo ingreso (y actualizar saldo y resumen mensual en la misma transacción)"""
+        query = f"""
+        INSERT INTO {self.table} (usuario_id, concepto, monto, categoria_id, fecha, descripcion)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        with self.db.transaction():
+            income_id = self.db.execute_query(
+                query,
+                (usuario_id, concepto, monto, categoria_id, fecha, descripcion)
+            )
+            self.balance_model.apply(usuario_id, ingresos=monto)
+            self.rollup_model.apply(usuario_id, 'ingreso', fecha, categoria_id, monto)
+        return income_id
+
+    def get_by_user(self, usuario_id, month=None, year=None):
+        """Obtener ingresos del usuario - ORDENADO POR FECHA DESCENDENTE (más reciente primero)"""
+        query = f"""
+        SELECT i.*, ci.nombre as categoria_nombre, ci.color, ci.icono
+        FROM {self.table} i
+        LEFT JOIN categorias_ingresos ci ON i.categoria_id = ci.id
+        WHERE i.usuario_id = %s
+        """
+        params = [usuario_id]
+
+        if month and year:
+            query += " AND i.fecha >= %s AND i.fecha < %s"
+            params.extend(month_range(year, month))
+
+        query += " ORDER BY i.fecha DESC, i.id DESC"
+        return self.db.execute_query(query, tuple(params), fetch=True)
+
+    def get_page(self, usuario_id, limit, cursor=None, start=None, end=None):
+        """Página de ingresos (más recientes primero) con paginación keyset sobre (fecha, id)
+
+        Devuelve (filas, next_cursor); next_cursor es None en la última página.
+        """
+        select = f"""
+        SELECT i.*, ci.nombre as categoria_nombre, ci.color, ci.icono
+        FROM {self.table} i
+        LEFT JOIN categorias_ingresos ci ON i.categoria_id = ci.id
+        """
+        query, params = keyset_page_query(select, 'i', usuario_id, limit, cursor, start, end)
+        return keyset_page_result(self.db.execute_query(query, params, fetch=True), limit)
+
+    def get_total(self, usuario_id, month=None, year=None):
+        """Obtener total de ingresos (resumen mensual o ledger de saldo, sin recorrer el historial)"""
+        if month and year:
+            return self.rollup_model.get_month_total(usuario_id, 'ingreso', month, year)
+
+        balance = self.balance_model.get(usuario_id)
+        return balance['total_ingresos'] if balance and balance['total_ingresos'] else 0
+
+    def get_by_id(self, ingreso_id, usuario_id):
+        """Obtener ingreso por ID"""
+        query = f"SELECT * FROM {self.table} WHERE id = %s AND usuario_id = %s"
+        return self.db.execute_query(query, (ingreso_id, usuario_id), fetch_one=True)
+
+    def delete(self, ingreso_id, usuario_id):
+        """Eliminar ingreso (y descontarlo de saldo y resumen mensual en la misma transacción)"""
+        with self.db.transaction():
+            income = self.db.execute_query(
+                f"SELECT monto, fecha, categoria_id FROM {self.table} WHERE id = %s AND usuario_id = %s FOR UPDATE",
+                (ingreso_id, usuario_id),
+                fetch_one=True
+            )
+            if not income:
+                return 0
+            affected = self.db.execute_update(
+                f"DELETE FROM {self.table} WHERE id = %s AND usuario_id = %s",
+                (ingreso_id, usuario_id)
+            )
+            self.balance_model.apply(usuario_id, ingresos=-income['monto'])
+            self.rollup_model.apply(
+                usuario_id, 'ingreso', income['fecha'], income['categoria_id'], -income['monto'], cantidad=-1
+            )
+        return affected
+
+    def get_categories(self):
+        """Obtener todas las categorías de ingresos (catálogo en memoria)"""
+        return category_catalog.all('ingreso')
@@ -0,0 +1,140 @@
+from utils.database import Database
+
+class RollupModel:
+    """Totales mensuales por (usuario, mes, tipo, categoría) mantenidos de forma incremental"""
+
+    TIPOS = {'ingreso': 'ingresos', 'gasto': 'gastos'}
+
+    def __init__(self):
+        self.db = Database()
+        self.table = "resumen_mensual"
+
+    @staticmethod
+    def mes_year(fecha):
+        """'YYYY-MM' a partir de un date/datetime o de un string 'YYYY-MM-DD'"""
+        if hasattr(fecha, 'strftime'):
+            return fecha.strftime('%Y-%m')
+        return str(fecha)[:7]
+
+    def apply(self, usuario_id, tipo, fecha, categoria_id, monto, cantidad=1):
+        """Sumar (o restar, con valores negativos) un movimiento a su celda mensual"""
+        query = f"""
+        INSERT INTO {self.table} (usuario_id, mes_year, tipo, categoria_id, total, cantidad)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            total = total + VALUES(total),
+            cantidad = cantidad + VALUES(cantidad)
+        """
+        return self.db.execute_query(
+            query,
+            (usuario_id, self.mes_year(fecha), tipo, categoria_id or 0, monto, cantidad)
+        )
+
+    def apply_many(self, usuario_id, cells):
+        """Aplicar varios movimientos ya agregados: {(tipo, mes_year, categoria_id): (monto, cantidad)}"""
+        query = f"""
+        INSERT INTO {self.table} (usuario_id, mes_year, tipo, categoria_id, total, cantidad)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            total = total + VALUES(total),
+            cantidad = cantidad + VALUES(cantidad)
+        """
+        rows = [
+            (usuario_id, mes_year, tipo, categoria_id or 0, monto, cantidad)
+            for (tipo, mes_year, categoria_id), (monto, cantidad) in cells.items()
+        ]
+        return self.db.execute_many(query, rows)
+
+    def get_month_total(self, usuario_id, tipo, month, year):
+        """Total de un tipo de movimiento en un mes"""
+        query = f"""
+        SELECT COALESCE(SUM(total), 0) as total
+        FROM {self.table}
+        WHERE usuario_id = %s AND mes_year = %s AND tipo = %s
+        """
+        result = self.db.execute_query(query, (usuario_id, f"{year}-{int(month):02d}", tipo), fetch_one=True)
+        return result['total'] if result and result['total'] else 0
+
+    def get_month_summary(self, usuario_id, tipo, month, year):
+        """Total y cantidad de movimientos de un tipo en un mes"""
+        query = f"""
+        SELECT COALESCE(SUM(total), 0) as total, COALESCE(SUM(cantidad), 0) as cantidad
+        FROM {self.table}
+        WHERE usuario_id = %s AND mes_year = %s AND tipo = %s
+        """
+        result = self.db.execute_query(query, (usuario_id, f"{year}-{int(month):02d}", tipo), fetch_one=True)
+        return {
+            'total': result['total'] if result else 0,
+            'cantidad': int(result['cantidad']) if result else 0
+        }
+
+    def get_by_category(self, usuario_id, tipo, month, year):
+        """Totales del mes agrupados por categoría"""
+        categories = 'categorias_gastos' if tipo == 'gasto' else 'categorias_ingresos'
+        query = f"""
+        SELECT r.categoria_id, c.nombre, c.color, c.icono, r.total, r.cantidad
+        FROM {self.table} r
+        LEFT JOIN {categories} c ON c.id = r.categoria_id
+        WHERE r.usuario_id = %s AND r.mes_year = %s AND r.tipo = %s AND r.total <> 0
+        ORDER BY r.total DESC
+        """
+        return self.db.execute_query(query, (usuario_id, f"{year}-{int(month):02d}", tipo), fetch=True)
+
+    def _raw_aggregate(self, usuario_id=None):
+        """SELECT que agrega ingresos/gastos con la misma forma que la tabla de resúmenes"""
+        where = "WHERE usuario_id = %s" if usuario_id is not None else ""
+        parts = []
+        params = []
+        for tipo, source in self.TIPOS.items():
+            parts.append(f"""
+            SELECT usuario_id, DATE_FORMAT(fecha, '%%Y-%%m') as mes_year, '{tipo}' as tipo,
+                   COALESCE(categoria_id, 0) as categoria_id,
+                   SUM(monto) as total, COUNT(*) as cantidad
+            FROM {source} {where}
+            GROUP BY usuario_id, DATE_FORMAT(fecha, '%%Y-%%m'), COALESCE(categoria_id, 0)
+            """)
+            if usuario_id is not None:
+                params.append(usuario_id)
+        return " UNION ALL ".join(parts), params
+
+    def rebuild(self, usuario_id=None):
+        """Reconstruir (backfill) los resúmenes desde ingresos y gastos"""
+        aggregate, params = self._raw_aggregate(usuario_id)
+        with self.db.transaction():
+            if usuario_id is None:
+                self.db.execute_update(f"DELETE FROM {self.table}")
+            else:
+                self.db.execute_update(f"DELETE FROM {self.table} WHERE usuario_id = %s", (usuario_id,))
+            return self.db.execute_update(f"""
+            INSERT INTO {self.table} (usuario_id, mes_year, tipo, categoria_id, total, cantidad)
+            {aggregate}
+            """, tuple(params))
+
+    def find_inconsistencies(self, usuario_id=None):
+        """Celdas donde el resumen no coincide con las tablas de movimientos"""
+        aggregate, params = self._raw_aggregate(usuario_id)
+        user_filter = "AND r.usuario_id = %s" if usuario_id is not None else ""
+        query = f"""
+        SELECT r.usuario_id, r.mes_year, r.tipo, r.categoria_id,
+               r.total as resumen_total, COALESCE(x.total, 0) as real_total,
+               r.cantidad as resumen_cantidad, COALESCE(x.cantidad, 0) as real_cantidad
+        FROM {self.table} r
+        LEFT JOIN ({aggregate}) x
+            ON x.usuario_id = r.usuario_id AND x.mes_year = r.mes_year
+            AND x.tipo = r.tipo AND x.categoria_id = r.categoria_id
+        WHERE (r.total <> COALESCE(x.total, 0) OR r.cantidad <> COALESCE(x.cantidad, 0)) {user_filter}
+        UNION ALL
+        SELECT x.usuario_id, x.mes_year, x.tipo, x.categoria_id,
+               0 as resumen_total, x.total as real_total,
+               0 as resumen_cantidad, x.cantidad as real_cantidad
+        FROM ({aggregate}) x
+        LEFT JOIN {self.table} r
+            ON r.usuario_id = x.usuario_id AND r.mes_year = x.mes_year
+            AND r.tipo = x.tipo AND r.categoria_id = x.categoria_id
+        WHERE r.usuario_id IS NULL
+        """
+        all_params = list(params)
+        if usuario_id is not None:
+            all_params.append(usuario_id)
+        all_params.extend(params)
+        return self.db.execute_query(query, tuple(all_params), fetch=True)
@@ -1,9 +1,16 @@
 from utils.database import Database
+from models.balance import BalanceModel
 from datetime import datetime
 
+
+class SavingsLimitError(Exception):
+    """El aporte haría superar la meta total del ahorro"""
+
+
 class SavingsModel:
     def __init__(self):
         self.db = Database()
+        self.balance_model = BalanceModel()
         self.table = "ahorros"
 
     def create(self, usuario_id, concepto, meta_total, fecha_objetivo=None, descripcion=None):
@@ -12,13 +19,20 @@ class SavingsModel:
         INSERT INTO {self.table} (usuario_id, concepto, meta_total, ahorrado_actual, fecha_inicio, fecha_objetivo, descripcion)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        return self.db.execute_query(
-            query, 
-            (usuario_id, concepto, meta_total, 0.00, datetime.now().date(), fecha_objetivo, descripcion)
-        )
+        with self.db.transaction():
+            ahorro_id = self.db.execute_query(
+                query, 
+                (usuario_id, concepto, meta_total, 0.00, datetime.now().date(), fecha_objetivo, descripcion)
+            )
+            self.balance_model.touch(usuario_id)
+        return ahorro_id
 
     def get_by_user(self, usuario_id):
         """Obtener ahorros del usuario"""
+        return self.db.execute_query(*self.by_user_query(usuario_id), fetch=True)
+
+    def by_user_query(self, usuario_id):
+        """SQL y parámetros del listado de ahorros (compartidos con las vistas async)"""
         query = f"""
         SELECT *,
                CASE 
@@ -31,7 +45,7 @@ class SavingsModel:
         WHERE usuario_id = %s 
         ORDER BY completado ASC, fecha_objetivo ASC
         """
-        return self.db.execute_query(query, (usuario_id,), fetch=True)
+        return query, (usuario_id,)
 
     def get_by_id(self, ahorro_id, usuario_id):
         """Obtener ahorro por ID"""
@@ -39,52 +53,84 @@ class SavingsModel:
         return self.db.execute_query(query, (ahorro_id, usuario_id), fetch_one=True)
 
     def add_savings(self, ahorro_id, usuario_id, monto):
-        """Agregar dinero al ahorro"""
-        # Primero obtener el estado actual del ahorro
-        current_saving = self.get_by_id(ahorro_id, usuario_id)
-        if not current_saving:
-            raise Exception("Ahorro no encontrado")
-        
-        ahorrado_actual = float(current_saving['ahorrado_actual'])
-        meta_total = float(current_saving['meta_total'])
-        nuevo_ahorrado = ahorrado_actual + monto
-        
-        # ✅ CORREGIDO: Usar cálculo preciso para determinar si está completado
-        # Usamos una pequeña tolerancia para evitar problemas de redondeo
-        completado = 1 if (nuevo_ahorrado + 0.001) >= meta_total else 0
-        
+        """Agregar dinero al ahorro con un UPDATE atómico y registrar el aporte en el historial
+
+        El tope de la meta y el flag completado se evalúan en SQL. completado va primero y
+        suma el aporte explícitamente: MySQL aplica el SET de izquierda a derecha y SQLite
+        sobre la fila original, así ambos ven el mismo valor. Devuelve la meta actualizada,
+        None si no existe, o lanza SavingsLimitError si el aporte supera la meta.
+        """
         query = f"""
-        UPDATE {self.table} 
-        SET ahorrado_actual = %s,
-            completado = %s
+        UPDATE {self.table}
+        SET completado = (ahorrado_actual + %s + 0.001 >= meta_total),
+            ahorrado_actual = ahorrado_actual + %s
         WHERE id = %s AND usuario_id = %s
+            AND ahorrado_actual + %s <= meta_total + 0.001
         """
-        return self.db.execute_query(query, (nuevo_ahorrado, completado, ahorro_id, usuario_id))
+        with self.db.transaction():
+            if not self.db.execute_update(query, (monto, monto, ahorro_id, usuario_id, monto)):
+                saving = self.get_by_id(ahorro_id, usuario_id)
+                if not saving:
+                    return None
+                meta_total = float(saving['meta_total'])
+                saldo_restante = meta_total - float(saving['ahorrado_actual'])
+                raise SavingsLimitError(
+                    f'No puedes ahorrar más de tu meta. Te faltan ${saldo_restante:,.0f} '
+                    f'para completar los ${meta_total:,.0f}'
+                )
+
+            # La fila quedó bloqueada por el UPDATE: el acumulado leído es el de este aporte
+            self.db.execute_query(f"""
+            INSERT INTO aportes_ahorro (ahorro_id, usuario_id, monto, ahorrado_resultante)
+            SELECT id, usuario_id, %s, ahorrado_actual
+            FROM {self.table}
+            WHERE id = %s AND usuario_id = %s
+            """, (monto, ahorro_id, usuario_id))
+            self.balance_model.touch(usuario_id)
+
+            return self.get_by_id(ahorro_id, usuario_id)
+
+    def get_contributions(self, ahorro_id, usuario_id):
+        """Historial de aportes de una meta (más antiguos primero)"""
+        query = """
+        SELECT id, monto, ahorrado_resultante, fecha_registro
+        FROM aportes_ahorro
+        WHERE ahorro_id = %s AND usuario_id = %s
+        ORDER BY fecha_registro ASC, id ASC
+        """
+        return self.db.execute_query(query, (ahorro_id, usuario_id), fetch=True)
 
     def update(self, ahorro_id, usuario_id, concepto, meta_total, fecha_objetivo, descripcion):
-        """Actualizar meta de ahorro"""
-        # Primero obtener el estado actual del ahorro
-        current_saving = self.get_by_id(ahorro_id, usuario_id)
-        if not current_saving:
-            raise Exception("Ahorro no encontrado")
-        
-        ahorrado_actual = float(current_saving['ahorrado_actual'])
-        
-        # ✅ CORREGIDO: Usar cálculo preciso para determinar si está completado
-        completado = 1 if (ahorrado_actual + 0.001) >= meta_total else 0
-        
+        """Actualizar meta de ahorro (completado se recalcula en SQL sobre el acumulado actual)"""
         query = f"""
         UPDATE {self.table} 
         SET concepto = %s, meta_total = %s, fecha_objetivo = %s, descripcion = %s,
-            completado = %s
+            completado = (ahorrado_actual + 0.001 >= %s)
         WHERE id = %s AND usuario_id = %s
         """
-        return self.db.execute_query(query, (concepto, meta_total, fecha_objetivo, descripcion, completado, ahorro_id, usuario_id))
+        with self.db.transaction():
+            affected = self.db.execute_update(
+                query, (concepto, meta_total, fecha_objetivo, descripcion, meta_total, ahorro_id, usuario_id)
+            )
+            if not affected and not self.get_by_id(ahorro_id, usuario_id):
+                raise Exception("Ahorro no encontrado")
+            self.balance_model.touch(usuario_id)
+        return affected
 
     def delete(self, ahorro_id, usuario_id):
-        """Eliminar meta de ahorro"""
-        query = f"DELETE FROM {self.table} WHERE id = %s AND usuario_id = %s"
-        return self.db.execute_query(query, (ahorro_id, usuario_id))
+        """Eliminar meta de ahorro (y su historial de aportes)"""
+        with self.db.transaction():
+            affected = self.db.execute_update(
+                f"DELETE FROM {self.table} WHERE id = %s AND usuario_id = %s",
+                (ahorro_id, usuario_id)
+            )
+            if affected:
+                self.db.execute_update(
+                    "DELETE FROM aportes_ahorro WHERE ahorro_id = %s AND usuario_id = %s",
+                    (ahorro_id, usuario_id)
+                )
+                self.balance_model.touch(usuario_id)
+        return affected
 
     def get_savings_summary(self, usuario_id):
         """Obtener resumen de ahorros"""
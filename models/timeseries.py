@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+import numpy as np
+from utils.database import Database
+from models.category import category_catalog
+
+
+class TimeSeriesModel:
+    """Series de ingresos, gastos y neto por día, semana o mes para cualquier rango
+
+    La base agrega por (tipo, día[, categoría]) con el índice (usuario_id, fecha, id) y sin
+    funciones de fecha en el GROUP BY; con un rango alineado a meses y granularidad mensual
+    se lee directamente de resumen_mensual. El reagrupado a períodos y el relleno de huecos
+    se hacen con arrays de NumPy (np.bincount), sin recorrer las filas en Python.
+    """
+
+    GRANULARITIES = ('dia', 'semana', 'mes')
+    TIPOS = {'ingreso': 'ingresos', 'gasto': 'gastos'}
+
+    def __init__(self):
+        self.db = Database()
+
+    @staticmethod
+    def bucket_count(start, end, granularity):
+        """Cantidad de períodos del rango semiabierto [start, end)"""
+        last = end - timedelta(days=1)
+        if granularity == 'dia':
+            return (end - start).days
+        if granularity == 'semana':
+            return (last - (start - timedelta(days=start.weekday()))).days // 7 + 1
+        return (last.year * 12 + last.month) - (start.year * 12 + start.month) + 1
+
+    def get_series(self, usuario_id, start, end, granularity='mes', by_category=False):
+        """Series del rango [start, end) con todos los períodos (los vacíos en 0)
+
+        Devuelve {'periodos', 'ingresos', 'gastos', 'neto'} y, con by_category,
+        'categorias': {tipo: [{id, nombre, color, icono, serie}]} ordenadas por total.
+        Los períodos se identifican por 'YYYY-MM-DD' (día, lunes de la semana) o 'YYYY-MM'.
+        """
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"Granularidad inválida: {granularity}")
+
+        if granularity == 'mes' and start.day == 1 and end.day == 1:
+            rows = self._monthly_rows(usuario_id, start, end, by_category)
+        else:
+            rows = self._daily_rows(usuario_id, start, end, by_category)
+
+        periods, totals = self._resample(rows, start, end, granularity)
+
+        ingresos = totals.get(('ingreso', None)) or [0.0] * len(periods)
+        gastos = totals.get(('gasto', None)) or [0.0] * len(periods)
+        result = {
+            'periodos': periods,
+            'ingresos': ingresos,
+            'gastos': gastos,
+            'neto': [round(i - g, 2) for i, g in zip(ingresos, gastos)]
+        }
+
+        if by_category:
+            result['categorias'] = {}
+            for tipo in self.TIPOS:
+                series = []
+                for (row_tipo, categoria_id), serie in totals.items():
+                    if row_tipo != tipo or categoria_id is None:
+                        continue
+                    category = category_catalog.get(tipo, categoria_id) or {}
+                    series.append({
+                        'id': categoria_id,
+                        'nombre': category.get('nombre', 'Sin categoría'),
+                        'color': category.get('color'),
+                        'icono': category.get('icono'),
+                        'serie': serie
+                    })
+                series.sort(key=lambda item: sum(item['serie']), reverse=True)
+                result['categorias'][tipo] = series
+        return result
+
+    def _daily_rows(self, usuario_id, start, end, by_category):
+        """(tipo, día, categoria_id o None, total) agregados en la base, un round trip"""
+        categoria = 'categoria_id' if by_category else 'NULL'
+        group_by = 'fecha, categoria_id' if by_category else 'fecha'
+        parts = [f"""
+        SELECT '{tipo}' as tipo, fecha as periodo, {categoria} as categoria_id, SUM(monto) as total
+        FROM {table}
+        WHERE usuario_id = %s AND fecha >= %s AND fecha < %s
+        GROUP BY {group_by}
+        """ for tipo, table in self.TIPOS.items()]
+        params = (usuario_id, start, end) * len(parts)
+        rows = self.db.execute_query(' UNION ALL '.join(parts), params, fetch=True)
+        return [(row['tipo'], row['periodo'], row['categoria_id'], row['total']) for row in rows]
+
+    def _monthly_rows(self, usuario_id, start, end, by_category):
+        """(tipo, primer día del mes, categoria_id o None, total) desde resumen_mensual"""
+        categoria = 'categoria_id' if by_category else 'NULL'
+        group_by = 'tipo, mes_year, categoria_id' if by_category else 'tipo, mes_year'
+        query = f"""
+        SELECT tipo, mes_year, {categoria} as categoria_id, SUM(total) as total
+        FROM resumen_mensual
+        WHERE usuario_id = %s AND mes_year >= %s AND mes_year < %s
+        GROUP BY {group_by}
+        """
+        rows = self.db.execute_query(
+            query, (usuario_id, start.strftime('%Y-%m'), end.strftime('%Y-%m')), fetch=True
+        )
+        return [
+            (row['tipo'], date(int(row['mes_year'][:4]), int(row['mes_year'][5:7]), 1),
+             row['categoria_id'], row['total'])
+            for row in rows
+        ]
+
+    def _resample(self, rows, start, end, granularity):
+        """Índice de período por fila y sumas por serie con np.bincount"""
+        count = self.bucket_count(start, end, granularity)
+        if granularity == 'dia':
+            first = np.datetime64(start, 'D')
+            labels = np.arange(first, first + count).astype(str)
+        elif granularity == 'semana':
+            first = np.datetime64(start - timedelta(days=start.weekday()), 'D')
+            labels = np.arange(first, first + 7 * count, 7).astype(str)
+        else:
+            first = np.datetime64(start, 'M')
+            labels = np.arange(first, first + count).astype(str)
+
+        totals = {}
+        if rows:
+            tipos, days, categorias, montos = zip(*rows)
+            days = np.array(days, dtype='datetime64[D]')
+            if granularity == 'mes':
+                index = (days.astype('datetime64[M]') - first).astype(np.int64)
+            elif granularity == 'semana':
+                index = (days - first).astype(np.int64) // 7
+            else:
+                index = (days - first).astype(np.int64)
+            montos = np.array(montos, dtype=np.float64)
+
+            # Una clave por serie (tipo, categoría) y todas las sumas en un solo bincount 2D
+            keys = [(tipo, None) for tipo in self.TIPOS]
+            keys += sorted({(tipo, categoria) for tipo, categoria in zip(tipos, categorias) if categoria is not None},
+                           key=lambda key: (key[0], key[1]))
+            positions = {key: number for number, key in enumerate(keys)}
+            total_series = np.array([positions[(tipo, None)] for tipo in tipos], dtype=np.int64)
+            sums = np.bincount(total_series * count + index, weights=montos, minlength=len(keys) * count)
+            if len(keys) > len(self.TIPOS):
+                # Filas sin categoría solo cuentan en el total de su tipo
+                category_series = np.array([positions[(tipo, categoria)] if categoria is not None else -1
+                                            for tipo, categoria in zip(tipos, categorias)], dtype=np.int64)
+                mask = category_series >= 0
+                sums += np.bincount(category_series[mask] * count + index[mask], weights=montos[mask],
+                                    minlength=len(keys) * count)
+            sums = np.round(sums.reshape(len(keys), count), 2)
+            totals = {key: sums[number].tolist() for key, number in positions.items()}
+        return labels.tolist(), totals
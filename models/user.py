@@ -1,5 +1,11 @@
-import bcrypt
+import pymysql
 from utils.database import Database
+from utils.passwords import hash_password, verify_password, needs_rehash
+
+
+class EmailAlreadyRegisteredError(Exception):
+    """Ya existe un usuario con ese email"""
+
 
 class UserModel:
     def __init__(self):
@@ -7,18 +13,23 @@ class UserModel:
         self.table = "usuarios"
 
     def create(self, nombre, email, clave, rol_id=2):
-        """Crear nuevo usuario con contraseña hasheada"""
-        hashed_password = bcrypt.hashpw(clave.encode('utf-8'), bcrypt.gensalt())
+        """Crear nuevo usuario con contraseña hasheada (un solo INSERT; el email es único)"""
+        hashed_password = hash_password(clave)
         
         query = f"""
         INSERT INTO {self.table} (nombre, email, clave, rol_id, activo) 
         VALUES (%s, %s, %s, %s, %s)
         """
         
-        return self.db.execute_query(
-            query, 
-            (nombre, email, hashed_password.decode('utf-8'), rol_id, 1)
-        )
+        try:
+            return self.db.execute_query(
+                query, 
+                (nombre, email, hashed_password, rol_id, 1)
+            )
+        except pymysql.err.IntegrityError as e:
+            if e.args and e.args[0] == 1062:  # ER_DUP_ENTRY
+                raise EmailAlreadyRegisteredError(email)
+            raise
 
     def get_by_email(self, email):
         """Obtener usuario por email"""
@@ -28,23 +39,29 @@ class UserModel:
 
     def verify_password(self, plain_password, hashed_password):
         """Verificar contraseña - compatible con formatos $2y$ y $2b$"""
-        try:
-            # Convertir formato $2y$ a $2b$ si es necesario
-            if hashed_password.startswith('$2y$'):
-                hashed_password = '$2b$' + hashed_password[4:]
-            
-            result = bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
-            return result
-        except Exception as e:
-            print(f"Error en verificación de contraseña: {e}")
-            return False
+        return verify_password(plain_password, hashed_password)
 
     def login(self, email, password):
-        """Autenticar usuario"""
+        """Autenticar usuario; si el hash usa otro formato o costo se actualiza al vigente"""
         user = self.get_by_email(email)
-        if user and self.verify_password(password, user['clave']):
-            return user
-        return None
+        if not user or not self.verify_password(password, user['clave']):
+            return None
+
+        if needs_rehash(user['clave']):
+            try:
+                # Solo si nadie cambió la clave mientras tanto
+                self.db.execute_query(
+                    f"UPDATE {self.table} SET clave = %s WHERE id = %s AND clave = %s",
+                    (hash_password(password), user['id'], user['clave'])
+                )
+            except Exception as e:
+                print(f"Error al actualizar el hash de contraseña: {e}")
+        return user
+
+    def set_password(self, user_id, clave):
+        """Cambiar la contraseña de un usuario"""
+        query = f"UPDATE {self.table} SET clave = %s WHERE id = %s"
+        return self.db.execute_query(query, (hash_password(clave), user_id))
 
     def email_exists(self, email):
         """Verificar si el email ya existe"""
@@ -0,0 +1,110 @@
+"""Pool aiomysql para las vistas async de /async (modo ASYNC_VIEWS)
+
+Flask sigue siendo WSGI: cada vista async corre su propio event loop dentro del hilo del
+worker, que queda ocupado durante todo el request. Por eso este modo no aumenta el
+throughput ni la cantidad de requests simultáneos respecto del pool sync; lo único que
+aporta es paralelismo dentro de un request (/async/resumen lanza sus tres consultas a la
+vez con asyncio.gather), es decir menos latencia por request a cambio de más conexiones.
+Para ganar concurrencia habría que servir estas vistas desde un stack ASGI (Quart).
+"""
+import asyncio
+import importlib.util
+import threading
+import time
+from config import Config
+from utils.query_stats import query_stats
+
+try:
+    import aiomysql
+except ImportError:  # dependencia opcional: pip install -r requirements-async.txt
+    aiomysql = None
+
+
+class AsyncDatabase:
+    """Acceso no bloqueante a MySQL con aiomysql para las vistas async
+
+    Flask ejecuta cada vista async en su propio event loop, así que el pool vive en un
+    loop dedicado en un hilo de fondo; las vistas esperan sus consultas con
+    asyncio.wrap_future y varias consultas independientes pueden correr a la vez
+    (asyncio.gather), cada una en su conexión.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pool = None
+
+    @staticmethod
+    def available():
+        """Backend MySQL con aiomysql y asgiref (vistas async de Flask) instalados"""
+        return (Config.DB_BACKEND == 'mysql' and aiomysql is not None
+                and importlib.util.find_spec('asgiref') is not None)
+
+    def _ensure_started(self):
+        if self._pool is not None:
+            return
+        if aiomysql is None:
+            raise RuntimeError('aiomysql no está instalado (pip install -r requirements-async.txt)')
+
+        with self._lock:
+            if self._pool is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='async-db', daemon=True).start()
+            pool = asyncio.run_coroutine_threadsafe(aiomysql.create_pool(
+                host=Config.MYSQL_HOST,
+                port=Config.MYSQL_PORT,
+                user=Config.MYSQL_USER,
+                password=Config.MYSQL_PASSWORD,
+                db=Config.MYSQL_DB,
+                charset='utf8mb4',
+                minsize=Config.DB_POOL_MIN_SIZE,
+                maxsize=Config.ASYNC_DB_POOL_MAX_SIZE,
+                connect_timeout=Config.DB_CONNECT_TIMEOUT,
+                pool_recycle=Config.DB_POOL_MAX_LIFETIME,
+                autocommit=True
+            ), loop).result()
+            # El loop queda visible antes que el pool: _submit solo lo usa si hay pool
+            self._loop = loop
+            self._pool = pool
+
+    async def _execute(self, query, params, fetch_one):
+        async with self._pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params or ())
+                if fetch_one:
+                    return await cursor.fetchone()
+                return await cursor.fetchall()
+
+    async def _submit(self, query, params, fetch_one):
+        self._ensure_started()
+        start = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(self._execute(query, params, fetch_one), self._loop)
+        result = await asyncio.wrap_future(future)
+        if Config.QUERY_STATS_ENABLED:
+            rows = len(result) if isinstance(result, (list, tuple)) else int(result is not None)
+            query_stats.record(query, params, rows, time.perf_counter() - start)
+        return result
+
+    async def fetch_all(self, query, params=None):
+        """Todas las filas de una consulta (lista de dicts)"""
+        return await self._submit(query, params, fetch_one=False)
+
+    async def fetch_one(self, query, params=None):
+        """Primera fila de una consulta, o None"""
+        return await self._submit(query, params, fetch_one=True)
+
+    def close(self):
+        """Cerrar el pool y detener el loop de fondo"""
+        with self._lock:
+            if self._pool is None:
+                return
+            self._pool.close()
+            asyncio.run_coroutine_threadsafe(self._pool.wait_closed(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._pool = None
+            self._loop = None
+
+
+# Instancia compartida por todo el proceso
+async_db = AsyncDatabase()
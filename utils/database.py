@@ -1,9 +1,167 @@
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import pymysql
+from flask import g, has_request_context
 from config import Config
+from utils.query_stats import query_stats, timed
 
-class Database:
-    def get_connection(self):
-        """Obtener conexión a la base de datos"""
+
+class PoolTimeoutError(Exception):
+    """No se pudo obtener una conexión del pool dentro del tiempo límite"""
+
+
+class _PooledConnection:
+    """Conexión física junto con los metadatos que usa el pool"""
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Pool de conexiones thread-safe compartido por todo el proceso"""
+
+    def __init__(self, factory, min_size=1, max_size=10, timeout=5.0,
+                 max_lifetime=1800, ping_interval=30):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError('Tamaño de pool inválido')
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self._idle = deque()
+        self._checked_out = {}
+        self._size = 0
+        self._cond = threading.Condition()
+
+        for _ in range(min_size):
+            self._size += 1
+            try:
+                self._idle.append(_PooledConnection(self.factory()))
+            except Exception:
+                self._size -= 1
+                raise
+
+    def acquire(self, timeout=None):
+        """Obtener una conexión sana, esperando como máximo `timeout` segundos (por defecto el del pool)"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()  # LIFO: la más recién usada
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f'Pool agotado: {self.max_size} conexiones en uso '
+                            f'tras esperar {timeout}s'
+                        )
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    entry = _PooledConnection(self.factory())
+                except Exception:
+                    self._forget()
+                    raise
+            elif not self._is_healthy(entry):
+                self._close(entry)
+                continue
+
+            with self._cond:
+                self._checked_out[id(entry.conn)] = entry
+            return entry.conn
+
+    def try_acquire(self):
+        """Conexión sin esperar: None si no hay libres y el pool está al máximo"""
+        try:
+            return self.acquire(timeout=0)
+        except PoolTimeoutError:
+            return None
+
+    def release(self, conn, discard=False):
+        """Devolver una conexión al pool (o cerrarla si está dañada o vencida)"""
+        with self._cond:
+            entry = self._checked_out.pop(id(conn), None)
+        if entry is None:
+            return
+
+        if discard or not entry.conn.open or self._expired(entry):
+            self._close(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def close_all(self):
+        """Cerrar las conexiones libres (las que están en uso se cierran al devolverse)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self):
+        """Estado actual del pool"""
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._checked_out),
+                'max_size': self.max_size,
+            }
+
+    def _expired(self, entry):
+        return self.max_lifetime and time.monotonic() - entry.created_at >= self.max_lifetime
+
+    def _is_healthy(self, entry):
+        """Health check al entregar: vida máxima y ping si lleva tiempo inactiva"""
+        if not entry.conn.open or self._expired(entry):
+            return False
+        if time.monotonic() - entry.last_used >= self.ping_interval:
+            try:
+                entry.conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def _close(self, entry):
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+
+class MySQLBackend:
+    """Backend por defecto: servidor MySQL vía PyMySQL (el SQL de los modelos ya está en su dialecto)"""
+
+    name = 'mysql'
+    migrations_subdir = ''
+
+    def connect(self):
+        """Nueva conexión física"""
         return pymysql.connect(
             host=Config.MYSQL_HOST,
             user=Config.MYSQL_USER,
@@ -11,29 +169,275 @@ class Database:
             database=Config.MYSQL_DB,
             port=Config.MYSQL_PORT,
             charset='utf8mb4',
+            connect_timeout=Config.DB_CONNECT_TIMEOUT,
             cursorclass=pymysql.cursors.DictCursor
         )
 
+
+_backend = None
+_backend_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+_savepoints = itertools.count(1)
+
+
+def get_backend():
+    """Backend configurado en DB_BACKEND ('mysql' o 'sqlite'), creado una vez por proceso
+
+    Todo backend entrega conexiones con la interfaz de PyMySQL (cursores de dicts,
+    commit/rollback, ping) y errores de pymysql.err, así Database y el pool no cambian.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Config.DB_BACKEND == 'sqlite':
+                    from utils.sqlite_backend import SQLiteBackend
+                    _backend = SQLiteBackend(Config.SQLITE_PATH, Config.SQLITE_BUSY_TIMEOUT)
+                elif Config.DB_BACKEND == 'mysql':
+                    _backend = MySQLBackend()
+                else:
+                    raise ValueError(f"DB_BACKEND desconocido: {Config.DB_BACKEND}")
+    return _backend
+
+
+def get_pool():
+    """Obtener (o crear) el pool de conexiones del proceso"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    Database().get_connection,
+                    min_size=Config.DB_POOL_MIN_SIZE,
+                    max_size=Config.DB_POOL_MAX_SIZE,
+                    timeout=Config.DB_POOL_TIMEOUT,
+                    max_lifetime=Config.DB_POOL_MAX_LIFETIME,
+                    ping_interval=Config.DB_POOL_PING_INTERVAL
+                )
+    return _pool
+
+
+class Database:
+    def get_connection(self):
+        """Obtener conexión a la base de datos (del backend configurado)"""
+        return get_backend().connect()
+
+    @staticmethod
+    def init_app(app):
+        """Registrar la unidad de trabajo por request (una conexión, un commit)"""
+
+        @app.after_request
+        def commit_unit_of_work(response):
+            conn = g.get('_db_connection')
+            if conn is not None:
+                if response.status_code >= 500:
+                    conn.rollback()
+                else:
+                    conn.commit()
+                g._db_committed = True
+            return response
+
+        @app.teardown_request
+        def release_unit_of_work(exc):
+            conn = g.pop('_db_connection', None)
+            if conn is None:
+                return
+            committed = g.pop('_db_committed', False)
+            discard = False
+            if exc is not None or not committed:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            get_pool().release(conn, discard=discard)
+
+    def _bound_connection(self):
+        """Conexión ligada al contexto actual (transacción explícita o request)"""
+        conn = getattr(_local, 'connection', None)
+        if conn is not None:
+            return conn
+        if has_request_context():
+            conn = g.get('_db_connection')
+            if conn is None:
+                conn = get_pool().acquire()
+                g._db_connection = conn
+            return conn
+        return None
+
+    @contextmanager
+    def connection(self):
+        """Conexión del contexto actual o, fuera de él, una prestada del pool"""
+        conn = self._bound_connection()
+        if conn is not None:
+            yield conn
+            return
+
+        conn = get_pool().acquire()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = isinstance(e, pymysql.err.OperationalError)
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            get_pool().release(conn, discard=broken)
+
+    @contextmanager
+    def bind(self, conn):
+        """Ligar al hilo actual una conexión ya tomada del pool (p. ej. en un hilo auxiliar)
+
+        Al salir se descarta lo pendiente y la conexión vuelve al pool.
+        """
+        _local.connection = conn
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = isinstance(e, pymysql.err.OperationalError)
+            raise
+        finally:
+            _local.connection = None
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            get_pool().release(conn, discard=broken)
+
+    @contextmanager
+    def transaction(self):
+        """Bloque atómico: SAVEPOINT dentro de la unidad de trabajo, transacción propia fuera de ella"""
+        conn = self._bound_connection()
+        if conn is not None:
+            name = f"sp_{next(_savepoints)}"
+            with conn.cursor() as cursor:
+                cursor.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except Exception:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                raise
+            with conn.cursor() as cursor:
+                cursor.execute(f"RELEASE SAVEPOINT {name}")
+            return
+
+        conn = get_pool().acquire()
+        _local.connection = conn
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            broken = isinstance(e, pymysql.err.OperationalError)
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            _local.connection = None
+            get_pool().release(conn, discard=broken)
+
     def execute_query(self, query, params=None, fetch=False, fetch_one=False):
         """Ejecutar consulta en la base de datos"""
-        connection = self.get_connection()
+        bound = self._bound_connection()
+        if bound is not None:
+            # Dentro de una unidad de trabajo: el commit lo hace quien la abrió
+            with bound.cursor() as cursor:
+                return self._run(cursor, query, params, fetch, fetch_one)
+
+        connection = get_pool().acquire()
+        broken = False
         try:
             with connection.cursor() as cursor:
-                cursor.execute(query, params or ())
-                
-                if fetch:
-                    result = cursor.fetchall()
-                elif fetch_one:
-                    result = cursor.fetchone()
-                else:
-                    result = cursor.lastrowid
-                
-                if not fetch and not fetch_one:
-                    connection.commit()
-                
-                return result
+                result = self._run(cursor, query, params, fetch, fetch_one)
+
+            if not fetch and not fetch_one:
+                connection.commit()
+
+            return result
         except Exception as e:
-            connection.rollback()
+            broken = isinstance(e, pymysql.err.OperationalError)
+            try:
+                connection.rollback()
+            except Exception:
+                broken = True
             raise e
         finally:
-            connection.close()
\ No newline at end of file
+            get_pool().release(connection, discard=broken)
+
+    def execute_update(self, query, params=None):
+        """Ejecutar UPDATE/DELETE y devolver el número de filas afectadas"""
+        bound = self._bound_connection()
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                def run():
+                    affected = cursor.execute(query, params or ())
+                    return affected, affected
+
+                affected = timed(query, params, run)
+            if bound is None:
+                conn.commit()
+            return affected
+
+    def execute_many(self, query, rows):
+        """Ejecutar la misma sentencia para muchas filas (INSERT ... VALUES se envía multi-fila)"""
+        if not rows:
+            return 0
+        bound = self._bound_connection()
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                def run():
+                    affected = cursor.executemany(query, rows)
+                    return affected, affected
+
+                affected = timed(query, rows[0], run)
+            if bound is None:
+                conn.commit()
+            return affected
+
+    def stream_query(self, query, params=None, batch_size=1000):
+        """Generador de filas con cursor sin buffer (memoria constante), en su propia conexión del pool"""
+        conn = get_pool().acquire()
+        broken = False
+        try:
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            start = time.perf_counter()
+            cursor.execute(query, params or ())
+            streamed = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                streamed += len(rows)
+                yield from rows
+            cursor.close()
+            conn.rollback()
+            if Config.QUERY_STATS_ENABLED:
+                # Incluye el tiempo del cliente consumiendo el stream
+                query_stats.record(query, params, streamed, time.perf_counter() - start)
+        except BaseException:
+            # Cliente desconectado o error a mitad del stream: quedan filas sin leer en el
+            # socket, así que la conexión se descarta en lugar de drenarla
+            broken = True
+            raise
+        finally:
+            get_pool().release(conn, discard=broken)
+
+    def _run(self, cursor, query, params, fetch, fetch_one):
+        def run():
+            affected = cursor.execute(query, params or ())
+            if fetch:
+                rows = cursor.fetchall()
+                return rows, len(rows)
+            if fetch_one:
+                return cursor.fetchone(), cursor.rowcount
+            return cursor.lastrowid, affected
+
+        return timed(query, params, run)
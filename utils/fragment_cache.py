@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+from flask import request, session
+from markupsafe import Markup
+from utils.http_cache import current_data_version, is_uncacheable
+from config import Config
+
+
+class FragmentCache:
+    """Caché LRU de HTML renderizado, con tope de memoria en bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # clave -> (html, bytes)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, html):
+        size = len(html.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (html, size)
+            self._size += size
+            # Expulsar los menos usados hasta volver a entrar en el tope
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entradas': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Instancia compartida por todo el proceso
+fragment_cache = FragmentCache(Config.FRAGMENT_CACHE_MAX_BYTES)
+
+
+def cached_fragment(block, vary=None, caller=None):
+    """Bloque de plantilla cacheado: {% call cached_fragment('nombre', vary=...) %}...{% endcall %}
+
+    La clave es (usuario, bloque, versión de datos del usuario, vary). Cualquier escritura
+    del usuario sube su versión, así las copias viejas dejan de usarse y el LRU las expulsa.
+    Sin vary se usa la URL completa y la fecha del día.
+    """
+    user_id = session.get('user_id')
+    if not Config.FRAGMENT_CACHE_ENABLED or user_id is None:
+        return caller()
+    if is_uncacheable():
+        # Página de respaldo tras un error: se renderiza pero no se guarda
+        return caller()
+
+    if vary is None:
+        vary = (request.full_path, date.today().isoformat())
+    key = (Config.ETAG_SALT, user_id, block, current_data_version(user_id), vary)
+
+    html = fragment_cache.get(key)
+    if html is None:
+        html = str(caller())
+        fragment_cache.set(key, html)
+    return Markup(html)
@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, date, timedelta, MINYEAR, MAXYEAR
+import base64
+import binascii
 import decimal
 
 def format_currency(value):
@@ -19,4 +21,110 @@ def decimal_to_float(value):
     """Convertir decimal a float para JSON"""
     if isinstance(value, decimal.Decimal):
         return float(value)
-    return value
\ No newline at end of file
+    return value
+
+def month_range(year, month):
+    """Rango semiabierto [inicio, fin) de un mes, para filtrar por fecha usando índices
+
+    Lanza ValueError si el año o el mes no son válidos.
+    """
+    if not 1 <= int(month) <= 12:
+        raise ValueError('Mes inválido')
+    if not MINYEAR <= int(year) < MAXYEAR:
+        raise ValueError('Año inválido')
+    start = date(int(year), int(month), 1)
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+def encode_cursor(fecha, row_id):
+    """Cursor opaco para paginación keyset sobre (fecha, id)"""
+    if hasattr(fecha, 'strftime'):
+        fecha = fecha.strftime('%Y-%m-%d')
+    raw = f"{fecha}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """(fecha, id) a partir de un cursor; None si no viene o es inválido"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        fecha, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.strptime(fecha, '%Y-%m-%d').date(), int(row_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+def keyset_page_query(select, alias, usuario_id, limit, cursor=None, start=None, end=None):
+    """SQL y parámetros de una página keyset sobre (fecha, id), más recientes primero
+
+    select es el SELECT ... FROM ... JOIN sin WHERE y alias el de la tabla paginada. Se pide
+    una fila de más para saber si hay página siguiente (ver keyset_page_result).
+    """
+    query = f"{select} WHERE {alias}.usuario_id = %s"
+    params = [usuario_id]
+
+    if start:
+        query += f" AND {alias}.fecha >= %s"
+        params.append(start)
+    if end:
+        query += f" AND {alias}.fecha < %s"
+        params.append(end)
+
+    position = decode_cursor(cursor)
+    if position:
+        # Continuar justo después de la última fila entregada
+        query += f" AND ({alias}.fecha < %s OR ({alias}.fecha = %s AND {alias}.id < %s))"
+        params.extend([position[0], position[0], position[1]])
+
+    query += f" ORDER BY {alias}.fecha DESC, {alias}.id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, tuple(params)
+
+def keyset_page_result(rows, limit):
+    """Recortar la fila extra pedida y calcular el cursor de la página siguiente"""
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]['fecha'], rows[-1]['id'])
+
+def encode_activity_cursor(fecha_registro, tipo, row_id):
+    """Cursor opaco del feed de actividad sobre (fecha_registro, tipo, id)"""
+    if hasattr(fecha_registro, 'strftime'):
+        fecha_registro = fecha_registro.strftime('%Y-%m-%d %H:%M:%S')
+    raw = f"{fecha_registro}|{tipo}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_activity_cursor(cursor):
+    """(fecha_registro, tipo, id) a partir de un cursor del feed; None si no viene o es inválido"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        fecha_registro, tipo, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        if tipo not in ('ingreso', 'gasto'):
+            return None
+        return datetime.strptime(fecha_registro, '%Y-%m-%d %H:%M:%S'), tipo, int(row_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+def parse_page_args(args, default_limit, max_limit):
+    """Leer cursor, limit y rango de fechas (desde/hasta inclusivos, YYYY-MM-DD) de request.args
+
+    Devuelve (cursor, limit, inicio, fin) con el rango semiabierto [inicio, fin).
+    Lanza ValueError si algún parámetro es inválido.
+    """
+    cursor = args.get('cursor')
+    if cursor and decode_cursor(cursor) is None:
+        raise ValueError('Cursor inválido')
+
+    limit = args.get('limit', default_limit, type=int)
+    if limit is None or limit < 1:
+        raise ValueError('limit inválido')
+    limit = min(limit, max_limit)
+
+    desde = args.get('desde')
+    hasta = args.get('hasta')
+    start = datetime.strptime(desde, '%Y-%m-%d').date() if desde else None
+    end = datetime.strptime(hasta, '%Y-%m-%d').date() + timedelta(days=1) if hasta else None
+    return cursor, limit, start, end
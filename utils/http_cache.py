@@ -0,0 +1,63 @@
+import hashlib
+from datetime import date
+from functools import wraps
+from flask import g, request, session, make_response
+from models.balance import BalanceModel
+from config import Config
+
+_balance_model = BalanceModel()
+
+
+def current_data_version(user_id):
+    """Versión de datos del usuario, leída una sola vez por request"""
+    versions = g.setdefault('_data_versions', {})
+    if user_id not in versions:
+        versions[user_id] = _balance_model.get_version(user_id)
+    return versions[user_id]
+
+
+def mark_uncacheable():
+    """Marcar la respuesta del request como no cacheable (p. ej. la página de respaldo tras un error)
+
+    data_version_etag no le pone ETag y cached_fragment no guarda sus bloques: si no, la
+    versión degradada quedaría asociada a la versión de datos del usuario hasta su próxima escritura.
+    """
+    g._uncacheable = True
+
+
+def is_uncacheable():
+    """La vista marcó su respuesta con mark_uncacheable()"""
+    return g.get('_uncacheable', False)
+
+
+def data_version_etag(view):
+    """GET condicional para vistas de un usuario: ETag derivado de su versión de datos
+
+    La versión vive en saldos_usuario y sube con cada escritura de ingresos, gastos,
+    presupuestos o ahorros. Si el cliente envía el mismo ETag se responde 304 leyendo
+    solo esa fila, sin ejecutar la vista.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Sin sesión la vista redirige; con mensajes flash pendientes hay que renderizar
+        if request.method != 'GET' or 'user_id' not in session or '_flashes' in session:
+            return view(*args, **kwargs)
+
+        user_id = session['user_id']
+        version = current_data_version(user_id)
+        # La fecha forma parte de la clave: los valores por defecto dependen del mes actual
+        key = f"{Config.ETAG_SALT}:{user_id}:{version}:{date.today()}:{request.full_path}"
+        etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or is_uncacheable():
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
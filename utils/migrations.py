@@ -0,0 +1,96 @@
+import hashlib
+import os
+import re
+from utils.database import Database, get_backend
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+class MigrationError(Exception):
+    """El esquema de la base de datos no coincide con las migraciones del repositorio"""
+
+
+class MigrationRunner:
+    """Aplica en orden los archivos migrations/NNNN_nombre.sql y registra cuáles se aplicaron
+
+    Cada backend tiene su propia serie (MySQL en migrations/, SQLite en migrations/sqlite/).
+    """
+
+    LOCK_NAME = 'presupuesto_migrations'
+
+    def __init__(self, directory=None):
+        self.db = Database()
+        self.directory = directory or os.path.join(MIGRATIONS_DIR, get_backend().migrations_subdir)
+        self.table = "schema_migrations"
+
+    def available(self):
+        """Migraciones del repositorio ordenadas por versión"""
+        migrations = []
+        for filename in sorted(os.listdir(self.directory)):
+            match = re.match(r'^(\d+)_(\w+)\.sql$', filename)
+            if not match:
+                continue
+            with open(os.path.join(self.directory, filename), encoding='utf-8') as f:
+                sql = f.read()
+            migrations.append({
+                'version': int(match.group(1)),
+                'nombre': match.group(2),
+                'sql': sql,
+                'checksum': hashlib.sha256(sql.encode('utf-8')).hexdigest()
+            })
+        return migrations
+
+    def applied(self):
+        """Migraciones registradas en la base de datos, por versión"""
+        self.db.execute_query(f"""
+        CREATE TABLE IF NOT EXISTS {self.table} (
+            version INT NOT NULL PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            fecha_aplicada TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        rows = self.db.execute_query(f"SELECT version, nombre, checksum FROM {self.table}", fetch=True)
+        return {row['version']: row for row in rows}
+
+    def check(self):
+        """Verificar checksums y devolver las migraciones pendientes"""
+        applied = self.applied()
+        pending = []
+        for migration in self.available():
+            row = applied.get(migration['version'])
+            if row is None:
+                pending.append(migration)
+            elif row['checksum'] != migration['checksum']:
+                raise MigrationError(
+                    f"La migración {migration['version']:04d}_{migration['nombre']} "
+                    f"fue modificada después de aplicarse"
+                )
+        return pending
+
+    def migrate(self):
+        """Aplicar las migraciones pendientes; devuelve las versiones aplicadas"""
+        done = []
+        with self.db.transaction():
+            # Evitar que varios workers migren a la vez al arrancar
+            lock = self.db.execute_query("SELECT GET_LOCK(%s, 30) as got", (self.LOCK_NAME,), fetch_one=True)
+            if not lock or not lock['got']:
+                raise MigrationError('No se pudo obtener el lock de migraciones')
+            try:
+                for migration in self.check():
+                    for statement in self._statements(migration['sql']):
+                        self.db.execute_query(statement)
+                    self.db.execute_query(
+                        f"INSERT INTO {self.table} (version, nombre, checksum) VALUES (%s, %s, %s)",
+                        (migration['version'], migration['nombre'], migration['checksum'])
+                    )
+                    done.append(migration['version'])
+            finally:
+                self.db.execute_query("SELECT RELEASE_LOCK(%s)", (self.LOCK_NAME,), fetch_one=True)
+        return done
+
+    @staticmethod
+    def _statements(sql):
+        """Separar un archivo .sql en sentencias (sin comentarios de línea)"""
+        lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+        return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
@@ -0,0 +1,108 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(Config.BCRYPT_MAX_PENDING)
+
+
+class PasswordPoolBusyError(Exception):
+    """Demasiados hashes pendientes: el pool de bcrypt está saturado"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def _get_executor():
+    """Pool de procesos dedicado a bcrypt (se crea en el primer uso)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: los workers no heredan hilos ni conexiones del proceso web
+                _executor = ProcessPoolExecutor(
+                    max_workers=Config.BCRYPT_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _run(fn, *args):
+    """Ejecutar fn en el pool de bcrypt, con un máximo de trabajos en cola
+
+    Si el resultado no llega en BCRYPT_TIMEOUT se cancela el trabajo y se lanza
+    PasswordPoolBusyError; un trabajo que ya estaba corriendo conserva su lugar en la cola
+    hasta que termina, para que el límite de pendientes siga siendo real.
+    """
+    if not Config.BCRYPT_POOL:
+        return fn(*args)
+
+    if not _slots.acquire(timeout=Config.BCRYPT_TIMEOUT):
+        raise PasswordPoolBusyError('El servidor está ocupado, intenta de nuevo en unos segundos')
+    future = None
+    try:
+        try:
+            future = _get_executor().submit(fn, *args)
+            return future.result(timeout=Config.BCRYPT_TIMEOUT)
+        except BrokenProcessPool:
+            # Un worker murió: recrear el pool y reintentar una vez
+            _reset_executor()
+            future = _get_executor().submit(fn, *args)
+            return future.result(timeout=Config.BCRYPT_TIMEOUT)
+    except FuturesTimeoutError:
+        future.cancel()
+        raise PasswordPoolBusyError('El servidor está ocupado, intenta de nuevo en unos segundos')
+    finally:
+        if future is None or future.done():
+            _slots.release()
+        else:
+            future.add_done_callback(lambda _: _slots.release())
+
+
+def _normalize(hashed):
+    """Los hashes $2y$ (PHP) son compatibles con $2b$"""
+    if hashed.startswith('$2y$'):
+        return '$2b$' + hashed[4:]
+    return hashed
+
+
+def hash_password(plain_password):
+    """Hash bcrypt con el costo configurado (BCRYPT_ROUNDS)"""
+    return _run(_hash, plain_password.encode('utf-8'), Config.BCRYPT_ROUNDS)
+
+
+def verify_password(plain_password, hashed_password):
+    """Verificar contraseña - compatible con formatos $2y$ y $2b$"""
+    try:
+        return _run(_check, plain_password.encode('utf-8'), _normalize(hashed_password).encode('utf-8'))
+    except PasswordPoolBusyError:
+        raise
+    except Exception as e:
+        print(f"Error en verificación de contraseña: {e}")
+        return False
+
+
+def needs_rehash(hashed_password):
+    """True si el hash no es $2b$ o su costo difiere del configurado"""
+    try:
+        prefix, cost = hashed_password.split('$')[1:3]
+        return prefix != '2b' or int(cost) != Config.BCRYPT_ROUNDS
+    except (ValueError, AttributeError):
+        return True
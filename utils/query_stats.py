@@ -0,0 +1,175 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from flask import g, request, current_app, has_request_context
+from config import Config
+
+logger = logging.getLogger('presupuesto.sql')
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(query):
+    """SQL normalizado: sin literales ni espacios extra y con listas IN colapsadas"""
+    sql = query.replace('%s', '?')
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip()
+    return _PLACEHOLDER_LIST.sub('(?+)', sql)
+
+
+class QueryStats:
+    """Instrumentación de consultas: registro por request, log de lentas y detección de N+1
+
+    Database llama a record() en cada consulta; al terminar el request se agregan los
+    totales por fingerprint y por endpoint para la vista de rendimiento del admin.
+    """
+
+    UNMATCHED = '<404>'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.fingerprints = {}      # fingerprint -> {cantidad, total_ms, max_ms, filas}
+            self.endpoints = {}         # endpoint -> {requests, consultas, total_ms}
+            self.slow = deque(maxlen=Config.QUERY_LOG_SIZE)
+            self.n_plus_one = deque(maxlen=Config.QUERY_LOG_SIZE)
+            self.since = time.time()
+
+    def record(self, query, params, rows, duration):
+        """Registrar una consulta ejecutada (duration en segundos)"""
+        ms = duration * 1000
+        fp = fingerprint(query)
+        params_count = len(params) if isinstance(params, (list, tuple, dict)) else int(params is not None)
+        entry = {'fingerprint': fp, 'params': params_count, 'filas': rows, 'ms': round(ms, 2)}
+
+        if has_request_context():
+            g.setdefault('_query_log', []).append(entry)
+        captured = getattr(self._local, 'capture', None)
+        if captured is not None:
+            captured.append(entry)
+
+        if ms >= Config.SLOW_QUERY_MS:
+            endpoint = request.endpoint if has_request_context() else None
+            logger.warning('Consulta lenta (%.1f ms, %s filas) en %s: %s', ms, rows, endpoint, fp)
+            with self._lock:
+                self.slow.append(dict(entry, endpoint=endpoint, fecha=time.time()))
+
+        with self._lock:
+            stats = self._entry(self.fingerprints, fp, 'cantidad',
+                                {'cantidad': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'filas': 0})
+            stats['cantidad'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['filas'] += rows or 0
+
+    @staticmethod
+    def _entry(table, key, hits, default):
+        """Acumulador de key; con la tabla llena se descarta el de menos hits (llamar con _lock)"""
+        stats = table.get(key)
+        if stats is None:
+            if len(table) >= Config.QUERY_STATS_MAX_ENTRIES:
+                del table[min(table, key=lambda name: table[name][hits])]
+            stats = table[key] = default
+        return stats
+
+    @contextmanager
+    def capture(self):
+        """Recolectar las consultas del hilo actual fuera de un request (benchmarks, scripts)"""
+        log = []
+        self._local.capture = log
+        try:
+            yield log
+        finally:
+            self._local.capture = None
+
+    def attach(self, entries):
+        """Sumar al request actual las consultas capturadas en un hilo auxiliar"""
+        if entries and has_request_context():
+            g.setdefault('_query_log', []).extend(entries)
+
+    def finish_request(self, response):
+        """Cerrar el registro del request: N+1, totales por endpoint y cabeceras de debug"""
+        log = g.pop('_query_log', [])
+        total_ms = sum(entry['ms'] for entry in log)
+
+        counts = {}
+        for entry in log:
+            counts[entry['fingerprint']] = counts.get(entry['fingerprint'], 0) + 1
+        repeated = {fp: n for fp, n in counts.items() if n >= Config.N_PLUS_ONE_THRESHOLD}
+
+        # Las URLs sin ruta comparten una clave: la ruta la elige el cliente
+        endpoint = request.endpoint or self.UNMATCHED
+        for fp, n in repeated.items():
+            logger.warning('Posible N+1 en %s: %d ejecuciones de %s', endpoint, n, fp)
+
+        with self._lock:
+            stats = self._entry(self.endpoints, endpoint, 'requests',
+                                {'requests': 0, 'consultas': 0, 'total_ms': 0.0})
+            stats['requests'] += 1
+            stats['consultas'] += len(log)
+            stats['total_ms'] += total_ms
+            for fp, n in repeated.items():
+                self.n_plus_one.append({'endpoint': endpoint, 'fingerprint': fp, 'cantidad': n, 'fecha': time.time()})
+
+        if Config.QUERY_DEBUG_HEADERS or current_app.debug:
+            response.headers['X-DB-Queries'] = str(len(log))
+            response.headers['X-DB-Time-ms'] = f"{total_ms:.1f}"
+            response.headers['Server-Timing'] = f"db;desc=\"{len(log)} consultas\";dur={total_ms:.1f}"
+            if repeated:
+                response.headers['X-DB-N-Plus-One'] = str(len(repeated))
+        return response
+
+    def snapshot(self, limit=25):
+        """Resumen para la vista de rendimiento"""
+        with self._lock:
+            fingerprints = sorted(
+                ({'fingerprint': fp, **stats, 'media_ms': stats['total_ms'] / stats['cantidad']}
+                 for fp, stats in self.fingerprints.items()),
+                key=lambda row: row['total_ms'], reverse=True
+            )[:limit]
+            endpoints = sorted(
+                ({'endpoint': name, **stats,
+                  'consultas_por_request': stats['consultas'] / stats['requests'],
+                  'ms_por_request': stats['total_ms'] / stats['requests']}
+                 for name, stats in self.endpoints.items()),
+                key=lambda row: row['total_ms'], reverse=True
+            )
+            return {
+                'desde': datetime.fromtimestamp(self.since),
+                'consultas': fingerprints,
+                'endpoints': endpoints,
+                'lentas': list(reversed(self.slow)),
+                'n_plus_one': list(reversed(self.n_plus_one))
+            }
+
+    def init_app(self, app):
+        """Registrar el cierre por request en la app"""
+        if not Config.QUERY_STATS_ENABLED:
+            return
+        app.after_request(self.finish_request)
+
+
+# Instancia compartida por todo el proceso
+query_stats = QueryStats()
+
+
+def timed(query, params, fn):
+    """Ejecutar fn() midiendo la duración; fn devuelve (resultado, filas)"""
+    if not Config.QUERY_STATS_ENABLED:
+        return fn()[0]
+    start = time.perf_counter()
+    result, rows = fn()
+    query_stats.record(query, params, rows, time.perf_counter() - start)
+    return result
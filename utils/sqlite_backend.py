@@ -0,0 +1,375 @@
+import atexit
+import os
+import re
+import sqlite3
+import tempfile
+import zlib
+from calendar import monthrange
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+import pymysql
+
+_PLACEHOLDER = re.compile(r'%([s%])')
+_TABLE_OPTIONS = re.compile(r'\)\s*ENGINE\s*=\s*\w+(\s+DEFAULT\s+CHARSET\s*=\s*\w+)?', re.IGNORECASE)
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE)
+_INTERVAL = re.compile(r'\bINTERVAL\s+(\?|-?\d+)\s+(SECOND|MINUTE|HOUR|DAY|WEEK|MONTH|YEAR)\b', re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_FN = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_CHECKSUM_TABLE = re.compile(r'^\s*CHECKSUM\s+TABLE\s+(\w+(?:\s*,\s*\w+)*)\s*$', re.IGNORECASE)
+_FIRST_WORD = re.compile(r'^\s*(\w+)')
+
+# Sentencias que no necesitan abrir transacción (las lecturas sueltas van en autocommit)
+_NO_TRANSACTION = {'SELECT', 'WITH', 'PRAGMA', 'EXPLAIN', 'VALUES', 'BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'RELEASE'}
+
+# Especificadores de DATE_FORMAT de MySQL -> strftime
+_MYSQL_DATE_FORMAT = {
+    'Y': '%Y', 'y': '%y', 'm': '%m', 'd': '%d', 'H': '%H', 'i': '%M', 's': '%S', 'S': '%S',
+    'M': '%B', 'b': '%b', 'a': '%a', 'W': '%A', 'j': '%j', 'p': '%p', 'T': '%H:%M:%S',
+}
+
+
+def _parse_datetime(value):
+    """datetime a partir del texto que guarda SQLite ('YYYY-MM-DD[ HH:MM:SS]') o de un date"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return datetime.fromisoformat(str(value).strip())
+
+
+def _format_like(moment, original):
+    """Devolver el resultado con la misma forma que la entrada: fecha sola o fecha y hora"""
+    if isinstance(original, str) and len(original.strip()) <= 10:
+        return moment.date().isoformat()
+    return moment.isoformat(' ', timespec='seconds')
+
+
+def _date_format(value, fmt):
+    if value is None or fmt is None:
+        return None
+    moment = _parse_datetime(value)
+
+    def spec(match):
+        code = match.group(1)
+        if code == '%':
+            return '%'
+        if code == 'c':
+            return str(moment.month)
+        if code == 'e':
+            return str(moment.day)
+        if code in _MYSQL_DATE_FORMAT:
+            return moment.strftime(_MYSQL_DATE_FORMAT[code])
+        return code
+
+    return re.sub(r'%(.)', spec, fmt)
+
+
+def _date_add(value, amount, unit, sign=1):
+    if value is None or amount is None:
+        return None
+    moment = _parse_datetime(value)
+    amount = int(amount) * sign
+    unit = unit.upper()
+    if unit in ('MONTH', 'YEAR'):
+        months = moment.month - 1 + amount * (12 if unit == 'YEAR' else 1)
+        year, month = moment.year + months // 12, months % 12 + 1
+        moment = moment.replace(year=year, month=month, day=min(moment.day, monthrange(year, month)[1]))
+    else:
+        moment += timedelta(**{unit.lower() + 's': amount})
+    return _format_like(moment, value)
+
+
+def _datediff(end, start):
+    if end is None or start is None:
+        return None
+    return (_parse_datetime(end).date() - _parse_datetime(start).date()).days
+
+
+def _greatest(*values):
+    return None if any(value is None for value in values) else max(values)
+
+
+def _least(*values):
+    return None if any(value is None for value in values) else min(values)
+
+
+def _register_functions(conn):
+    """Funciones de MySQL que usan los modelos, como funciones de usuario de SQLite"""
+    conn.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+    conn.create_function('DATE_ADD', 3, _date_add, deterministic=True)
+    conn.create_function('DATE_SUB', 3, lambda value, amount, unit: _date_add(value, amount, unit, -1),
+                         deterministic=True)
+    conn.create_function('DATEDIFF', 2, _datediff, deterministic=True)
+    conn.create_function('CURDATE', 0, lambda: date.today().isoformat())
+    conn.create_function('NOW', 0, lambda: datetime.now().isoformat(' ', timespec='seconds'))
+    conn.create_function('GREATEST', -1, _greatest, deterministic=True)
+    conn.create_function('LEAST', -1, _least, deterministic=True)
+    # El lock real es el de escritura de SQLite, que se toma al ejecutar GET_LOCK (ver prepare)
+    conn.create_function('GET_LOCK', 2, lambda name, timeout: 1)
+    conn.create_function('RELEASE_LOCK', 1, lambda name: 1)
+
+
+def _dict_row(cursor, row):
+    """Filas como dict; los REAL se devuelven como Decimal, igual que los DECIMAL de MySQL"""
+    return {
+        column[0]: Decimal(repr(round(value, 6))) if type(value) is float else value
+        for column, value in zip(cursor.description, row)
+    }
+
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', timespec='seconds'))
+sqlite3.register_converter('DATE', lambda value: _parse_datetime(value).date())
+sqlite3.register_converter('DATETIME', _parse_datetime)
+sqlite3.register_converter('TIMESTAMP', _parse_datetime)
+
+
+@contextmanager
+def _mysql_errors():
+    """Traducir los errores de sqlite3 a las excepciones de PyMySQL que maneja la app"""
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        message = str(e)
+        code = 1062 if 'UNIQUE' in message or 'PRIMARY KEY' in message else 1452
+        raise pymysql.err.IntegrityError(code, message) from e
+    except sqlite3.OperationalError as e:
+        message = str(e)
+        if 'locked' in message or 'busy' in message:
+            raise pymysql.err.OperationalError(1205, message) from e
+        raise pymysql.err.ProgrammingError(1064, message) from e
+    except (sqlite3.ProgrammingError, sqlite3.InterfaceError) as e:
+        raise pymysql.err.ProgrammingError(0, str(e)) from e
+    except sqlite3.DatabaseError as e:
+        raise pymysql.err.DatabaseError(0, str(e)) from e
+
+
+class SQLiteDialect:
+    """Traducción del SQL de los modelos (dialecto MySQL) a SQLite
+
+    La sintaxis se reescribe aquí (placeholders, FOR UPDATE, INTERVAL, ON DUPLICATE KEY
+    UPDATE, opciones de tabla); las funciones de MySQL se registran en cada conexión.
+    """
+
+    name = 'sqlite'
+
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def translate(query, formatted=True):
+        """SQL listo para sqlite3; `formatted` indica si PyMySQL habría aplicado el formateo con %"""
+        sql = query
+        if formatted:
+            sql = _PLACEHOLDER.sub(lambda match: '?' if match.group(1) == 's' else '%', sql)
+        sql = _TABLE_OPTIONS.sub(')', sql)
+        sql = _FOR_UPDATE.sub('', sql)
+        sql = _INTERVAL.sub(lambda match: f"{match.group(1)}, '{match.group(2).upper()}'", sql)
+
+        duplicate = _ON_DUPLICATE.search(sql)
+        if duplicate:
+            # SQLite >= 3.35 admite ON CONFLICT sin columnas; VALUES(col) pasa a excluded.col
+            assignments = _VALUES_FN.sub(r'excluded.\1', sql[duplicate.end():])
+            sql = f"{sql[:duplicate.start()]}ON CONFLICT DO UPDATE SET{assignments}"
+        return sql
+
+
+class SQLiteCursor:
+    """Cursor de diccionarios con la interfaz de los cursores de PyMySQL"""
+
+    def __init__(self, connection, buffered=True):
+        self.connection = connection
+        self.buffered = buffered
+        self.rowcount = -1
+        self.lastrowid = None
+        self._cursor = None
+        self._rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query, args=None):
+        checksum = _CHECKSUM_TABLE.match(query)
+        if checksum:
+            self._rows = self.connection.checksum_tables(re.split(r'\s*,\s*', checksum.group(1)))
+            self.rowcount = len(self._rows)
+            return self.rowcount
+
+        sql = self.connection.dialect.translate(query, args is not None)
+        with _mysql_errors():
+            self.connection.prepare(sql)
+            self._cursor = self.connection.raw.cursor()
+            self._cursor.execute(sql, self._params(args))
+            self.lastrowid = self._cursor.lastrowid
+            if self._cursor.description is None:
+                self._rows = None
+                self.rowcount = self._cursor.rowcount
+            elif self.buffered:
+                self._rows = self._cursor.fetchall()
+                self.rowcount = len(self._rows)
+            else:
+                self._rows = None
+                self.rowcount = -1
+        return self.rowcount
+
+    def executemany(self, query, rows):
+        sql = self.connection.dialect.translate(query, True)
+        with _mysql_errors():
+            self.connection.prepare(sql)
+            self._cursor = self.connection.raw.cursor()
+            self._cursor.executemany(sql, [self._params(row) for row in rows])
+            self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._rows.pop(0) if self._rows else None
+        with _mysql_errors():
+            return self._cursor.fetchone() if self._cursor else None
+
+    def fetchmany(self, size=1):
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        with _mysql_errors():
+            return self._cursor.fetchmany(size) if self._cursor else []
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        with _mysql_errors():
+            return self._cursor.fetchall() if self._cursor else []
+
+    def close(self):
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        self._rows = None
+
+    @staticmethod
+    def _params(args):
+        if args is None:
+            return ()
+        if isinstance(args, dict):
+            return args
+        return tuple(args)
+
+
+class SQLiteConnection:
+    """Conexión sqlite3 con la interfaz de PyMySQL que usan Database y el pool
+
+    Como en MySQL sin autocommit, las escrituras quedan en una transacción hasta commit();
+    se abre con BEGIN IMMEDIATE, así los escritores se serializan en el lock de la base
+    (SQLite no tiene bloqueo por fila: FOR UPDATE se elimina al traducir).
+    """
+
+    def __init__(self, raw, dialect):
+        self.raw = raw
+        self.dialect = dialect
+
+    @property
+    def open(self):
+        return self.raw is not None
+
+    def cursor(self, cursorclass=None):
+        """SSDictCursor de PyMySQL pide un cursor sin buffer (stream_query)"""
+        return SQLiteCursor(self, buffered=cursorclass is not pymysql.cursors.SSDictCursor)
+
+    def prepare(self, sql):
+        """Abrir la transacción antes de la primera escritura (o de un GET_LOCK)"""
+        if self.raw.in_transaction:
+            return
+        match = _FIRST_WORD.match(sql)
+        keyword = match.group(1).upper() if match else ''
+        if keyword not in _NO_TRANSACTION or 'GET_LOCK(' in sql.upper():
+            self.raw.execute('BEGIN IMMEDIATE')
+
+    def checksum_tables(self, tables):
+        """Equivalente a CHECKSUM TABLE: CRC de todas las filas de cada tabla"""
+        rows = []
+        with _mysql_errors():
+            for table in tables:
+                checksum = 0
+                for row in self.raw.execute(f"SELECT * FROM {table} ORDER BY rowid"):
+                    checksum = zlib.crc32(repr(tuple(row.values())).encode('utf-8'), checksum)
+                rows.append({'Table': table, 'Checksum': checksum})
+        return rows
+
+    def begin(self):
+        with _mysql_errors():
+            if not self.raw.in_transaction:
+                self.raw.execute('BEGIN IMMEDIATE')
+
+    def commit(self):
+        with _mysql_errors():
+            self.raw.commit()
+
+    def rollback(self):
+        with _mysql_errors():
+            self.raw.rollback()
+
+    def ping(self, reconnect=False):
+        with _mysql_errors():
+            self.raw.execute('SELECT 1').fetchone()
+
+    def close(self):
+        if self.raw is not None:
+            self.raw.close()
+            self.raw = None
+
+
+class SQLiteBackend:
+    """Backend embebido: archivo SQLite (o uno temporal con ':memory:') sin servidor externo
+
+    Pensado para pruebas, benchmarks y profiling local. El esquema sale de
+    migrations/sqlite/ y el SQL de los modelos se traduce con SQLiteDialect.
+    """
+
+    name = 'sqlite'
+    migrations_subdir = 'sqlite'
+
+    def __init__(self, path, busy_timeout=10.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.dialect = SQLiteDialect()
+        if path == ':memory:':
+            # Base desechable del proceso. No se usa memoria compartida (cache=shared) porque
+            # bloquea por tabla y falla al instante con escritores concurrentes; un archivo
+            # temporal en WAL tiene el mismo comportamiento que el backend normal
+            fd, self.path = tempfile.mkstemp(prefix='presupuesto-', suffix='.sqlite3')
+            os.close(fd)
+            atexit.register(self._remove_files)
+
+    def connect(self):
+        """Nueva conexión con la interfaz de PyMySQL"""
+        return SQLiteConnection(self._raw_connect(), self.dialect)
+
+    def _remove_files(self):
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(self.path + suffix)
+            except OSError:
+                pass
+
+    def _raw_connect(self):
+        with _mysql_errors():
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                isolation_level=None,       # transacciones explícitas (ver SQLiteConnection.prepare)
+                check_same_thread=False     # el pool entrega la conexión a distintos hilos
+            )
+            conn.row_factory = _dict_row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            _register_functions(conn)
+        return conn
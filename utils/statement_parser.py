@@ -0,0 +1,174 @@
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal
+
+# Encabezados aceptados en el CSV (en minúsculas) y el campo al que corresponden
+CSV_ALIASES = {
+    'tipo': 'tipo',
+    'fecha': 'fecha',
+    'date': 'fecha',
+    'concepto': 'concepto',
+    'descripcion_corta': 'concepto',
+    'monto': 'monto',
+    'valor': 'monto',
+    'amount': 'monto',
+    'categoria': 'categoria',
+    'category': 'categoria',
+    'esencial': 'esencial',
+    'descripcion': 'descripcion',
+    'notas': 'descripcion'
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d')
+
+_OFX_TAG = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+# Monto con signo opcional: solo dígitos y separadores ',' o '.'
+_AMOUNT = re.compile(r'^([-+]?)(\d[\d.,]*)$')
+# Parte entera con separadores de miles cada tres dígitos, por separador
+_THOUSANDS = {sep: re.compile(r'^\d{1,3}(%s\d{3})+$' % re.escape(sep)) for sep in (',', '.')}
+
+
+class StatementError(ValueError):
+    """Fila del extracto que no se puede interpretar"""
+
+    def __init__(self, linea, mensaje):
+        super().__init__(f"Línea {linea}: {mensaje}")
+        self.linea = linea
+
+
+def parse_amount(text):
+    """Convertir '1.234.567', '1.234,50', '1,234.56', '$ 1500' o '-25.40' en Decimal
+
+    El separador decimal es el último ',' o '.'; si solo hay un tipo de separador y todos
+    los grupos son de tres dígitos ('1.500', '1,500', '1.234.567') son separadores de miles.
+    Solo se aceptan dígitos, así que 'NaN', 'Infinity' o '1e9' son montos inválidos.
+    """
+    value = (text or '').strip().replace('$', '').replace(' ', '')
+    match = _AMOUNT.match(value)
+    if not match:
+        raise ValueError(f"monto inválido '{text}'")
+    sign, number = match.groups()
+
+    last = max(number.rfind(','), number.rfind('.'))
+    integer, decimals, thousands = number, '', None
+    if last >= 0:
+        separator = number[last]
+        other = '.' if separator == ',' else ','
+        if other not in number and _THOUSANDS[separator].match(number):
+            thousands = separator
+        else:
+            integer, decimals, thousands = number[:last], number[last + 1:], other
+            if not decimals.isdigit():
+                raise ValueError(f"monto inválido '{text}'")
+    if thousands and thousands in integer:
+        if not _THOUSANDS[thousands].match(integer):
+            raise ValueError(f"monto inválido '{text}': grupos de miles mal formados")
+        integer = integer.replace(thousands, '')
+    if not integer.isdigit():
+        raise ValueError(f"monto inválido '{text}'")
+    return Decimal(sign + integer + ('.' + decimals if decimals else ''))
+
+
+def parse_date(text):
+    """Fecha en cualquiera de los formatos aceptados"""
+    value = (text or '').strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"fecha inválida '{text}'")
+
+
+def _movement(linea, tipo, fecha, concepto, monto, categoria=None, esencial=True, descripcion=None):
+    """Normalizar un movimiento; el signo del monto define el tipo si no viene explícito"""
+    try:
+        monto = parse_amount(monto)
+        fecha = parse_date(fecha)
+    except ValueError as e:
+        raise StatementError(linea, str(e))
+
+    tipo = (tipo or '').strip().lower()
+    if not tipo:
+        tipo = 'gasto' if monto < 0 else 'ingreso'
+    elif tipo in ('gastos', 'egreso', 'debito', 'débito', 'debit'):
+        tipo = 'gasto'
+    elif tipo in ('ingresos', 'credito', 'crédito', 'credit'):
+        tipo = 'ingreso'
+    if tipo not in ('ingreso', 'gasto'):
+        raise StatementError(linea, f"tipo desconocido '{tipo}'")
+
+    monto = abs(monto)
+    if monto == 0:
+        raise StatementError(linea, 'el monto debe ser mayor a 0')
+
+    concepto = (concepto or '').strip()[:255]
+    if not concepto:
+        raise StatementError(linea, 'falta el concepto')
+
+    return {
+        'linea': linea,
+        'tipo': tipo,
+        'fecha': fecha,
+        'concepto': concepto,
+        'monto': monto,
+        'categoria': (categoria or '').strip(),
+        'esencial': str(esencial).strip().lower() not in ('0', 'no', 'false', 'n'),
+        'descripcion': (descripcion or '').strip() or None
+    }
+
+
+def parse_csv(lines):
+    """Generador de movimientos desde un CSV (separador ',' o ';', con encabezado)"""
+    lines = iter(lines)
+    header = next(lines, '')
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    columns = [CSV_ALIASES.get(name.strip().lower(), name.strip().lower())
+               for name in next(csv.reader([header], delimiter=delimiter), [])]
+    for required in ('fecha', 'concepto', 'monto'):
+        if required not in columns:
+            raise StatementError(1, f"falta la columna '{required}'")
+
+    for linea, values in enumerate(csv.reader(lines, delimiter=delimiter), start=2):
+        if not any(value.strip() for value in values):
+            continue
+        row = dict(zip(columns, values))
+        yield _movement(
+            linea, row.get('tipo'), row.get('fecha'), row.get('concepto'), row.get('monto'),
+            row.get('categoria'), row.get('esencial', 'si'), row.get('descripcion')
+        )
+
+
+def parse_ofx(lines):
+    """Generador de movimientos desde un OFX/QFX (SGML o XML), un <STMTTRN> a la vez"""
+    current = None
+    start = 0
+    for linea, line in enumerate(lines, start=1):
+        upper = line.upper()
+        if '<STMTTRN>' in upper:
+            current, start = {}, linea
+        if current is not None:
+            for tag, value in _OFX_TAG.findall(line):
+                if value.strip():
+                    current[tag.upper()] = value.strip()
+        if '</STMTTRN>' in upper and current is not None:
+            fecha = current.get('DTPOSTED', '')[:8]
+            yield _movement(
+                start, None,
+                f"{fecha[:4]}-{fecha[4:6]}-{fecha[6:8]}" if len(fecha) == 8 else fecha,
+                current.get('NAME') or current.get('MEMO'),
+                current.get('TRNAMT'),
+                descripcion=current.get('MEMO') if current.get('NAME') else None
+            )
+            current = None
+
+
+def parse_statement(lines, formato):
+    """Elegir el parser según el formato ('csv' u 'ofx')"""
+    if formato == 'csv':
+        return parse_csv(lines)
+    if formato in ('ofx', 'qfx'):
+        return parse_ofx(lines)
+    raise ValueError(f"Formato no soportado: {formato}")